@@ -0,0 +1,45 @@
+"""
+Gera o arquivo de resumos (SQLite) a partir dos microdados (locais ou USE_HUGGINGFACE).
+
+Execute: python build_store.py [--anos 2023 2024] [--saida caminho/resumos.sqlite]
+
+Depois é só copiar o arquivo gerado para a imagem/servidor e subir a API com
+DATA_MODE=summary (e SUMMARY_STORE apontando para ele, se mudar o caminho).
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import main
+from summaries import calcular_resumo
+from summary_store import SummaryStore
+
+
+def build(anos, saida: Path):
+    store = SummaryStore(saida)
+    print(f"📦 Gerando resumos em {saida}")
+    for year in anos:
+        inicio = time.time()
+        df_micro, _ = main.carregar_ano(year)
+        if df_micro.empty:
+            print(f"   ⚠ {year}: sem microdados, ignorado")
+            continue
+        resumo = calcular_resumo(year, df_micro, versao=main.assinatura_arquivos(year))
+        store.salvar(resumo)
+        print(f"   ✓ {year}: {resumo['inscritos']:,} inscritos resumidos em {time.time() - inicio:.1f}s")
+        del df_micro
+    tamanho = saida.stat().st_size / 1024 if saida.exists() else 0
+    print(f"✅ Pronto: {saida} ({tamanho:.1f} KB)")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Gera o arquivo de resumos usado no modo DATA_MODE=summary")
+    parser.add_argument("--anos", type=int, nargs="+", default=main.YEARS)
+    parser.add_argument("--saida", type=Path, default=main.SUMMARY_STORE)
+    args = parser.parse_args()
+    build(args.anos, args.saida)
+
+
+if __name__ == "__main__":
+    main_cli()
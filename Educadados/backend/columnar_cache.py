@@ -0,0 +1,160 @@
+"""
+Cache colunar (Parquet) dos microdados locais, gerado por `educadados converter`.
+
+Para cada ano ficam três arquivos na pasta do cache:
+    MICRODADOS_ENEM_{ano}.parquet             colunas úteis já validadas (zstd)
+    MICRODADOS_ENEM_{ano}.json                origem (tamanho/mtime do CSV), colunas e relatório de qualidade
+    MICRODADOS_ENEM_{ano}.quarentena.parquet  amostra das linhas em quarentena
+
+O cache só é usado enquanto está fresco: o CSV de origem tem o mesmo tamanho
+e data de modificação registrados e o cache tem todas as colunas pedidas.
+Qualquer outra situação volta para a leitura do CSV.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from lazy_imports import preguicoso
+
+pd = preguicoso("pandas")
+
+# muda quando o layout do cache muda (caches antigos passam a ser ignorados)
+FORMATO_CACHE = 2
+LINHAS_POR_GRUPO = 250_000
+
+
+def disponivel() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def caminhos(pasta: Path, year: int) -> Dict[str, Path]:
+    base = Path(pasta) / f"MICRODADOS_ENEM_{year}"
+    return {
+        "dados": base.with_suffix(".parquet"),
+        "meta": base.with_suffix(".json"),
+        "quarentena": base.with_name(base.name + ".quarentena.parquet"),
+    }
+
+
+def origem(csv: Path) -> dict:
+    st = Path(csv).stat()
+    return {"arquivo": Path(csv).name, "tamanho": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def metadados(pasta: Path, year: int) -> Optional[dict]:
+    try:
+        return json.loads(caminhos(pasta, year)["meta"].read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def fresco(pasta: Path, year: int, csv: Path, colunas: Optional[Sequence[str]] = None) -> bool:
+    """True se o cache do ano corresponde ao CSV atual e tem as colunas pedidas."""
+    meta = metadados(pasta, year)
+    if meta is None or meta.get("formato") != FORMATO_CACHE or not caminhos(pasta, year)["dados"].exists():
+        return False
+    try:
+        if meta.get("origem") != origem(csv):
+            return False
+    except OSError:
+        return False
+    return not colunas or set(colunas) <= set(meta.get("colunas_pedidas", []))
+
+
+def gravar(pasta: Path, year: int, df: pd.DataFrame, csv: Path, colunas_pedidas: Sequence[str],
+           qualidade: Optional[dict] = None) -> dict:
+    """Grava o ano (troca atômica: escreve em .tmp e renomeia) e devolve os metadados."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arquivos = caminhos(pasta, year)
+    arquivos["dados"].parent.mkdir(parents=True, exist_ok=True)
+    fonte = origem(csv)
+
+    temporario = arquivos["dados"].with_suffix(".parquet.tmp")
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(tabela, temporario, compression="zstd", row_group_size=LINHAS_POR_GRUPO)
+    os.replace(temporario, arquivos["dados"])
+
+    quarentena = (qualidade or {}).get("quarentena")
+    if quarentena is not None and len(quarentena):
+        pq.write_table(pa.Table.from_pandas(quarentena, preserve_index=False), arquivos["quarentena"], compression="zstd")
+    elif arquivos["quarentena"].exists():
+        arquivos["quarentena"].unlink()
+
+    meta = {
+        "formato": FORMATO_CACHE,
+        "ano": year,
+        "origem": fonte,
+        "colunas_pedidas": list(colunas_pedidas),
+        "colunas": list(df.columns),
+        "linhas": len(df),
+        "bytes": arquivos["dados"].stat().st_size,
+        "gerado_em": time.time(),
+        "qualidade": (qualidade or {}).get("relatorio"),
+    }
+    temporario = arquivos["meta"].with_suffix(".json.tmp")
+    temporario.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temporario, arquivos["meta"])
+    return meta
+
+
+def ler(pasta: Path, year: int, colunas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Lê o ano do cache; o relatório de qualidade vai para df.attrs["qualidade"] como no leitor CSV."""
+    import pyarrow.parquet as pq
+
+    arquivos = caminhos(pasta, year)
+    meta = metadados(pasta, year) or {}
+    existentes = set(meta.get("colunas", []))
+    selecionadas = [c for c in colunas if c in existentes] if colunas else None
+    df = pq.read_table(arquivos["dados"], columns=selecionadas).to_pandas()
+    qualidade = ler_qualidade(pasta, year, meta)
+    if qualidade is not None:
+        df.attrs["qualidade"] = qualidade
+    return df
+
+
+def ler_qualidade(pasta: Path, year: int, meta: Optional[dict] = None) -> Optional[dict]:
+    """{"relatorio", "quarentena"} gravados na conversão do ano, ou None."""
+    import pyarrow.parquet as pq
+
+    meta = meta if meta is not None else metadados(pasta, year) or {}
+    if not meta.get("qualidade"):
+        return None
+    arquivos = caminhos(pasta, year)
+    quarentena = pq.read_table(arquivos["quarentena"]).to_pandas() if arquivos["quarentena"].exists() else pd.DataFrame()
+    return {"relatorio": meta["qualidade"], "quarentena": quarentena}
+
+
+def listar(pasta: Path) -> List[dict]:
+    """Metadados de todos os anos no cache (com o tamanho total dos arquivos)."""
+    saida = []
+    for meta_path in sorted(Path(pasta).glob("MICRODADOS_ENEM_*.json")):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except ValueError:
+            continue
+        arquivos = caminhos(pasta, meta["ano"])
+        meta["bytes_total"] = sum(p.stat().st_size for p in arquivos.values() if p.exists())
+        saida.append(meta)
+    return saida
+
+
+def limpar(pasta: Path) -> int:
+    """Apaga os arquivos do cache; devolve os bytes liberados."""
+    liberados = 0
+    for path in Path(pasta).glob("MICRODADOS_ENEM_*"):
+        if path.is_file():
+            liberados += path.stat().st_size
+            path.unlink()
+    return liberados
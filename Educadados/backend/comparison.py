@@ -0,0 +1,172 @@
+"""
+Comparação de dois recortes (anos, UFs, tipos de escola, faixas de renda) a
+partir dos resumos compactos: diferença de médias, tamanho de efeito (d de
+Cohen e g de Hedges) e teste t de Welch.
+
+Tudo sai de contagem, soma e soma dos quadrados de cada lado (summaries.py),
+então o custo não depende de quantas linhas brutas há por trás de cada grupo.
+A distribuição t é calculada aqui mesmo (beta incompleta regularizada por
+fração contínua, com math.lgamma), sem depender do SciPy.
+
+Com centenas de milhares de candidatos por grupo, quase qualquer diferença é
+"significativa"; o tamanho de efeito é o que diz se ela importa.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+from summaries import descrever
+
+ALFA_PADRAO = 0.05
+
+# limites convencionais de Cohen para |d|
+MAGNITUDES = [(0.2, "desprezivel"), (0.5, "pequeno"), (0.8, "medio"), (math.inf, "grande")]
+
+_MAX_ITERACOES = 300
+_EPS = 3e-16
+_MINIMO = 1e-300
+
+
+def _fracao_beta(a: float, b: float, x: float) -> float:
+    """Fração contínua da beta incompleta (algoritmo de Lentz modificado)."""
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > _MINIMO else _MINIMO)
+    h = d
+    for m in range(1, _MAX_ITERACOES + 1):
+        m2 = 2 * m
+        for termo in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                      -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + termo * d
+            d = 1.0 / (d if abs(d) > _MINIMO else _MINIMO)
+            c = 1.0 + termo / c
+            c = c if abs(c) > _MINIMO else _MINIMO
+            delta = d * c
+            h *= delta
+        if abs(delta - 1.0) < _EPS:
+            break
+    return h
+
+
+def beta_incompleta(a: float, b: float, x: float) -> float:
+    """Beta incompleta regularizada I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_frente = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                  + a * math.log(x) + b * math.log1p(-x))
+    # a fração converge rápido de um lado de (a + 1) / (a + b + 2); do outro, usa a simetria
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_frente) * _fracao_beta(a, b, x) / a
+    return 1.0 - math.exp(log_frente) * _fracao_beta(b, a, 1.0 - x) / b
+
+
+def cauda_t(t: float, gl: float) -> float:
+    """P(T > |t|) para a distribuição t com gl graus de liberdade."""
+    if math.isinf(t):
+        return 0.0
+    return 0.5 * beta_incompleta(gl / 2.0, 0.5, gl / (gl + t * t))
+
+
+def cdf_t(t: float, gl: float) -> float:
+    """Função de distribuição acumulada da t de Student."""
+    cauda = cauda_t(t, gl)
+    return 1.0 - cauda if t > 0 else cauda
+
+
+def quantil_t(p: float, gl: float) -> float:
+    """Inverso de cdf_t por bisseção (p em (0, 1))."""
+    if not 0.0 < p < 1.0:
+        raise ValueError("p deve estar entre 0 e 1")
+    if p == 0.5:
+        return 0.0
+    alvo = max(p, 1.0 - p)
+    baixo, alto = 0.0, 1.0
+    while cdf_t(alto, gl) < alvo:
+        alto *= 2.0
+    for _ in range(100):
+        meio = (baixo + alto) / 2.0
+        if cdf_t(meio, gl) < alvo:
+            baixo = meio
+        else:
+            alto = meio
+        if alto - baixo < 1e-12 * max(1.0, alto):
+            break
+    q = (baixo + alto) / 2.0
+    return q if p > 0.5 else -q
+
+
+def welch(a: dict, b: dict, alfa: float = ALFA_PADRAO) -> Optional[dict]:
+    """
+    Teste t de Welch de b - a a partir de descrever() de cada lado
+    (variâncias diferentes; graus de liberdade de Welch–Satterthwaite).
+    """
+    if a["desvio"] is None or b["desvio"] is None:
+        return None
+    va, vb = a["erro_padrao"] ** 2, b["erro_padrao"] ** 2
+    diferenca = b["media"] - a["media"]
+    ep = math.sqrt(va + vb)
+    if ep == 0.0:
+        return None
+    gl = (va + vb) ** 2 / (va * va / (a["n"] - 1) + vb * vb / (b["n"] - 1))
+    t = diferenca / ep
+    critico = quantil_t(1.0 - alfa / 2.0, gl)
+    return {
+        "diferenca": diferenca,
+        "erro_padrao": ep,
+        "ic": [diferenca - critico * ep, diferenca + critico * ep],
+        "t": t,
+        "gl": gl,
+        "p_valor": min(1.0, 2.0 * cauda_t(t, gl)),
+    }
+
+
+def tamanho_efeito(a: dict, b: dict) -> Optional[dict]:
+    """d de Cohen (desvio combinado) e g de Hedges (d com a correção exata de viés)."""
+    if a["desvio"] is None or b["desvio"] is None:
+        return None
+    gl = a["n"] + b["n"] - 2
+    combinado = math.sqrt(((a["n"] - 1) * a["desvio"] ** 2 + (b["n"] - 1) * b["desvio"] ** 2) / gl)
+    if combinado == 0.0:
+        return None
+    d = (b["media"] - a["media"]) / combinado
+    # J(gl) = Γ(gl/2) / (√(gl/2) Γ((gl-1)/2)); vale 1 - 3/(4gl - 1) aproximadamente
+    correcao = math.exp(math.lgamma(gl / 2.0) - math.lgamma((gl - 1) / 2.0)) / math.sqrt(gl / 2.0) if gl > 1 else 1.0
+    g = d * correcao
+    return {
+        "desvio_combinado": combinado,
+        "cohen_d": d,
+        "hedges_g": g,
+        "magnitude": next(nome for limite, nome in MAGNITUDES if abs(g) < limite),
+    }
+
+
+def comparar_momentos(a: Dict[str, float], b: Dict[str, float], alfa: float = ALFA_PADRAO) -> dict:
+    """Descrição de cada lado, diferença b - a com IC, teste de Welch e tamanho de efeito."""
+    da, db = descrever(a), descrever(b)
+    teste = welch(da, db, alfa)
+    efeito = tamanho_efeito(da, db)
+    return {
+        "a": da,
+        "b": db,
+        "diferenca": teste["diferenca"] if teste else None,
+        "erro_padrao": teste["erro_padrao"] if teste else None,
+        "ic": teste["ic"] if teste else None,
+        "t": teste["t"] if teste else None,
+        "gl": teste["gl"] if teste else None,
+        "p_valor": teste["p_valor"] if teste else None,
+        "significativo": teste["p_valor"] < alfa if teste else None,
+        "cohen_d": efeito["cohen_d"] if efeito else None,
+        "hedges_g": efeito["hedges_g"] if efeito else None,
+        "magnitude": efeito["magnitude"] if efeito else None,
+    }
+
+
+def comparar(recorte_a: dict, recorte_b: dict, areas: Iterable[str], alfa: float = ALFA_PADRAO) -> Dict[str, dict]:
+    """{área: comparar_momentos} para as áreas presentes nos dois recortes ({"inscritos", "areas"})."""
+    return {
+        area: comparar_momentos(recorte_a["areas"][area], recorte_b["areas"][area], alfa)
+        for area in areas
+        if area in recorte_a["areas"] and area in recorte_b["areas"]
+    }
@@ -0,0 +1,154 @@
+"""
+Cruzamento de notas por dimensões do questionário socioeconômico (Q0xx),
+tipo de escola e UF.
+
+Cada dimensão vira um código inteiro (códigos da categoria); as 2 ou 3
+dimensões são combinadas em um índice de célula e tudo é acumulado com
+np.bincount: contagem, soma e soma dos quadrados para média/desvio, e um
+histograma de 1 ponto por célula para os quantis.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+from lazy_imports import preguicoso
+from summaries import AREAS, TIPOS_ESCOLA
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+# histograma das notas: faixas de LARGURA_FAIXA pontos entre 0 e NOTA_MAXIMA
+NOTA_MAXIMA = 1000.0
+LARGURA_FAIXA = 1.0
+N_FAIXAS = int(NOTA_MAXIMA / LARGURA_FAIXA) + 1
+
+QUANTIS_PADRAO = [0.25, 0.5, 0.75]
+
+
+def codificar(serie: pd.Series):
+    """(códigos int64 com -1 para ausente, rótulos das categorias)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.int64)
+        categorias = list(serie.cat.categories)
+    else:
+        codigos, categorias = pd.factorize(serie, sort=True)
+        codigos = codigos.astype(np.int64)
+        categorias = list(categorias)
+    rotulos = [str(int(c)) if isinstance(c, (int, np.integer, float, np.floating)) else str(c) for c in categorias]
+    return codigos, rotulos
+
+
+def quantis_do_histograma(hist: np.ndarray, quantis: Sequence[float]) -> np.ndarray:
+    """Quantis por linha de um histograma (células x faixas), interpolando dentro da faixa."""
+    acumulado = hist.cumsum(axis=1)
+    n = acumulado[:, -1]
+    saida = np.full((hist.shape[0], len(quantis)), np.nan)
+    linhas = np.arange(hist.shape[0])
+    for j, q in enumerate(quantis):
+        alvo = q * n
+        faixa = np.minimum((acumulado < alvo[:, None]).sum(axis=1), hist.shape[1] - 1)
+        antes = np.where(faixa > 0, acumulado[linhas, np.maximum(faixa - 1, 0)], 0)
+        na_faixa = hist[linhas, faixa]
+        fracao = np.divide(alvo - antes, na_faixa, out=np.zeros_like(alvo, dtype=float), where=na_faixa > 0)
+        saida[:, j] = np.where(n > 0, (faixa + np.clip(fracao, 0, 1)) * LARGURA_FAIXA, np.nan)
+    return saida
+
+
+def cruzar(df: pd.DataFrame, dimensoes: Sequence[str], areas: Sequence[str],
+           quantis: Sequence[float] = QUANTIS_PADRAO) -> dict:
+    """Médias, desvios e quantis de cada área em cada combinação das dimensões."""
+    codigos, rotulos = [], []
+    for col in dimensoes:
+        c, r = codificar(df[col])
+        codigos.append(c)
+        rotulos.append(r)
+
+    # índice de célula em base mista; linha sem alguma dimensão fica fora (-1)
+    tamanhos = [max(len(r), 1) for r in rotulos]
+    n_celulas = int(np.prod(tamanhos))
+    celula = np.zeros(len(df), dtype=np.int64)
+    valida = np.ones(len(df), dtype=bool)
+    for c, k in zip(codigos, tamanhos):
+        celula = celula * k + np.maximum(c, 0)
+        valida &= c >= 0
+
+    inscritos = np.bincount(celula[valida], minlength=n_celulas)
+    acumulados = {}
+    for area in areas:
+        notas = df[area].to_numpy(dtype=np.float64)
+        ok = valida & ~np.isnan(notas)
+        cel, v = celula[ok], notas[ok]
+        faixa = np.clip((v / LARGURA_FAIXA).astype(np.int64), 0, N_FAIXAS - 1)
+        acumulados[area] = {
+            "n": np.bincount(cel, minlength=n_celulas),
+            "soma": np.bincount(cel, weights=v, minlength=n_celulas),
+            "soma_q": np.bincount(cel, weights=v * v, minlength=n_celulas),
+            "hist": np.bincount(cel * N_FAIXAS + faixa, minlength=n_celulas * N_FAIXAS).reshape(n_celulas, N_FAIXAS),
+        }
+    return montar_cruzamento(dimensoes, rotulos, inscritos, acumulados, quantis)
+
+
+def montar_cruzamento(dimensoes: Sequence[str], rotulos: List[List[str]], inscritos: np.ndarray,
+                      acumulados: Dict[str, dict], quantis: Sequence[float]) -> dict:
+    """
+    Resultado do cruzamento a partir dos acumulados por célula (índice em base
+    mista dos códigos das dimensões): inscritos e, por área, n, soma, soma_q e
+    histograma. Usada pelo caminho pandas e pelo DuckDB.
+    """
+    tamanhos = [max(len(r), 1) for r in rotulos]
+    por_area = {}
+    for area, a in acumulados.items():
+        n, soma, soma_q, hist = a["n"], a["soma"], a["soma_q"], a["hist"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = soma / n
+            var = np.maximum((soma_q - n * media * media) / (n - 1), 0.0)
+        por_area[area] = {"n": n, "media": media, "desvio": np.sqrt(var), "quantis": quantis_do_histograma(hist, quantis)}
+
+    celulas = []
+    for i in np.flatnonzero(inscritos):
+        chave, resto = {}, int(i)
+        for col, r, k in reversed(list(zip(dimensoes, rotulos, tamanhos))):
+            chave[col] = r[resto % k]
+            resto //= k
+        areas_celula = {}
+        for area, a in por_area.items():
+            n = int(a["n"][i])
+            areas_celula[area] = {
+                "n": n,
+                "media": float(a["media"][i]) if n else None,
+                "desvio": float(a["desvio"][i]) if n > 1 else None,
+                "quantis": {str(q): float(a["quantis"][i, j]) for j, q in enumerate(quantis)} if n else None,
+            }
+        celulas.append({"chave": dict(reversed(list(chave.items()))), "inscritos": int(inscritos[i]), "areas": areas_celula})
+
+    return {
+        "dimensoes": [{"coluna": col, "categorias": r} for col, r in zip(dimensoes, rotulos)],
+        "quantis": list(quantis),
+        "celulas": celulas,
+    }
+
+
+def rotulo_escola(dimensoes: List[dict]) -> List[dict]:
+    """Troca os códigos de TP_ESCOLA pelos nomes usados no dashboard."""
+    for d in dimensoes:
+        if d["coluna"] == "TP_ESCOLA":
+            d["nomes"] = {c: TIPOS_ESCOLA.get(int(c), c) for c in d["categorias"]}
+    return dimensoes
+
+
+def validar_parametros(dimensoes: Sequence[str], permitidas: Sequence[str], areas: Optional[Sequence[str]],
+                       quantis: Sequence[float]) -> Optional[str]:
+    """Mensagem de erro para parâmetros inválidos, ou None."""
+    if not 2 <= len(dimensoes) <= 3:
+        return "Informe 2 ou 3 dimensões"
+    if len(set(dimensoes)) != len(dimensoes):
+        return "Dimensões repetidas"
+    invalidas = [d for d in dimensoes if d not in permitidas]
+    if invalidas:
+        return f"Dimensões não disponíveis: {invalidas} (use {list(permitidas)})"
+    if areas and any(a not in AREAS for a in areas):
+        return f"areas deve conter apenas {list(AREAS)}"
+    if any(not 0 <= q <= 1 for q in quantis):
+        return "quantis devem estar entre 0 e 1"
+    return None
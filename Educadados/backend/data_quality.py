@@ -0,0 +1,186 @@
+"""
+Validação dos microdados feita na própria leitura (sem uma segunda passada).
+
+Cada bloco lido (faixa de bytes do CSV, partição remota ou a leitura
+tradicional inteira) passa por `validar` logo depois do parse: as regras são
+máscaras vetorizadas por coluna, as linhas que violam alguma regra vão para a
+quarentena e saem dos dados usados nas estatísticas. O relatório conta as
+violações por regra e coluna, as linhas em quarentena e as linhas do arquivo
+que o parser descartou por estarem malformadas.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from lazy_imports import preguicoso
+from summaries import AREAS, PRESENCAS, TIPOS_ESCOLA
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+NOTA_MINIMA = 0.0
+NOTA_MAXIMA = 1000.0
+
+UFS = {
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+}
+DOMINIO_PRESENCA = [0, 1, 2]                   # faltou, presente, eliminado
+DOMINIO_ESCOLA = sorted(TIPOS_ESCOLA) + [4]    # 4 = exterior, usado em edições antigas
+
+# linhas em quarentena guardadas por ano (as contagens são sempre completas)
+MAX_QUARENTENA = 1000
+
+
+def _nota_invalida(serie: pd.Series) -> np.ndarray:
+    v = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    return ~np.isnan(v) & ((v < NOTA_MINIMA) | (v > NOTA_MAXIMA))
+
+
+def _fora_do_dominio(dominio) -> Callable[[pd.Series], np.ndarray]:
+    def teste(serie: pd.Series) -> np.ndarray:
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # testa só as categorias e expande pelos códigos
+            ruins = ~serie.cat.categories.isin(dominio)
+            codigos = serie.cat.codes.to_numpy()
+            return (codigos >= 0) & ruins[np.maximum(codigos, 0)]
+        return (serie.notna() & ~serie.isin(dominio)).to_numpy()
+    return teste
+
+
+# regra -> (colunas verificadas, teste que devolve a máscara das linhas inválidas); nulos são válidos
+REGRAS = {
+    "nota_fora_da_faixa": (list(AREAS), _nota_invalida),
+    "uf_invalida": (["SG_UF_RESIDENCIA", "SG_UF_PROVA", "SG_UF_ESC"], _fora_do_dominio(sorted(UFS))),
+    "presenca_invalida": (PRESENCAS, _fora_do_dominio(DOMINIO_PRESENCA)),
+    "escola_invalida": (["TP_ESCOLA"], _fora_do_dominio(DOMINIO_ESCOLA)),
+}
+
+
+def relatorio_vazio() -> dict:
+    return {
+        "linhas_lidas": 0,
+        "linhas_validas": 0,
+        "linhas_em_quarentena": 0,
+        "linhas_ignoradas": 0,
+        "linhas_por_regra": {},
+        "regras": {},
+    }
+
+
+def validar(df: pd.DataFrame, linhas_ignoradas: int = 0,
+            max_quarentena: int = MAX_QUARENTENA) -> Tuple[pd.DataFrame, dict, pd.DataFrame]:
+    """(linhas válidas, relatório, amostra da quarentena) de um bloco já lido."""
+    invalida = np.zeros(len(df), dtype=bool)
+    relatorio = relatorio_vazio()
+    for regra, (colunas, teste) in REGRAS.items():
+        da_regra = np.zeros(len(df), dtype=bool)
+        for col in colunas:
+            if col not in df.columns:
+                continue
+            m = teste(df[col])
+            n = int(m.sum())
+            if n:
+                relatorio["regras"].setdefault(regra, {})[col] = n
+                da_regra |= m
+        if relatorio["regras"].get(regra):
+            relatorio["linhas_por_regra"][regra] = int(da_regra.sum())
+            invalida |= da_regra
+
+    n_invalidas = int(invalida.sum())
+    relatorio.update(
+        linhas_lidas=len(df) + linhas_ignoradas,
+        linhas_validas=len(df) - n_invalidas,
+        linhas_em_quarentena=n_invalidas,
+        linhas_ignoradas=linhas_ignoradas,
+    )
+    if not n_invalidas:
+        return df, relatorio, df.iloc[:0]
+    return df[~invalida], relatorio, df[invalida].iloc[:max_quarentena]
+
+
+def somar(relatorios: Iterable[dict]) -> dict:
+    """Junta os relatórios dos blocos de um ano."""
+    total = relatorio_vazio()
+    for r in relatorios:
+        for chave in ("linhas_lidas", "linhas_validas", "linhas_em_quarentena", "linhas_ignoradas"):
+            total[chave] += r[chave]
+        for regra, n in r["linhas_por_regra"].items():
+            total["linhas_por_regra"][regra] = total["linhas_por_regra"].get(regra, 0) + n
+        for regra, colunas in r["regras"].items():
+            destino = total["regras"].setdefault(regra, {})
+            for col, n in colunas.items():
+                destino[col] = destino.get(col, 0) + n
+    return total
+
+
+def juntar_quarentenas(partes: List[pd.DataFrame], max_quarentena: int = MAX_QUARENTENA) -> pd.DataFrame:
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True).iloc[:max_quarentena]
+
+
+def registros_malformados(dados: bytes, encoding: str, sep: str, n_campos: int, n_registros: int) -> List[int]:
+    """
+    Índices (na ordem de leitura) dos registros de um trecho do CSV com número
+    de campos diferente do cabeçalho. Com usecols o parser C do pandas aceita
+    esses registros calado (campos a mais somem, a menos viram nulos), então a
+    conferência é feita aqui: primeiro conta os separadores fora de aspas e,
+    só se o total não bater, percorre o trecho com o módulo csv.
+    """
+    sep_bytes = sep.encode(encoding)
+    fora = dados.split(b'"')[::2] if b'"' in dados else [dados]
+    if sum(p.count(sep_bytes) for p in fora) == (n_campos - 1) * n_registros:
+        return []
+    texto = io.TextIOWrapper(io.BytesIO(dados), encoding=encoding, newline="")
+    registros = (r for r in csv.reader(texto, delimiter=sep) if r)
+    return [i for i, r in enumerate(registros) if len(r) != n_campos]
+
+
+def condicoes_sql(colunas: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """
+    [(regra, coluna, condição SQL de valor válido)] das regras aplicáveis às
+    colunas, para o backend DuckDB. Nulos são válidos via coalesce, e não com
+    OR ... IS NULL, e os domínios usam list_contains, e não IN: o DuckDB não
+    preserva a ordem das linhas em filtros com OR nem em listas IN longas
+    (que viram join), e a exportação e a quarentena dependem dessa ordem.
+    """
+    disponiveis = set(colunas)
+    termos = []
+    for col in REGRAS["nota_fora_da_faixa"][0]:
+        if col in disponiveis:
+            termos.append(("nota_fora_da_faixa", col, f"coalesce({col} BETWEEN {NOTA_MINIMA} AND {NOTA_MAXIMA}, true)"))
+    for regra, dominio in (("uf_invalida", sorted(UFS)), ("presenca_invalida", DOMINIO_PRESENCA),
+                           ("escola_invalida", DOMINIO_ESCOLA)):
+        valores = ", ".join(f"'{v}'" if isinstance(v, str) else str(v) for v in dominio)
+        for col in REGRAS[regra][0]:
+            if col in disponiveis:
+                termos.append((regra, col, f"coalesce(list_contains([{valores}], {col}), true)"))
+    return termos
+
+
+def condicao_sql(colunas: Iterable[str]) -> Optional[str]:
+    """As mesmas regras como condição WHERE (linhas válidas), para o backend DuckDB."""
+    termos = [condicao for _, _, condicao in condicoes_sql(colunas)]
+    return " AND ".join(termos) if termos else None
+
+
+def descrever(relatorio: dict, quarentena: Optional[pd.DataFrame] = None, exemplos: int = 0) -> dict:
+    """Relatório no formato da API, com taxas e (opcionalmente) exemplos da quarentena."""
+    lidas = relatorio["linhas_lidas"]
+    saida = {
+        **relatorio,
+        "taxa_quarentena": 100.0 * relatorio["linhas_em_quarentena"] / lidas if lidas else 0.0,
+        "taxa_ignoradas": 100.0 * relatorio["linhas_ignoradas"] / lidas if lidas else 0.0,
+    }
+    if exemplos and quarentena is not None and len(quarentena):
+        amostra = quarentena.iloc[:exemplos]
+        saida["exemplos"] = [
+            {col: (None if pd.isna(v) else v.item() if hasattr(v, "item") else v) for col, v in linha.items()}
+            for linha in amostra.to_dict(orient="records")
+        ]
+    return saida
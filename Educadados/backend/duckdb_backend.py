@@ -0,0 +1,490 @@
+"""
+Backend de consulta em DuckDB (QUERY_BACKEND=duckdb).
+
+Calcula o mesmo resumo de summaries.calcular_resumo, e os mesmos agregados
+dos endpoints de linha (percentis, municípios, cruzamentos, exportação e
+qualidade), com SQL direto sobre o CSV (ou o Parquet do cache colunar) do
+ano: execução vetorizada em várias threads e com spill para disco, sem
+manter o DataFrame do ano em memória. O SQL só agrega; a montagem das
+respostas reaproveita as funções do caminho pandas.
+
+Verificação de paridade com o backend pandas:
+    python duckdb_backend.py 2023
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import crosstab
+import percentiles
+from data_quality import MAX_QUARENTENA, REGRAS, condicao_sql, condicoes_sql, relatorio_vazio
+from export import FORMATOS, LINHAS_POR_BLOCO
+from geography import NIVEIS, montar_arvore
+from lazy_imports import preguicoso
+from parallel_csv import detect_csv_format
+from summaries import (AREAS, COLUNAS_QUESTIONARIO, COMBINACAO_INVALIDA, FORMATO_RESUMO, N_FAIXAS_CANDIDATO, OBJETIVAS,
+                       PRESENCA_DA_AREA, PRESENCAS)
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+# tipos equivalentes aos DTYPES_MICRODADOS do backend pandas (FLOAT = float32)
+TIPOS_SQL = {
+    "NU_INSCRICAO": "BIGINT",
+    "NU_ANO": "SMALLINT",
+    "CO_UF_RESIDENCIA": "FLOAT",
+    "SG_UF_RESIDENCIA": "VARCHAR",
+    "TP_ESCOLA": "FLOAT",
+    "TP_LINGUA": "FLOAT",
+    **{q: "VARCHAR" for q in COLUNAS_QUESTIONARIO},
+    **{col: "FLOAT" for col in AREAS},
+    **{col: "FLOAT" for col in PRESENCAS},
+    **{cod: "FLOAT" for cod, _, _ in NIVEIS.values()},
+    **{nome: "VARCHAR" for _, nome, _ in NIVEIS.values()},
+    **{uf: "VARCHAR" for _, _, uf in NIVEIS.values()},
+}
+
+ENCODINGS_DUCKDB = {"utf-8": "utf-8", "utf-8-sig": "utf-8", "latin-1": "latin-1", "cp1252": "latin-1"}
+
+
+def conectar():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError("QUERY_BACKEND=duckdb requer o pacote duckdb (pip install duckdb)") from e
+    conn = duckdb.connect()
+    if os.environ.get("DUCKDB_MEMORY_LIMIT"):
+        conn.execute(f"SET memory_limit = '{os.environ['DUCKDB_MEMORY_LIMIT']}'")
+    if os.environ.get("DUCKDB_TEMP_DIR"):
+        conn.execute(f"SET temp_directory = '{os.environ['DUCKDB_TEMP_DIR']}'")
+    return conn
+
+
+def _literal(texto: str) -> str:
+    return "'" + str(texto).replace("'", "''") + "'"
+
+
+def fonte_sql(path: Path, rejeitos: bool = False):
+    """
+    Expressão FROM para o arquivo do ano e as colunas disponíveis nele. Com
+    rejeitos=True os registros malformados do CSV vão para a tabela
+    reject_errors da conexão (usada no relatório de qualidade).
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        conn = conectar()
+        try:
+            colunas = [r[0] for r in conn.execute(f"DESCRIBE SELECT * FROM read_parquet({_literal(path)})").fetchall()]
+        finally:
+            conn.close()
+        return f"read_parquet({_literal(path)})", colunas
+
+    encoding, sep, colunas, _ = detect_csv_format(path)
+    tipos = ", ".join(f"{_literal(c)}: {_literal(t)}" for c, t in TIPOS_SQL.items() if c in colunas)
+    fonte = (
+        f"read_csv({_literal(path)}, delim={_literal(sep)}, header=true, "
+        f"encoding={_literal(ENCODINGS_DUCKDB.get(encoding, 'utf-8'))}, types={{{tipos}}}, "
+        # registros malformados ficam de fora, como no leitor pandas (data_quality.registros_malformados)
+        f"ignore_errors=true{', store_rejects=true' if rejeitos else ''})"
+    )
+    return fonte, colunas
+
+
+def fonte_validada(path: Path):
+    """Como fonte_sql, só com as linhas válidas (mesmas regras de qualidade do ingest pandas)."""
+    fonte, colunas = fonte_sql(path)
+    validas = condicao_sql(colunas)
+    if validas:
+        fonte = f"(SELECT * FROM {fonte} WHERE {validas})"
+    return fonte, colunas
+
+
+def colunas_da_fonte(path: Path) -> List[str]:
+    return fonte_sql(path)[1]
+
+
+def consultar(sql: str) -> pd.DataFrame:
+    conn = conectar()
+    try:
+        return conn.execute(sql).fetchdf()
+    finally:
+        conn.close()
+
+
+def calcular_resumo_duckdb(year: int, path: Path, versao: Optional[str] = None) -> dict:
+    """Mesmo formato de summaries.calcular_resumo, em uma única varredura com GROUPING SETS."""
+    fonte, colunas = fonte_validada(path)
+    areas = [a for a in AREAS if a in colunas]
+    grupos = [c for c in ["SG_UF_RESIDENCIA", "TP_ESCOLA", "Q006"] + PRESENCAS if c in colunas]
+    conjuntos = ["()"] + [f"({g})" for g in grupos]
+
+    # participação: combinação das 4 presenças e faixa da média de cada candidato nas objetivas
+    com_participacao = all(p in colunas for p in PRESENCAS)
+    com_candidato = com_participacao and all(a in colunas for a in OBJETIVAS)
+    if com_participacao:
+        conjuntos.append(f"({', '.join(PRESENCAS)})")
+    if com_candidato:
+        media = f"({' + '.join(f'CAST({a} AS DOUBLE)' for a in OBJETIVAS)}) / {len(OBJETIVAS)}"
+        fonte = (
+            f"(SELECT *, {media} AS media_candidato, "
+            f"CAST(floor(least(greatest({media}, 0), {N_FAIXAS_CANDIDATO - 1})) AS INTEGER) AS faixa_candidato "
+            f"FROM {fonte})"
+        )
+        grupos.append("faixa_candidato")
+        conjuntos.append("(faixa_candidato)")
+
+    selecao = [f"GROUPING({g}) AS g_{g}, {g}" for g in grupos]
+    selecao.append("count(*) AS inscritos")
+    for a in areas:
+        v = f"CAST({a} AS DOUBLE)"
+        selecao.append(f"count({a}) AS n_{a}, coalesce(sum({v}), 0) AS s_{a}, coalesce(sum({v} * {v}), 0) AS q_{a}")
+        # nacional e recortes: só notas de quem esteve presente na prova (como summaries.acumular)
+        presenca = PRESENCA_DA_AREA.get(a)
+        filtro = f" FILTER (WHERE {presenca} = 1)" if presenca in colunas else ""
+        selecao.append(f"count({a}){filtro} AS pn_{a}, coalesce(sum({v}){filtro}, 0) AS ps_{a}, "
+                       f"coalesce(sum({v} * {v}){filtro}, 0) AS pq_{a}")
+    if com_candidato:
+        selecao.append("count(media_candidato) AS n_cand, coalesce(sum(media_candidato), 0) AS s_cand, "
+                       "coalesce(sum(media_candidato * media_candidato), 0) AS q_cand")
+    sql = f"SELECT {', '.join(selecao)} FROM {fonte} GROUP BY GROUPING SETS ({', '.join(conjuntos)})"
+
+    conn = conectar()
+    try:
+        cursor = conn.execute(sql)
+        nomes = [d[0] for d in cursor.description]
+        linhas = [dict(zip(nomes, linha)) for linha in cursor.fetchall()]
+    finally:
+        conn.close()
+
+    def momentos_linha(linha, prefixo=""):
+        return {a: {"n": int(linha[f"{prefixo}n_{a}"]), "soma": float(linha[f"{prefixo}s_{a}"]),
+                    "soma_q": float(linha[f"{prefixo}q_{a}"])} for a in areas}
+
+    resumo = {
+        "formato": FORMATO_RESUMO,
+        "ano": year,
+        "versao": versao,
+        "inscritos": 0,
+        "areas": {},
+        "por_uf": {},
+        "por_escola": {},
+        "por_renda": {},
+        "presenca": {},
+        "participacao": None,
+    }
+    combinacoes = {}
+    candidato = {"n": 0, "soma": 0.0, "soma_q": 0.0, "histograma": [0] * N_FAIXAS_CANDIDATO}
+    for linha in linhas:
+        # colunas do conjunto agrupado são as que têm GROUPING() = 0
+        ativo = [g for g in grupos if linha[f"g_{g}"] == 0]
+        if not ativo:
+            resumo["inscritos"] = int(linha["inscritos"])
+            resumo["areas"] = momentos_linha(linha, "p")
+            continue
+        if len(ativo) > 1:
+            valores = [linha[p] for p in PRESENCAS]
+            rotulo = (
+                "".join(str(int(v)) for v in valores)
+                if all(v is not None and 0 <= v <= 2 for v in valores) else COMBINACAO_INVALIDA
+            )
+            atual = combinacoes.setdefault(rotulo, {"inscritos": 0, "areas": {a: {"n": 0, "soma": 0.0, "soma_q": 0.0} for a in areas}})
+            atual["inscritos"] += int(linha["inscritos"])
+            for a, m in momentos_linha(linha).items():
+                for k in m:
+                    atual["areas"][a][k] += m[k]
+            continue
+        g = ativo[0]
+        if g == "faixa_candidato":
+            if linha[g] is not None:
+                candidato["histograma"][int(linha[g])] = int(linha["n_cand"])
+                candidato["n"] += int(linha["n_cand"])
+                candidato["soma"] += float(linha["s_cand"])
+                candidato["soma_q"] += float(linha["q_cand"])
+            continue
+        chave = linha[g]
+        if chave is None:
+            continue
+        chave = str(chave) if g in ("SG_UF_RESIDENCIA", "Q006") else str(int(chave))
+        if g == "SG_UF_RESIDENCIA":
+            resumo["por_uf"][chave] = {"inscritos": int(linha["inscritos"]), "areas": momentos_linha(linha, "p")}
+        elif g == "TP_ESCOLA":
+            resumo["por_escola"][chave] = {"inscritos": int(linha["inscritos"]), "areas": momentos_linha(linha, "p")}
+        elif g == "Q006":
+            resumo["por_renda"][chave] = {"inscritos": int(linha["inscritos"]), "areas": momentos_linha(linha, "p")}
+        else:
+            resumo["presenca"].setdefault(g, {})[chave] = int(linha["inscritos"])
+
+    resumo["por_uf"] = dict(sorted(resumo["por_uf"].items()))
+    resumo["por_escola"] = dict(sorted(resumo["por_escola"].items(), key=lambda kv: int(kv[0])))
+    resumo["por_renda"] = dict(sorted(resumo["por_renda"].items()))
+    resumo["presenca"] = {g: dict(sorted(resumo["presenca"][g].items())) for g in PRESENCAS if g in resumo["presenca"]}
+    if com_participacao:
+        resumo["participacao"] = {"combinacoes": dict(sorted(combinacoes.items())), "media_candidato": candidato}
+    return resumo
+
+
+def _momentos_sql(areas: Sequence[str]) -> str:
+    """n, soma e soma dos quadrados (em DOUBLE) de cada área, como summaries.momentos."""
+    termos = []
+    for a in areas:
+        v = f"CAST({a} AS DOUBLE)"
+        termos.append(f"count({a}) AS n_{a}, coalesce(sum({v}), 0) AS s_{a}, coalesce(sum({v} * {v}), 0) AS q_{a}")
+    return ", ".join(termos)
+
+
+def indice_percentis_duckdb(path: Path) -> Dict[str, dict]:
+    """Mesmo índice de percentiles.indice_percentis: histogramas de 0,1 ponto por área e recorte."""
+    fonte, colunas = fonte_validada(path)
+    areas = [a for a in AREAS if a in colunas]
+    if not areas:
+        return {}
+    recortes = {"uf": "SG_UF_RESIDENCIA", "escola": "TP_ESCOLA"}
+    recortes = {nome: col for nome, col in recortes.items() if col in colunas}
+    # mesma faixa de percentiles._faixas (rint arredonda para o par, como round_even)
+    faixa = (f"CAST(least(greatest(round_even(CAST(nota AS DOUBLE) / {percentiles.RESOLUCAO}, 0), 0), "
+             f"{percentiles.N_FAIXAS - 1}) AS INTEGER)")
+    notas = (f"(UNPIVOT (SELECT {', '.join(list(recortes.values()) + areas)} FROM {fonte}) "
+             f"ON {', '.join(areas)} INTO NAME area VALUE nota)")
+    conjuntos = ["(area, faixa)"] + [f"(area, {col}, faixa)" for col in recortes.values()]
+    nivel = "CASE " + " ".join(f"WHEN GROUPING({col}) = 0 THEN '{nome}'" for nome, col in recortes.items()) + " ELSE 'nacional' END"
+    # códigos numéricos (FLOAT) viram "2", não "2.0", como as chaves de percentiles._acumulados_por_grupo
+    texto = {col: col if TIPOS_SQL.get(col) == "VARCHAR" else f"CAST({col} AS BIGINT)" for col in recortes.values()}
+    chave = f"coalesce({', '.join(f'CAST({t} AS VARCHAR)' for t in texto.values())}, '')" if recortes else "''"
+    filtro = " AND ".join(f"(GROUPING({col}) = 1 OR {col} IS NOT NULL)" for col in recortes.values()) or "true"
+    df = consultar(
+        f"SELECT area, {nivel} AS nivel, {chave} AS chave, faixa, count(*) AS n "
+        f"FROM (SELECT *, {faixa} AS faixa FROM {notas}) "
+        f"GROUP BY GROUPING SETS ({', '.join(conjuntos)}) HAVING {filtro}"
+    )
+
+    indice = {a: {"nacional": np.zeros(percentiles.N_FAIXAS, dtype=np.int32), "uf": {}, "escola": {}} for a in areas}
+    for (area, nivel_, chave_), parte in df.groupby(["area", "nivel", "chave"], sort=True):
+        hist = np.zeros(percentiles.N_FAIXAS, dtype=np.int64)
+        hist[parte["faixa"].to_numpy()] = parte["n"].to_numpy()
+        acumulado = hist.cumsum().astype(np.int32)
+        if nivel_ == "nacional":
+            indice[area]["nacional"] = acumulado
+        else:
+            indice[area][nivel_][chave_] = acumulado
+    for por_area in indice.values():
+        por_area["escola"] = dict(sorted(por_area["escola"].items(), key=lambda kv: int(kv[0])))
+    return indice
+
+
+def calcular_arvores_duckdb(path: Path) -> Dict[str, Optional[dict]]:
+    """Mesmas árvores de geography.calcular_arvores (nome e UF da primeira linha de cada município)."""
+    fonte, colunas = fonte_validada(path)
+    areas = [a for a in AREAS if a in colunas]
+    arvores = {}
+    for nivel, (col_cod, col_nome, col_uf) in NIVEIS.items():
+        if col_cod not in colunas:
+            arvores[nivel] = None
+            continue
+        nome = f"arg_min_null({col_nome}, linha)" if col_nome in colunas else "NULL"
+        uf = f"arg_min_null({col_uf}, linha)" if col_uf in colunas else "NULL"
+        selecao = [f"CAST({col_cod} AS BIGINT) AS codigo", f"{nome} AS nome", f"{uf} AS uf", "count(*) AS inscritos"]
+        if areas:
+            selecao.append(_momentos_sql(areas))
+        df = consultar(
+            f"SELECT {', '.join(selecao)} "
+            f"FROM (SELECT *, row_number() OVER () AS linha FROM {fonte}) "
+            f"WHERE {col_cod} IS NOT NULL GROUP BY 1 ORDER BY 1"
+        )
+        por_area = {
+            a: {"n": df[f"n_{a}"].to_numpy(), "soma": df[f"s_{a}"].to_numpy(), "soma_q": df[f"q_{a}"].to_numpy()}
+            for a in areas
+        }
+        arvores[nivel] = montar_arvore(nivel, [int(c) for c in df["codigo"]], df["nome"].to_numpy(),
+                                       df["uf"].to_numpy(), df["inscritos"].to_numpy(), por_area)
+    return arvores
+
+
+def _rotulos(valores) -> List[str]:
+    """Rótulos das categorias na mesma ordem de crosstab.codificar (valores ordenados)."""
+    return [str(int(v)) if isinstance(v, (int, float)) else str(v) for v in sorted(valores)]
+
+
+def cruzar_duckdb(path: Path, dimensoes: Sequence[str], areas: Sequence[str],
+                  quantis: Sequence[float] = crosstab.QUANTIS_PADRAO) -> dict:
+    """Mesmo resultado de crosstab.cruzar: momentos e histograma de 1 ponto por célula, agregados em SQL."""
+    fonte, _ = fonte_validada(path)
+    dims = ", ".join(dimensoes)
+    completas = " AND ".join(f"{d} IS NOT NULL" for d in dimensoes)
+    conn = conectar()
+    try:
+        rotulos = [_rotulos(v for (v,) in conn.execute(f"SELECT DISTINCT {d} FROM {fonte} WHERE {d} IS NOT NULL").fetchall())
+                   for d in dimensoes]
+        selecao = [dims, "count(*) AS inscritos"] + ([_momentos_sql(areas)] if areas else [])
+        celulas = conn.execute(f"SELECT {', '.join(selecao)} FROM {fonte} WHERE {completas} GROUP BY ALL").fetchdf()
+        faixa = f"CAST(least(greatest(trunc(CAST(nota AS DOUBLE) / {crosstab.LARGURA_FAIXA}), 0), {crosstab.N_FAIXAS - 1}) AS BIGINT)"
+        hist = conn.execute(
+            f"SELECT {dims}, area, {faixa} AS faixa, count(*) AS n "
+            f"FROM (UNPIVOT (SELECT {dims}, {', '.join(areas)} FROM {fonte} WHERE {completas}) "
+            f"ON {', '.join(areas)} INTO NAME area VALUE nota) GROUP BY ALL"
+        ).fetchdf() if areas else None
+    finally:
+        conn.close()
+
+    tamanhos = [max(len(r), 1) for r in rotulos]
+    n_celulas = int(np.prod(tamanhos))
+
+    def indice_celula(df: pd.DataFrame) -> np.ndarray:
+        celula = np.zeros(len(df), dtype=np.int64)
+        for d, r, k in zip(dimensoes, rotulos, tamanhos):
+            serie = df[d]
+            texto = serie.astype("int64").astype(str) if serie.dtype.kind in "iuf" else serie.astype(str)
+            celula = celula * k + pd.Categorical(texto, categories=r).codes.astype(np.int64)
+        return celula
+
+    cel = indice_celula(celulas)
+    inscritos = np.zeros(n_celulas, dtype=np.int64)
+    inscritos[cel] = celulas["inscritos"].to_numpy()
+    acumulados = {}
+    for a in areas:
+        acumulados[a] = {"n": np.zeros(n_celulas, dtype=np.int64), "soma": np.zeros(n_celulas), "soma_q": np.zeros(n_celulas),
+                         "hist": np.zeros((n_celulas, crosstab.N_FAIXAS), dtype=np.int64)}
+        acumulados[a]["n"][cel] = celulas[f"n_{a}"].to_numpy()
+        acumulados[a]["soma"][cel] = celulas[f"s_{a}"].to_numpy()
+        acumulados[a]["soma_q"][cel] = celulas[f"q_{a}"].to_numpy()
+    if hist is not None and len(hist):
+        cel_hist = indice_celula(hist)
+        for a in areas:
+            da_area = (hist["area"] == a).to_numpy()
+            acumulados[a]["hist"][cel_hist[da_area], hist["faixa"].to_numpy()[da_area]] = hist["n"].to_numpy()[da_area]
+    return crosstab.montar_cruzamento(dimensoes, rotulos, inscritos, acumulados, quantis)
+
+
+def blocos_exportacao(path: Path, colunas: Sequence[str], filtros: Dict[str, object], limite: int,
+                      tamanho: int = LINHAS_POR_BLOCO) -> Iterator[pd.DataFrame]:
+    """
+    Blocos (DataFrames) das linhas válidas que atendem a filtros, até `limite`
+    linhas. O primeiro bloco sai sempre, mesmo vazio: ele serve de modelo
+    (colunas e tipos) para o codificador do export.
+    """
+    fonte, _ = fonte_validada(path)
+    condicoes = [f"{col} = {_literal(v) if isinstance(v, str) else int(v)}" for col, v in filtros.items()]
+    onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    conn = conectar()
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(colunas)} FROM {fonte} {onde} LIMIT {int(limite)}")
+        # fetch_df_chunk lê em vetores de 2048 linhas
+        vetores = max(1, tamanho // 2048)
+        bloco = cursor.fetch_df_chunk(vetores)
+        yield bloco
+        while len(bloco):
+            bloco = cursor.fetch_df_chunk(vetores)
+            if len(bloco):
+                yield bloco
+    finally:
+        conn.close()
+
+
+def exportar_duckdb(path: Path, formato: str, colunas: Sequence[str], filtros: Dict[str, object], limite: int) -> Iterator[bytes]:
+    """Como export.exportar, lendo os blocos do DuckDB em vez do DataFrame do ano."""
+    _, _, codificador = FORMATOS[formato]
+    blocos = blocos_exportacao(path, colunas, filtros, limite)
+    primeiro = next(blocos)
+
+    def todos():
+        if len(primeiro):
+            yield primeiro
+        yield from blocos
+
+    return codificador(todos(), primeiro.iloc[:0])
+
+
+def qualidade_duckdb(path: Path, colunas_uteis: Sequence[str], max_quarentena: int = MAX_QUARENTENA) -> dict:
+    """
+    Mesmo {"relatorio", "quarentena"} de data_quality.validar para o CSV do ano:
+    violações por regra e coluna com count_if, malformados pela tabela de
+    rejeitos do DuckDB e as primeiras linhas da quarentena.
+    """
+    fonte, colunas = fonte_sql(path, rejeitos=True)
+    termos = condicoes_sql(colunas)
+    regras = [r for r in REGRAS if any(regra == r for regra, _, _ in termos)]
+    selecao = ["count(*) AS linhas"]
+    selecao += [f"count_if(NOT {cond}) AS c{i}" for i, (_, _, cond) in enumerate(termos)]
+    selecao += [f"count_if(NOT ({' AND '.join(c for r, _, c in termos if r == regra)})) AS r_{regra}" for regra in regras]
+    todas = condicao_sql(colunas)
+    selecao.append(f"count_if(NOT ({todas})) AS quarentena" if todas else "0 AS quarentena")
+
+    conn = conectar()
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(selecao)} FROM {fonte}")
+        # fetchall (e não fetchone) termina a varredura: só então a tabela de rejeitos fica completa
+        linha = dict(zip([d[0] for d in cursor.description], cursor.fetchall()[0]))
+        ignoradas = conn.execute("SELECT count(DISTINCT (file_id, line)) FROM reject_errors").fetchone()[0]
+        selecionadas = [c for c in colunas if c in colunas_uteis]
+        quarentena = (
+            conn.execute(f"SELECT {', '.join(selecionadas)} FROM {fonte} WHERE NOT ({todas}) LIMIT {int(max_quarentena)}").fetchdf()
+            if todas and linha["quarentena"] else pd.DataFrame()
+        )
+    finally:
+        conn.close()
+
+    relatorio = relatorio_vazio()
+    for i, (regra, col, _) in enumerate(termos):
+        if linha[f"c{i}"]:
+            relatorio["regras"].setdefault(regra, {})[col] = int(linha[f"c{i}"])
+    for regra in regras:
+        if relatorio["regras"].get(regra):
+            relatorio["linhas_por_regra"][regra] = int(linha[f"r_{regra}"])
+    relatorio.update(
+        linhas_lidas=int(linha["linhas"]) + int(ignoradas),
+        linhas_validas=int(linha["linhas"]) - int(linha["quarentena"]),
+        linhas_em_quarentena=int(linha["quarentena"]),
+        linhas_ignoradas=int(ignoradas),
+    )
+    return {"relatorio": relatorio, "quarentena": quarentena}
+
+
+def diferencas(a, b, caminho="", tolerancia=1e-9):
+    """Lista as diferenças entre dois resumos (números comparados com tolerância relativa)."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        saida = []
+        for k in sorted(set(a) | set(b), key=str):
+            if k in ("versao",):
+                continue
+            if k not in a or k not in b:
+                saida.append(f"{caminho}/{k}: presente só em um dos lados")
+            else:
+                saida += diferencas(a[k], b[k], f"{caminho}/{k}", tolerancia)
+        return saida
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return [f"{caminho}: tamanhos diferentes ({len(a)} != {len(b)})"]
+        saida = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            saida += diferencas(x, y, f"{caminho}[{i}]", tolerancia)
+        return saida
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        if abs(a - b) > tolerancia * max(1.0, abs(a), abs(b)):
+            return [f"{caminho}: {a} != {b}"]
+        return []
+    return [] if a == b else [f"{caminho}: {a!r} != {b!r}"]
+
+
+if __name__ == "__main__":
+    import main
+    from summaries import calcular_resumo
+
+    anos = [int(a) for a in sys.argv[1:]] or main.YEARS
+    ok = True
+    for year in anos:
+        arquivo = main.fonte_microdados(year)
+        if arquivo is None:
+            print(f"⚠ {year}: sem arquivo de microdados")
+            continue
+        df, _ = main.load_from_local(year)
+        via_pandas = calcular_resumo(year, df)
+        via_duckdb = calcular_resumo_duckdb(year, arquivo)
+        erros = diferencas(via_pandas, via_duckdb)
+        ok = ok and not erros
+        print(f"{'✅' if not erros else '❌'} {year}: {len(erros)} diferença(s)")
+        for e in erros[:20]:
+            print("   ", e)
+    sys.exit(0 if ok else 1)
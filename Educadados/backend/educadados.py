@@ -0,0 +1,476 @@
+"""
+CLI de operação do EducaDados, usando o mesmo carregador da API (main.py).
+
+Execute: python educadados.py <comando> [opções]   (ou ./start.sh no Linux para subir a API)
+
+    converter       CSV -> cache colunar Parquet (leitura paralela por faixas, já validada)
+    resumos         gera o arquivo de resumos (SQLite) do modo DATA_MODE=summary
+    perfil          formato, colunas, amostra e qualidade de CSVs (substitui inspect_csv.py/detect_cols.py)
+    aquecer         preenche os caches em disco, ou aquece uma API rodando (--url)
+    cache info      o que há em cada cache e se ainda corresponde aos arquivos de origem
+    cache limpar    apaga caches (--parquet, --remoto, --resumos ou --tudo)
+    bench leitura   vazão da carga de um ano: CSV (por nº de processos) x cache Parquet
+    bench api       teste de carga (repassa as opções para load_test.py)
+
+Todos os passos longos mostram progresso e vazão (MB/s e linhas/s).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import columnar_cache
+import data_quality
+import main
+from lazy_imports import preguicoso
+from parallel_csv import detect_csv_format, read_csv_parallel
+from remote_dataset import DiskCache
+from summaries import AREAS, PRESENCAS, TIPOS_ESCOLA, calcular_resumo
+from summary_store import SummaryStore
+
+pd = preguicoso("pandas")
+
+MB = 1024 * 1024
+
+# rotas abertas pelo dashboard, aquecidas por `aquecer --url`
+ROTAS_DASHBOARD = [
+    "/api/enem/estatisticas/{ano}",
+    "/api/enem/areas/{ano}",
+    "/api/enem/por-estado/{ano}?top=10",
+    "/api/enem/por-escola/{ano}",
+    "/api/enem/presenca/{ano}",
+    "/api/enem/evolucao",
+    "/api/enem/insights",
+]
+
+
+# ==========================================
+#   PROGRESSO
+# ==========================================
+
+class Progresso:
+    """Linha de progresso com vazão e tempo restante (redesenhada no terminal, a cada 10% em logs)."""
+
+    def __init__(self, rotulo: str):
+        self.rotulo = rotulo
+        self.inicio = time.perf_counter()
+        self.terminal = sys.stderr.isatty()
+        self.ultimo = -10
+
+    def __call__(self, feitos: int, total: int):
+        decorrido = max(time.perf_counter() - self.inicio, 1e-9)
+        pct = int(100 * feitos / total) if total else 100
+        vazao = feitos / decorrido
+        restante = (total - feitos) / vazao if vazao else 0.0
+        linha = (f"   {self.rotulo}: {pct:3d}%  {feitos / MB:,.0f}/{total / MB:,.0f} MB  "
+                 f"{vazao / MB:,.1f} MB/s  faltam {restante:.0f}s")
+        if self.terminal:
+            sys.stderr.write("\r" + linha.ljust(78))
+            sys.stderr.flush()
+        elif pct >= self.ultimo + 10 or feitos >= total:
+            self.ultimo = pct
+            print(linha)
+
+    def fim(self):
+        if self.terminal:
+            sys.stderr.write("\n")
+
+
+def vazao(bytes_lidos: int, linhas: int, segundos: float) -> str:
+    segundos = max(segundos, 1e-9)
+    return f"{segundos:.1f}s, {bytes_lidos / MB / segundos:,.1f} MB/s, {linhas / segundos:,.0f} linhas/s"
+
+
+def csv_do_ano(year: int) -> Path:
+    return main.MICRODADOS_PATH / f"MICRODADOS_ENEM_{year}.csv"
+
+
+def ler_csv(path: Path, workers: int, rotulo: str) -> "pd.DataFrame":
+    progresso = Progresso(rotulo)
+    try:
+        return read_csv_parallel(path, usecols=main.COLUNAS_UTEIS, dtype=main.DTYPES_MICRODADOS,
+                                 workers=workers, validar=True, progresso=progresso)
+    finally:
+        progresso.fim()
+
+
+# ==========================================
+#   CONVERTER (CSV -> PARQUET)
+# ==========================================
+
+def converter_ano(year: int, workers: int, forcar: bool = False) -> bool:
+    """Gera o cache colunar do ano; False se não há CSV. Não refaz um cache ainda fresco (sem forcar)."""
+    csv = csv_do_ano(year)
+    if not csv.exists():
+        print(f"⚠ {year}: {csv} não encontrado, ignorado")
+        return False
+    if not forcar and columnar_cache.fresco(main.PARQUET_CACHE_PATH, year, csv, main.COLUNAS_UTEIS):
+        print(f"✓ {year}: cache colunar já atualizado")
+        return True
+
+    tamanho = csv.stat().st_size
+    print(f"📄 {year}: convertendo {csv.name} ({tamanho / MB:,.0f} MB, {workers} processos)")
+    inicio = time.perf_counter()
+    df = ler_csv(csv, workers, str(year))
+    lido = time.perf_counter() - inicio
+    # attrs não vão para o Parquet: o relatório de qualidade fica nos metadados do cache
+    qualidade = df.attrs.pop("qualidade", None)
+    meta = columnar_cache.gravar(main.PARQUET_CACHE_PATH, year, df, csv, main.COLUNAS_UTEIS, qualidade)
+    total = time.perf_counter() - inicio
+    print(f"   ✓ {meta['linhas']:,} linhas válidas em {vazao(tamanho, len(df), lido)}")
+    print(f"   ✓ Parquet: {meta['bytes'] / MB:,.1f} MB ({100 * meta['bytes'] / tamanho:.1f}% do CSV), "
+          f"total {total:.1f}s")
+    if qualidade and (qualidade["relatorio"]["linhas_em_quarentena"] or qualidade["relatorio"]["linhas_ignoradas"]):
+        r = qualidade["relatorio"]
+        print(f"   ⚠ Qualidade: {r['linhas_em_quarentena']:,} em quarentena, {r['linhas_ignoradas']:,} malformadas")
+    return True
+
+
+def cmd_converter(args) -> int:
+    if not columnar_cache.disponivel():
+        print("❌ pyarrow não instalado (pip install pyarrow)")
+        return 1
+    print(f"📦 Cache colunar em {main.PARQUET_CACHE_PATH}")
+    convertidos = [y for y in args.anos if converter_ano(y, args.workers, args.forcar)]
+    return 0 if convertidos else 1
+
+
+# ==========================================
+#   RESUMOS
+# ==========================================
+
+def resumo_atualizado(store: SummaryStore, year: int) -> bool:
+    gravado = store.carregar(year)
+    return gravado is not None and gravado.get("versao") == main.assinatura_arquivos(year)
+
+
+def cmd_resumos(args) -> int:
+    import build_store
+
+    store = SummaryStore(args.saida)
+    anos = args.anos if args.forcar else [y for y in args.anos if not resumo_atualizado(store, y)]
+    for y in sorted(set(args.anos) - set(anos)):
+        print(f"✓ {y}: resumo já atualizado em {args.saida}")
+    if anos:
+        build_store.build(anos, args.saida)
+    return 0
+
+
+# ==========================================
+#   PERFIL (INSPEÇÃO DE CSVs)
+# ==========================================
+
+def estimar_linhas(path: Path, inicio_dados: int, amostra: int) -> Optional[int]:
+    """Total de linhas estimado pelo tamanho médio das primeiras linhas de dados."""
+    with open(path, "rb") as f:
+        f.seek(inicio_dados)
+        lidos = linhas = 0
+        for linha in f:
+            lidos += len(linha)
+            linhas += 1
+            if linhas >= amostra:
+                break
+    if not linhas:
+        return 0
+    return round((path.stat().st_size - inicio_dados) / (lidos / linhas))
+
+
+def perfil_arquivo(path: Path, args):
+    print(f"\n{'=' * 80}\n📁 {path}\n{'=' * 80}")
+    if not path.exists():
+        print("❌ Arquivo não encontrado")
+        return
+    encoding, sep, colunas, inicio_dados = detect_csv_format(path)
+    tamanho = path.stat().st_size
+    print(f"   • Encoding: {encoding} | separador: {sep!r} | {len(colunas)} colunas | {tamanho / MB:,.1f} MB")
+    if args.colunas:
+        for c in colunas:
+            print(f"   • {c}")
+        return
+
+    estimadas = estimar_linhas(path, inicio_dados, args.amostra)
+    print(f"   • Linhas (estimativa): ~{estimadas:,}")
+    if path.name.startswith("MICRODADOS_ENEM_"):
+        faltando = [c for c in main.COLUNAS_UTEIS if c not in colunas]
+        print(f"   • Colunas usadas pela API: {len(main.COLUNAS_UTEIS) - len(faltando)}/{len(main.COLUNAS_UTEIS)}"
+              + (f" (faltam: {', '.join(faltando)})" if faltando else ""))
+
+    df = pd.read_csv(path, sep=sep, encoding=encoding, nrows=args.amostra, low_memory=False)
+    df.columns = [c.strip() for c in df.columns]
+    print(f"\n📊 Amostra: {len(df):,} linhas")
+
+    notas = [c for c in AREAS if c in df.columns]
+    if notas:
+        print("\n📈 Notas:")
+        print(df[notas].describe().round(1).to_string())
+    presencas = [c for c in PRESENCAS if c in df.columns]
+    if presencas:
+        print("\n✅ Presença:")
+        for col in presencas:
+            print(f"   • {col.replace('TP_PRESENCA_', '')}: {100 * (df[col] == 1).mean():.1f}% presentes")
+    if "SG_UF_RESIDENCIA" in df.columns:
+        top = df["SG_UF_RESIDENCIA"].value_counts().head(5)
+        print("\n🗺️ UFs (top 5): " + ", ".join(f"{uf} {n:,}" for uf, n in top.items()))
+    if "TP_ESCOLA" in df.columns:
+        dist = df["TP_ESCOLA"].value_counts(normalize=True).sort_index()
+        print("🏫 TP_ESCOLA: " + ", ".join(f"{TIPOS_ESCOLA.get(t, t)} {100 * p:.1f}%" for t, p in dist.items()))
+
+    _, relatorio, _ = data_quality.validar(df)
+    print(f"\n🧪 Qualidade na amostra: {relatorio['linhas_em_quarentena']:,} linhas em quarentena"
+          + (f" {relatorio['linhas_por_regra']}" if relatorio["linhas_por_regra"] else ""))
+
+    if args.completo:
+        print(f"\n🔎 Leitura completa ({args.workers} processos)")
+        inicio = time.perf_counter()
+        completo = ler_csv(path, args.workers, path.name)
+        decorrido = time.perf_counter() - inicio
+        relatorio = completo.attrs.get("qualidade", {}).get("relatorio") or data_quality.relatorio_vazio()
+        print(f"   ✓ {relatorio['linhas_lidas']:,} linhas em {vazao(tamanho, relatorio['linhas_lidas'], decorrido)}")
+        print(f"   • Memória: {completo.memory_usage(deep=True).sum() / MB:,.1f} MB")
+        descrito = data_quality.descrever(relatorio)
+        print(f"   • Quarentena: {relatorio['linhas_em_quarentena']:,} ({descrito['taxa_quarentena']:.2f}%), "
+              f"malformadas: {relatorio['linhas_ignoradas']:,} ({descrito['taxa_ignoradas']:.2f}%)")
+        for regra, cols in relatorio["regras"].items():
+            print(f"     - {regra}: {cols}")
+
+
+def cmd_perfil(args) -> int:
+    arquivos = [Path(a) for a in args.arquivos] or [csv_do_ano(y) for y in args.anos]
+    for path in arquivos:
+        perfil_arquivo(path, args)
+    return 0
+
+
+# ==========================================
+#   AQUECER
+# ==========================================
+
+def aquecer_url(url: str, anos: List[int], timeout: float) -> int:
+    """Faz uma requisição a cada rota do dashboard por ano (as primeiras disparam a carga)."""
+    rotas = []
+    for rota in ROTAS_DASHBOARD:
+        for y in (anos if "{ano}" in rota else anos[:1]):
+            rotas.append(rota.format(ano=y))
+    falhas = 0
+    for i, rota in enumerate(rotas, 1):
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url.rstrip("/") + rota, timeout=timeout) as resposta:
+                tamanho = len(resposta.read())
+                status = resposta.status
+        except (urllib.error.URLError, OSError) as e:
+            status, tamanho = getattr(e, "code", "falha"), 0
+        ms = (time.perf_counter() - inicio) * 1000
+        if status != 200:
+            falhas += 1
+        print(f"   [{i}/{len(rotas)}] {status} {rota} ({ms:,.0f}ms, {tamanho / 1024:,.1f} KB)")
+    print(f"{'✅' if not falhas else '⚠'} {len(rotas) - falhas}/{len(rotas)} rotas aquecidas")
+    return 0 if not falhas else 1
+
+
+def cmd_aquecer(args) -> int:
+    if args.url:
+        return aquecer_url(args.url, args.anos, args.timeout)
+
+    store = SummaryStore(main.SUMMARY_STORE)
+    for year in args.anos:
+        if main.dataset_remoto is None and columnar_cache.disponivel() and main.USE_PARQUET_CACHE:
+            converter_ano(year, args.workers)
+        if resumo_atualizado(store, year):
+            print(f"✓ {year}: resumo já atualizado")
+            continue
+        # remoto: a carga preenche o cache de blocos em disco; local: lê o Parquet recém-gerado
+        inicio = time.perf_counter()
+        df_micro, _ = main.carregar_ano(year)
+        if df_micro.empty:
+            print(f"⚠ {year}: sem microdados")
+            continue
+        store.salvar(calcular_resumo(year, df_micro, versao=main.assinatura_arquivos(year)))
+        print(f"✓ {year}: resumo gravado ({len(df_micro):,} linhas, {time.perf_counter() - inicio:.1f}s)")
+    return 0
+
+
+# ==========================================
+#   CACHE
+# ==========================================
+
+def tamanho_pasta(pasta: Path) -> Tuple[int, int]:
+    arquivos = [p for p in Path(pasta).rglob("*") if p.is_file()] if Path(pasta).exists() else []
+    return len(arquivos), sum(p.stat().st_size for p in arquivos)
+
+
+def cmd_cache_info(args) -> int:
+    print(f"📦 Cache colunar: {main.PARQUET_CACHE_PATH}")
+    for meta in columnar_cache.listar(main.PARQUET_CACHE_PATH):
+        csv = csv_do_ano(meta["ano"])
+        if not csv.exists():
+            estado = "sem CSV de origem"
+        else:
+            estado = "fresco" if columnar_cache.fresco(main.PARQUET_CACHE_PATH, meta["ano"], csv, main.COLUNAS_UTEIS) else "desatualizado"
+        print(f"   • {meta['ano']}: {meta['linhas']:,} linhas, {meta['bytes_total'] / MB:,.1f} MB ({estado})")
+
+    n, total = tamanho_pasta(main.REMOTE_CACHE_PATH)
+    print(f"🌐 Blocos remotos: {main.REMOTE_CACHE_PATH} ({n} arquivos, {total / MB:,.1f} MB"
+          f" de {main.REMOTE_CACHE_MAX_MB:,} MB)")
+
+    store = SummaryStore(main.SUMMARY_STORE)
+    if store.existe():
+        print(f"📊 Resumos: {main.SUMMARY_STORE} ({main.SUMMARY_STORE.stat().st_size / 1024:,.1f} KB)")
+        for year, resumo in sorted(store.todos().items()):
+            estado = "atualizado" if resumo.get("versao") == main.assinatura_arquivos(year) else "desatualizado"
+            print(f"   • {year}: {resumo['inscritos']:,} inscritos ({estado})")
+    else:
+        print(f"📊 Resumos: {main.SUMMARY_STORE} (não existe)")
+    return 0
+
+
+def cmd_cache_limpar(args) -> int:
+    if not (args.parquet or args.remoto or args.resumos or args.tudo):
+        print("❌ Informe o que limpar: --parquet, --remoto, --resumos ou --tudo")
+        return 2
+    if args.parquet or args.tudo:
+        liberados = columnar_cache.limpar(main.PARQUET_CACHE_PATH) if main.PARQUET_CACHE_PATH.exists() else 0
+        print(f"🧹 Cache colunar: {liberados / MB:,.1f} MB liberados")
+    if args.remoto or args.tudo:
+        _, total = tamanho_pasta(main.REMOTE_CACHE_PATH)
+        if main.REMOTE_CACHE_PATH.exists():
+            DiskCache(main.REMOTE_CACHE_PATH, main.REMOTE_CACHE_MAX_MB * MB).limpar()
+        print(f"🧹 Blocos remotos: {total / MB:,.1f} MB liberados")
+    if args.resumos or args.tudo:
+        liberados = 0
+        for path in (main.SUMMARY_STORE, *(main.SUMMARY_STORE.with_name(main.SUMMARY_STORE.name + s) for s in ("-wal", "-shm"))):
+            if path.exists():
+                liberados += path.stat().st_size
+                path.unlink()
+        print(f"🧹 Resumos: {liberados / 1024:,.1f} KB liberados")
+    return 0
+
+
+# ==========================================
+#   BENCHMARKS
+# ==========================================
+
+def cmd_bench_leitura(args) -> int:
+    resultados = []
+    for year in args.anos:
+        csv = csv_do_ano(year)
+        if not csv.exists():
+            print(f"⚠ {year}: {csv} não encontrado, ignorado")
+            continue
+        tamanho = csv.stat().st_size
+        print(f"\n⏱ {year}: {csv.name} ({tamanho / MB:,.0f} MB), melhor de {args.repeticoes}")
+        for workers in args.workers:
+            tempos = []
+            for _ in range(args.repeticoes):
+                inicio = time.perf_counter()
+                df = ler_csv(csv, workers, f"csv x{workers}")
+                tempos.append(time.perf_counter() - inicio)
+                linhas = len(df)
+                del df
+            print(f"   CSV ({workers:>2} processos): {vazao(tamanho, linhas, min(tempos))}")
+            resultados.append({"ano": year, "fonte": "csv", "workers": workers, "segundos": min(tempos), "linhas": linhas})
+
+        if columnar_cache.disponivel() and columnar_cache.fresco(main.PARQUET_CACHE_PATH, year, csv, main.COLUNAS_UTEIS):
+            tempos = []
+            for _ in range(args.repeticoes):
+                inicio = time.perf_counter()
+                df = main.ajustar_tipos(columnar_cache.ler(main.PARQUET_CACHE_PATH, year, main.COLUNAS_UTEIS))
+                tempos.append(time.perf_counter() - inicio)
+                linhas = len(df)
+                del df
+            melhor_csv = min(r["segundos"] for r in resultados if r["ano"] == year and r["fonte"] == "csv")
+            print(f"   Parquet:            {vazao(tamanho, linhas, min(tempos))} "
+                  f"({melhor_csv / max(min(tempos), 1e-9):.1f}x o melhor CSV)")
+            resultados.append({"ano": year, "fonte": "parquet", "workers": None, "segundos": min(tempos), "linhas": linhas})
+        else:
+            print("   Parquet: sem cache fresco (rode `python educadados.py converter`)")
+
+    if args.salvar:
+        args.salvar.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+        print(f"\n💾 Resultados salvos em {args.salvar}")
+    return 0
+
+
+def cmd_bench_api(args) -> int:
+    import load_test
+
+    load_test.main_cli(args.opcoes)
+    return 0
+
+
+# ==========================================
+#   MAIN
+# ==========================================
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="educadados", description="Operação dos dados do EducaDados (ENEM)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    def com_anos(p):
+        p.add_argument("--anos", type=int, nargs="+", default=main.YEARS)
+        return p
+
+    p = com_anos(sub.add_parser("converter", help="CSV -> cache colunar Parquet"))
+    p.add_argument("--workers", type=int, default=main.CSV_WORKERS, help="processos da leitura paralela")
+    p.add_argument("--forcar", action="store_true", help="refaz mesmo com o cache fresco")
+    p.set_defaults(func=cmd_converter)
+
+    p = com_anos(sub.add_parser("resumos", help="gera o arquivo de resumos (DATA_MODE=summary)"))
+    p.add_argument("--saida", type=Path, default=main.SUMMARY_STORE)
+    p.add_argument("--forcar", action="store_true", help="refaz mesmo os resumos atualizados")
+    p.set_defaults(func=cmd_resumos)
+
+    p = com_anos(sub.add_parser("perfil", help="inspeciona CSVs (formato, colunas, amostra, qualidade)"))
+    p.add_argument("arquivos", nargs="*", help="CSVs a inspecionar (padrão: microdados de --anos)")
+    p.add_argument("--amostra", type=int, default=5000, help="linhas lidas na amostra")
+    p.add_argument("--colunas", action="store_true", help="só lista as colunas do cabeçalho")
+    p.add_argument("--completo", action="store_true", help="lê o arquivo inteiro (vazão e qualidade completas)")
+    p.add_argument("--workers", type=int, default=main.CSV_WORKERS)
+    p.set_defaults(func=cmd_perfil)
+
+    p = com_anos(sub.add_parser("aquecer", help="preenche os caches em disco (ou de uma API com --url)"))
+    p.add_argument("--url", help="API rodando (ex.: http://localhost:8000)")
+    p.add_argument("--timeout", type=float, default=600.0, help="timeout por requisição com --url (s)")
+    p.add_argument("--workers", type=int, default=main.CSV_WORKERS)
+    p.set_defaults(func=cmd_aquecer)
+
+    cache = sub.add_parser("cache", help="informações e limpeza dos caches").add_subparsers(dest="acao", required=True)
+    cache.add_parser("info", help="conteúdo e validade dos caches").set_defaults(func=cmd_cache_info)
+    p = cache.add_parser("limpar", help="apaga caches")
+    p.add_argument("--parquet", action="store_true", help="cache colunar")
+    p.add_argument("--remoto", action="store_true", help="blocos baixados do dataset remoto")
+    p.add_argument("--resumos", action="store_true", help="arquivo de resumos (SQLite)")
+    p.add_argument("--tudo", action="store_true")
+    p.set_defaults(func=cmd_cache_limpar)
+
+    bench = sub.add_parser("bench", help="benchmarks").add_subparsers(dest="alvo", required=True)
+    p = com_anos(bench.add_parser("leitura", help="vazão da carga: CSV x cache Parquet"))
+    p.add_argument("--workers", type=int, nargs="+", default=[main.CSV_WORKERS],
+                   help="números de processos a comparar (ex.: 1 4 8)")
+    p.add_argument("--repeticoes", type=int, default=1)
+    p.add_argument("--salvar", type=Path, help="grava os resultados em JSON")
+    p.set_defaults(func=cmd_bench_leitura)
+    # as opções desconhecidas vão para o load_test.py (ex.: --concorrencia 32 --duracao 30)
+    p = bench.add_parser("api", help="teste de carga (aceita as opções do load_test.py)", add_help=False)
+    p.set_defaults(func=cmd_bench_api, repassa_opcoes=True)
+    return parser
+
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = criar_parser()
+    args, extras = parser.parse_known_args(argv)
+    if extras and not getattr(args, "repassa_opcoes", False):
+        parser.error(f"argumentos não reconhecidos: {' '.join(extras)}")
+    args.opcoes = extras
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+"""
+Exportação de recortes dos microdados em streaming (CSV, NDJSON ou Arrow IPC).
+
+O DataFrame do ano é percorrido em blocos de LINHAS_POR_BLOCO linhas: cada
+bloco é filtrado, projetado e codificado, e só então o próximo é lido. Como o
+StreamingResponse só pede o próximo pedaço depois de enviar o anterior, a
+memória usada não depende do tamanho do resultado.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Dict, Iterator, List, Optional
+
+from lazy_imports import preguicoso
+
+pd = preguicoso("pandas")
+
+LINHAS_POR_BLOCO = 50_000
+
+
+def blocos_filtrados(df: pd.DataFrame, colunas: List[str], filtros: Dict[str, object],
+                     limite: int, tamanho: int = LINHAS_POR_BLOCO) -> Iterator[pd.DataFrame]:
+    """Blocos de df com as linhas que atendem a filtros (coluna == valor), até `limite` linhas."""
+    restantes = limite
+    for inicio in range(0, len(df), tamanho):
+        if restantes <= 0:
+            return
+        bloco = df.iloc[inicio:inicio + tamanho]
+        if filtros:
+            mascara = None
+            for coluna, valor in filtros.items():
+                m = (bloco[coluna] == valor).to_numpy()
+                mascara = m if mascara is None else mascara & m
+            bloco = bloco[mascara]
+        if len(bloco) == 0:
+            continue
+        bloco = bloco[colunas].iloc[:restantes]
+        restantes -= len(bloco)
+        yield bloco
+
+
+def _csv(blocos: Iterator[pd.DataFrame], modelo: pd.DataFrame) -> Iterator[bytes]:
+    yield modelo.to_csv(index=False).encode("utf-8")
+    for bloco in blocos:
+        yield bloco.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _ndjson(blocos: Iterator[pd.DataFrame], modelo: pd.DataFrame) -> Iterator[bytes]:
+    # float32 tem ~7 dígitos significativos: sem arredondar, 459.6 sairia como 459.6000061035
+    float32 = [c for c in modelo.columns if modelo[c].dtype == "float32"]
+    for bloco in blocos:
+        if float32:
+            bloco = bloco.astype({c: "float64" for c in float32}).round({c: 4 for c in float32})
+        yield bloco.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+
+
+def _arrow(blocos: Iterator[pd.DataFrame], modelo: pd.DataFrame) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    saida = io.BytesIO()
+    schema = pa.Schema.from_pandas(modelo, preserve_index=False)
+    escritor = pa.ipc.new_stream(saida, schema)
+    for bloco in blocos:
+        escritor.write_batch(pa.RecordBatch.from_pandas(bloco, schema=schema, preserve_index=False))
+        yield saida.getvalue()
+        saida.seek(0)
+        saida.truncate()
+    escritor.close()
+    yield saida.getvalue()
+
+
+# formato -> (media type, extensão, codificador)
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv", _csv),
+    "ndjson": ("application/x-ndjson", "ndjson", _ndjson),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", _arrow),
+}
+
+
+def formato_disponivel(formato: str) -> Optional[str]:
+    """Mensagem de erro se o formato não puder ser gerado, ou None."""
+    if formato not in FORMATOS:
+        return f"formato deve ser um de {list(FORMATOS)}"
+    if formato == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return "formato arrow requer o pacote pyarrow"
+    return None
+
+
+def exportar(df: pd.DataFrame, formato: str, colunas: List[str], filtros: Dict[str, object], limite: int) -> Iterator[bytes]:
+    _, _, codificador = FORMATOS[formato]
+    return codificador(blocos_filtrados(df, colunas, filtros, limite), df[colunas].iloc[:0])
@@ -0,0 +1,148 @@
+"""
+Agregados por município (árvore UF -> municípios) calculados na carga do ano.
+
+Para cada nível (município da prova ou da escola) os momentos de cada área
+são acumulados com bincount sobre o código do município, e os rankings ficam
+pré-ordenados. Os endpoints de drill-down só filtram e paginam essas listas.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from lazy_imports import preguicoso
+from summaries import AREAS, OBJETIVAS, descrever, momentos_por_grupo, somar_momentos
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+# nível -> (código do município, nome do município, UF do município)
+NIVEIS = {
+    "prova": ("CO_MUNICIPIO_PROVA", "NO_MUNICIPIO_PROVA", "SG_UF_PROVA"),
+    "escola": ("CO_MUNICIPIO_ESC", "NO_MUNICIPIO_ESC", "SG_UF_ESC"),
+}
+
+# critérios de ordenação disponíveis: inscritos, média das objetivas ou uma área
+ORDENS = ["inscritos", "media", *AREAS]
+
+
+def _texto(valor) -> Optional[str]:
+    return None if valor is None or (isinstance(valor, float) and np.isnan(valor)) else str(valor)
+
+
+def valor_ordem(municipio: dict, ordem: str) -> Optional[float]:
+    if ordem == "inscritos":
+        return municipio["inscritos"]
+    if ordem == "media":
+        return municipio["media_geral"]
+    m = municipio["areas"].get(ordem)
+    return m["soma"] / m["n"] if m and m["n"] else None
+
+
+def arvore_municipios(df: pd.DataFrame, nivel: str) -> Optional[dict]:
+    """{"municipios": {código: nó}, "estados": {uf: nó com lista de códigos}, "rankings": {ordem: [códigos]}}."""
+    col_cod, col_nome, col_uf = NIVEIS[nivel]
+    if col_cod not in df.columns:
+        return None
+    areas = [a for a in AREAS if a in df.columns]
+
+    codigos, unicos = pd.factorize(df[col_cod], sort=True)
+    k = len(unicos)
+    validos = np.flatnonzero(codigos >= 0)
+    inscritos = np.bincount(codigos[validos], minlength=k)
+    por_area = {a: momentos_por_grupo(codigos, k, df[a].to_numpy()) for a in areas}
+
+    # nome e UF vêm da primeira linha de cada município
+    _, primeira = np.unique(codigos[validos], return_index=True)
+    linhas = validos[primeira]
+    nomes = df[col_nome].to_numpy()[linhas] if col_nome in df.columns else [None] * k
+    ufs = df[col_uf].to_numpy()[linhas] if col_uf in df.columns else [None] * k
+    return montar_arvore(nivel, [int(c) for c in unicos], nomes, ufs, inscritos, por_area)
+
+
+def montar_arvore(nivel: str, codigos: List[int], nomes, ufs, inscritos, por_area: Dict[str, dict]) -> dict:
+    """
+    Árvore do nível a partir dos agregados por município (na ordem de `codigos`):
+    nome, UF, inscritos e {área: {"n", "soma", "soma_q"}} em vetores. Usada pelo
+    caminho pandas e pelo DuckDB.
+    """
+    areas = list(por_area)
+    municipios, estados = {}, {}
+    for i, cod in enumerate(codigos):
+        chave = str(cod)
+        momentos = {
+            a: {"n": int(m["n"][i]), "soma": float(m["soma"][i]), "soma_q": float(m["soma_q"][i])}
+            for a, m in por_area.items()
+        }
+        objetivas = [momentos[a]["soma"] / momentos[a]["n"] for a in OBJETIVAS if a in momentos and momentos[a]["n"]]
+        uf = _texto(ufs[i])
+        municipios[chave] = {
+            "codigo": cod,
+            "nome": _texto(nomes[i]),
+            "uf": uf,
+            "inscritos": int(inscritos[i]),
+            "areas": momentos,
+            "media_geral": sum(objetivas) / len(objetivas) if objetivas else None,
+        }
+        estados.setdefault(uf or "", []).append(chave)
+
+    arvore_estados = {}
+    for uf, chaves in sorted(estados.items()):
+        arvore_estados[uf] = {
+            "inscritos": sum(municipios[c]["inscritos"] for c in chaves),
+            "areas": {a: somar_momentos(municipios[c]["areas"][a] for c in chaves) for a in areas},
+            "municipios": chaves,
+        }
+
+    rankings = {}
+    for ordem in ORDENS:
+        com_valor = [(valor_ordem(m, ordem), c) for c, m in municipios.items()]
+        com_valor = [(v, c) for v, c in com_valor if v is not None]
+        rankings[ordem] = [c for _, c in sorted(com_valor, key=lambda vc: vc[0], reverse=True)]
+
+    return {"nivel": nivel, "municipios": municipios, "estados": arvore_estados, "rankings": rankings}
+
+
+def calcular_arvores(df: pd.DataFrame) -> Dict[str, Optional[dict]]:
+    return {nivel: arvore_municipios(df, nivel) for nivel in NIVEIS}
+
+
+def descrever_municipio(municipio: dict, completo: bool = False) -> dict:
+    """Nó do município no formato da API (médias; com IC por área se completo)."""
+    saida = {
+        "codigo": municipio["codigo"],
+        "nome": municipio["nome"],
+        "uf": municipio["uf"],
+        "inscritos": municipio["inscritos"],
+        "medias": {a: (m["soma"] / m["n"] if m["n"] else None) for a, m in municipio["areas"].items()},
+        "media_geral": municipio["media_geral"],
+    }
+    if completo:
+        saida["areas"] = {a: descrever(m) for a, m in municipio["areas"].items()}
+    return saida
+
+
+def pagina_ranking(arvore: dict, ordem: str, sentido: str = "desc", uf: Optional[str] = None,
+                   min_participantes: int = 0, pagina: int = 1, limite: int = 20) -> dict:
+    """Top-N (desc) ou bottom-N (asc) da lista pré-ordenada, filtrada por UF e nº mínimo de participantes."""
+    municipios = arvore["municipios"]
+    codigos: List[str] = arvore["rankings"][ordem]
+    if sentido == "asc":
+        codigos = codigos[::-1]
+    if uf:
+        codigos = [c for c in codigos if municipios[c]["uf"] == uf]
+    if min_participantes:
+        def participantes(c):
+            m = municipios[c]
+            if ordem in AREAS:
+                return m["areas"][ordem]["n"]
+            return m["inscritos"]
+        codigos = [c for c in codigos if participantes(c) >= min_participantes]
+
+    inicio = (pagina - 1) * limite
+    return {
+        "total": len(codigos),
+        "pagina": pagina,
+        "limite": limite,
+        "municipios": [descrever_municipio(municipios[c]) for c in codigos[inicio:inicio + limite]],
+    }
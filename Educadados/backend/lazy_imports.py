@@ -0,0 +1,75 @@
+"""
+Import preguiçoso da pilha de análise (pandas, NumPy).
+
+`pd = preguicoso("pandas")` devolve um substituto que só importa o módulo no
+primeiro acesso a um atributo (pd.DataFrame, np.bincount...). Assim o app e
+as rotas de health sobem sem pagar as centenas de milissegundos do import do
+pandas; quem usa os dados paga na primeira chamada (ou o aquecimento em
+segundo plano paga antes).
+
+Anotações de tipo com pd./np. exigem `from __future__ import annotations`
+no módulo, para não serem avaliadas na definição da função.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Iterable, List
+
+# pilha importada em segundo plano na subida da API
+PILHA_ANALITICA = ("numpy", "pandas")
+
+
+class ModuloPreguicoso:
+    """Substituto de um módulo que o importa no primeiro acesso a um atributo."""
+
+    def __init__(self, nome: str):
+        self.__dict__["_nome"] = nome
+        self.__dict__["_modulo"] = None
+
+    def _carregar(self) -> ModuleType:
+        modulo = self.__dict__["_modulo"]
+        if modulo is None:
+            modulo = importlib.import_module(self.__dict__["_nome"])
+            self.__dict__["_modulo"] = modulo
+        return modulo
+
+    def __getattr__(self, atributo: str):
+        return getattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self) -> str:
+        estado = "carregado" if self.__dict__["_modulo"] is not None else "não carregado"
+        return f"<módulo preguiçoso {self.__dict__['_nome']} ({estado})>"
+
+
+def preguicoso(nome: str) -> ModuloPreguicoso:
+    return ModuloPreguicoso(nome)
+
+
+def carregados(nomes: Iterable[str] = PILHA_ANALITICA) -> bool:
+    """True se todos os módulos já foram importados neste processo."""
+    return all(n in sys.modules for n in nomes)
+
+
+def importados(nomes: Iterable[str] = PILHA_ANALITICA) -> List[str]:
+    """Quais dos módulos já foram importados neste processo."""
+    return [n for n in nomes if n in sys.modules]
+
+
+def precarregar(nomes: Iterable[str] = PILHA_ANALITICA):
+    """Importa os módulos (para rodar numa thread em segundo plano)."""
+    inicio = time.perf_counter()
+    for nome in nomes:
+        importlib.import_module(nome)
+    print(f"📚 Pilha de análise importada em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+
+
+def precarregar_em_segundo_plano(nomes: Iterable[str] = PILHA_ANALITICA) -> threading.Thread:
+    thread = threading.Thread(target=precarregar, args=(tuple(nomes),), daemon=True, name="imports")
+    thread.start()
+    return thread
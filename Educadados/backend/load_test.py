@@ -0,0 +1,304 @@
+"""
+Teste de carga da API: reproduz o uso do dashboard com vários usuários simultâneos.
+
+Execute:
+    python load_test.py                                   # API em processo (sem rede)
+    python load_test.py --url http://localhost:8000       # API já rodando
+    python load_test.py --duracao 30 --concorrencia 32 --salvar base.json
+    python load_test.py --comparar base.json              # sai com código 1 se houver regressão
+    python load_test.py --partida                         # /health responde em até LIMITE_PARTIDA s?
+
+Cada usuário virtual repete sessões sorteadas com os pesos de CENARIOS
+(abrir o dashboard, trocar de ano, abrir uma aba...). No fim sai, por
+endpoint, RPS, latências p50/p95/p99 e taxa de erros.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+ANOS_PADRAO = [2022, 2023, 2024]
+
+# cenário -> (peso, [(nome do endpoint, caminho com {ano})]); reflete as chamadas do dashboard.js
+CENARIOS = {
+    "abrir_dashboard": (30, [
+        ("/health", "/health"),
+        ("/api/enem/estatisticas/{ano}", "/api/enem/estatisticas/{ano}"),
+        ("/api/enem/areas/{ano}", "/api/enem/areas/{ano}"),
+    ]),
+    "trocar_ano": (25, [
+        ("/api/enem/estatisticas/{ano}", "/api/enem/estatisticas/{ano}"),
+        ("/api/enem/areas/{ano}", "/api/enem/areas/{ano}"),
+    ]),
+    "aba_estados": (12, [("/api/enem/por-estado/{ano}", "/api/enem/por-estado/{ano}?top=10")]),
+    "aba_evolucao": (10, [("/api/enem/evolucao", "/api/enem/evolucao")]),
+    "aba_escolas": (8, [("/api/enem/por-escola/{ano}", "/api/enem/por-escola/{ano}")]),
+    "aba_presenca": (8, [("/api/enem/presenca/{ano}", "/api/enem/presenca/{ano}")]),
+    "aba_insights": (7, [("/api/enem/insights", "/api/enem/insights")]),
+}
+
+# limites de --comparar: quanto pior que a base conta como regressão
+TOLERANCIA_LATENCIA = 0.20   # p95/p99 até 20% maiores
+TOLERANCIA_RPS = 0.20        # RPS até 20% menor
+TOLERANCIA_ERROS = 1.0       # taxa de erros até 1 ponto percentual maior
+
+# --partida: segundos entre iniciar o processo do uvicorn e o primeiro 200 em /health
+LIMITE_PARTIDA = 3.0
+PORTA_PARTIDA = 8799
+
+
+class Medicoes:
+    """Latências (ms) e erros por endpoint."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = {}
+        self.erros: Dict[str, int] = {}
+        self.status: Dict[str, Dict[str, int]] = {}
+
+    def registrar(self, nome: str, ms: float, status: Optional[int]):
+        self.latencias.setdefault(nome, []).append(ms)
+        chave = str(status) if status is not None else "falha"
+        contagem = self.status.setdefault(nome, {})
+        contagem[chave] = contagem.get(chave, 0) + 1
+        if status is None or status >= 400:
+            self.erros[nome] = self.erros.get(nome, 0) + 1
+
+    @staticmethod
+    def _resumir(latencias: List[float], erros: int, duracao: float) -> dict:
+        ms = np.asarray(latencias)
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (None, None, None)
+        return {
+            "requisicoes": len(ms),
+            "rps": len(ms) / duracao if duracao > 0 else 0.0,
+            "p50_ms": float(p50) if p50 is not None else None,
+            "p95_ms": float(p95) if p95 is not None else None,
+            "p99_ms": float(p99) if p99 is not None else None,
+            "max_ms": float(ms.max()) if len(ms) else None,
+            "erros": erros,
+            "taxa_erros": 100.0 * erros / len(ms) if len(ms) else 0.0,
+        }
+
+    def relatorio(self, duracao: float) -> dict:
+        endpoints = {
+            nome: {**self._resumir(lat, self.erros.get(nome, 0), duracao), "status": self.status[nome]}
+            for nome, lat in sorted(self.latencias.items())
+        }
+        todas = [ms for lat in self.latencias.values() for ms in lat]
+        return {
+            "duracao_s": duracao,
+            "total": self._resumir(todas, sum(self.erros.values()), duracao),
+            "endpoints": endpoints,
+        }
+
+
+async def requisitar(cliente: httpx.AsyncClient, nome: str, caminho: str, medicoes: Medicoes):
+    inicio = time.perf_counter()
+    try:
+        resposta = await cliente.get(caminho)
+        await resposta.aread()
+        status = resposta.status_code
+    except httpx.HTTPError:
+        status = None
+    medicoes.registrar(nome, (time.perf_counter() - inicio) * 1000, status)
+
+
+async def usuario(cliente: httpx.AsyncClient, rng: random.Random, anos: List[int], fim: float,
+                  restantes: List[int], medicoes: Medicoes):
+    """Um usuário virtual: sessões sorteadas até acabar o tempo ou o total de requisições."""
+    nomes = list(CENARIOS)
+    pesos = [CENARIOS[n][0] for n in nomes]
+    ano = rng.choice(anos)
+    while time.perf_counter() < fim and restantes[0] > 0:
+        cenario = rng.choices(nomes, pesos)[0]
+        if cenario == "trocar_ano" and len(anos) > 1:
+            ano = rng.choice([a for a in anos if a != ano])
+        for nome, caminho in CENARIOS[cenario][1]:
+            if time.perf_counter() >= fim or restantes[0] <= 0:
+                return
+            restantes[0] -= 1
+            await requisitar(cliente, nome, caminho.format(ano=ano), medicoes)
+
+
+async def esperar_pronta(cliente: httpx.AsyncClient, limite: float) -> bool:
+    """Espera /health/ready responder 200 (anos de READY_YEARS carregados)."""
+    fim = time.perf_counter() + limite
+    while time.perf_counter() < fim:
+        try:
+            if (await cliente.get("/health/ready")).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    return False
+
+
+async def executar(cliente: httpx.AsyncClient, args) -> dict:
+    if args.esperar and not await esperar_pronta(cliente, args.esperar):
+        print(f"⚠ API não ficou pronta em {args.esperar:.0f}s; medindo assim mesmo")
+
+    if args.aquecimento:
+        # uma sessão de cada cenário por ano, fora das medições
+        for ano in args.anos:
+            for _, chamadas in CENARIOS.values():
+                for _, caminho in chamadas:
+                    await cliente.get(caminho.format(ano=ano))
+
+    medicoes = Medicoes()
+    rng = random.Random(args.semente)
+    restantes = [args.requisicoes or sys.maxsize]
+    inicio = time.perf_counter()
+    fim = inicio + args.duracao if args.duracao else float("inf")
+    await asyncio.gather(*(
+        usuario(cliente, random.Random(rng.random()), args.anos, fim, restantes, medicoes)
+        for _ in range(args.concorrencia)
+    ))
+    relatorio = medicoes.relatorio(time.perf_counter() - inicio)
+    relatorio["config"] = {
+        "alvo": args.url or "em processo",
+        "concorrencia": args.concorrencia,
+        "anos": args.anos,
+        "semente": args.semente,
+    }
+    return relatorio
+
+
+async def rodar_em_processo(args) -> dict:
+    """Sobe o app do main.py no mesmo processo (com lifespan) e usa o transporte ASGI do httpx."""
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        transporte = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://educadados", timeout=args.timeout) as cliente:
+            return await executar(cliente, args)
+
+
+async def rodar_na_url(args) -> dict:
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limites) as cliente:
+        return await executar(cliente, args)
+
+
+def medir_partida(limite: float, porta: int) -> bool:
+    """Sobe `uvicorn main:app` em outro processo e mede quanto tempo /health leva para responder."""
+    pasta = Path(__file__).resolve().parent
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta), "--log-level", "warning"],
+        cwd=pasta, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        corpo = None
+        with httpx.Client(base_url=f"http://127.0.0.1:{porta}", timeout=1.0) as cliente:
+            while time.perf_counter() - inicio < max(limite * 3, 10) and processo.poll() is None:
+                try:
+                    resposta = cliente.get("/health")
+                    if resposta.status_code == 200:
+                        corpo = resposta.json()
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+        decorrido = time.perf_counter() - inicio
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+    if corpo is None:
+        print(f"❌ /health não respondeu (processo {'encerrado' if processo.returncode else 'sem resposta'})")
+        return False
+    partida = corpo.get("startup", {})
+    print(f"🚀 /health respondeu {decorrido:.2f}s após iniciar o processo (limite: {limite:.1f}s)")
+    if partida:
+        print(f"   import do main.py: {partida['import_ms']:.0f}ms (orçamento: {partida['import_budget_ms']:.0f}ms)")
+        print(f"   pandas/NumPy já importados: {'sim' if partida['analytics_loaded'] else 'não'}")
+    ok = decorrido <= limite and (not partida or partida["import_ms"] <= partida["import_budget_ms"])
+    print("✅ Partida dentro do limite" if ok else "❌ Partida acima do limite")
+    return ok
+
+
+def _ms(valor: Optional[float]) -> str:
+    return f"{valor:8.1f}" if valor is not None else "       -"
+
+
+def imprimir(relatorio: dict):
+    cfg = relatorio["config"]
+    print(f"\n📊 {cfg['alvo']} | {cfg['concorrencia']} usuários | {relatorio['duracao_s']:.1f}s")
+    print(f"{'endpoint':<34} {'req':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>7}")
+    linhas = list(relatorio["endpoints"].items()) + [("TOTAL", relatorio["total"])]
+    for nome, m in linhas:
+        print(f"{nome:<34} {m['requisicoes']:>7} {m['rps']:>8.1f} {_ms(m['p50_ms'])} {_ms(m['p95_ms'])} "
+              f"{_ms(m['p99_ms'])} {m['taxa_erros']:>6.1f}%")
+
+
+def comparar(atual: dict, base: dict) -> List[str]:
+    """Regressões do relatório atual em relação à base (lista vazia se nenhuma)."""
+    regressoes = []
+    pares = [("TOTAL", atual["total"], base["total"])]
+    pares += [(n, m, base["endpoints"][n]) for n, m in atual["endpoints"].items() if n in base["endpoints"]]
+    for nome, m, b in pares:
+        for chave in ("p95_ms", "p99_ms"):
+            if m[chave] is not None and b[chave] and m[chave] > b[chave] * (1 + TOLERANCIA_LATENCIA):
+                regressoes.append(f"{nome}: {chave} {b[chave]:.1f} -> {m[chave]:.1f}")
+        if b["rps"] and m["rps"] < b["rps"] * (1 - TOLERANCIA_RPS):
+            regressoes.append(f"{nome}: rps {b['rps']:.1f} -> {m['rps']:.1f}")
+        if m["taxa_erros"] > b["taxa_erros"] + TOLERANCIA_ERROS:
+            regressoes.append(f"{nome}: erros {b['taxa_erros']:.1f}% -> {m['taxa_erros']:.1f}%")
+    return regressoes
+
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API com o padrão de uso do dashboard")
+    parser.add_argument("--url", help="API já rodando (ex.: http://localhost:8000); sem isso, sobe o app em processo")
+    parser.add_argument("--concorrencia", type=int, default=16, help="usuários virtuais simultâneos")
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos de medição (0 = só --requisicoes)")
+    parser.add_argument("--requisicoes", type=int, default=0, help="para depois de N requisições")
+    parser.add_argument("--anos", type=int, nargs="+", default=ANOS_PADRAO)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0, help="timeout de cada requisição (s)")
+    parser.add_argument("--esperar", type=float, default=600.0, help="espera até N s por /health/ready (0 = não espera)")
+    parser.add_argument("--sem-aquecimento", dest="aquecimento", action="store_false",
+                        help="mede também as primeiras requisições (caches frios)")
+    parser.add_argument("--salvar", type=Path, help="grava o relatório em JSON (para usar como base)")
+    parser.add_argument("--comparar", type=Path, help="relatório base; sai com código 1 se houver regressão")
+    parser.add_argument("--partida", action="store_true",
+                        help="só mede a subida: /health deve responder em até --limite-partida segundos")
+    parser.add_argument("--limite-partida", type=float, default=LIMITE_PARTIDA)
+    parser.add_argument("--porta-partida", type=int, default=PORTA_PARTIDA)
+    args = parser.parse_args(argv)
+    if args.partida:
+        sys.exit(0 if medir_partida(args.limite_partida, args.porta_partida) else 1)
+    if not args.duracao and not args.requisicoes:
+        parser.error("informe --duracao ou --requisicoes")
+
+    relatorio = asyncio.run(rodar_na_url(args) if args.url else rodar_em_processo(args))
+    imprimir(relatorio)
+
+    if args.salvar:
+        args.salvar.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Relatório salvo em {args.salvar}")
+
+    if args.comparar:
+        regressoes = comparar(relatorio, json.loads(args.comparar.read_text(encoding="utf-8")))
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressão(ões) em relação a {args.comparar}:")
+            for r in regressoes:
+                print(f"   - {r}")
+            sys.exit(1)
+        print(f"\n✅ Sem regressões em relação a {args.comparar}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,9 +1,44 @@
-import uvicorn
-from fastapi import FastAPI, HTTPException
+from __future__ import annotations
+
+import time
+
+# tempo de import do módulo (orçamento em IMPORT_BUDGET_MS); pandas/NumPy ficam fora dele
+_INICIO_IMPORT = time.perf_counter()
+
+import asyncio
+import gc
+import hashlib
+import json
+import os
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
-import pandas as pd
-from typing import Tuple
+from typing import Optional, Tuple
+
+import columnar_cache
+import data_quality
+import sampling
+from comparison import ALFA_PADRAO, comparar
+from crosstab import QUANTIS_PADRAO, cruzar, rotulo_escola, validar_parametros
+from duckdb_backend import (calcular_arvores_duckdb, calcular_resumo_duckdb, colunas_da_fonte, cruzar_duckdb,
+                            exportar_duckdb, indice_percentis_duckdb, qualidade_duckdb)
+from export import FORMATOS, exportar, formato_disponivel
+from geography import NIVEIS, ORDENS, calcular_arvores, descrever_municipio, pagina_ranking
+from lazy_imports import carregados, importados, precarregar_em_segundo_plano, preguicoso
+from parallel_csv import read_csv_parallel
+from payload_cache import PayloadCache, codificar
+from percentiles import acumulado, indice_percentis, notas_dos_percentis, percentis_das_notas
+from remote_dataset import DiskCache, RemoteDataset
+from summaries import (AREAS, COLUNAS_QUESTIONARIO, FAIXAS_RENDA, PRESENCAS, TIPOS_ESCOLA, calcular_resumo,
+                       descrever_participacao, medias, momentos_do_recorte, serie_evolucao)
+from summary_store import SummaryStore
+from tiered_store import TieredStore
+
+pd = preguicoso("pandas")
 
 # ==========================================
 #   CONFIGURAÇÃO DE DIRETÓRIOS
@@ -12,15 +47,136 @@ from typing import Tuple
 PROJECT_ROOT = Path(__file__).resolve().parent
 MICRODADOS_PATH = PROJECT_ROOT / "Microdados"
 YEARS = [2022, 2023, 2024]
+# resumos por ano e demais artefatos derivados dos microdados
+CACHE_PATH = Path(os.environ.get("CACHE_PATH", MICRODADOS_PATH / "cache"))
+
+# "raw": lê os microdados (CSV); "summary": sobe só com o arquivo de resumos,
+# sem precisar dos CSVs (endpoints de linhas brutas ficam indisponíveis)
+DATA_MODE = os.environ.get("DATA_MODE", "raw").lower()
+SUMMARY_STORE = Path(os.environ.get("SUMMARY_STORE", CACHE_PATH / "resumos.sqlite"))
+
+# backend que calcula os agregados no modo raw: "pandas" (DataFrame em memória)
+# ou "duckdb" (SQL direto sobre os arquivos, sem manter o ano em memória)
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "pandas").lower()
+
+# recarga de dados: token do endpoint admin e watcher de arquivos
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+WATCH_MICRODADOS = os.environ.get("WATCH_MICRODADOS", "false").lower() == "true"
+WATCH_INTERVAL = float(os.environ.get("WATCH_INTERVAL", "30"))
+
+# aquecimento na inicialização: anos carregados em ordem de prioridade (mais novo
+# primeiro) e anos exigidos para a API se declarar pronta (readiness)
+WARMUP = os.environ.get("WARMUP", "true").lower() == "true"
+WARMUP_YEARS = [int(y) for y in os.environ.get("WARMUP_YEARS", "").split(",") if y.strip()] or sorted(YEARS, reverse=True)
+READY_YEARS = [int(y) for y in os.environ.get("READY_YEARS", "").split(",") if y.strip()] or (WARMUP_YEARS if WARMUP else [])
+
+# fonte remota: Parquet publicado por upload_to_hf.py no Hugging Face (ou em
+# HF_DATASET_URL, ex.: servidor local de teste), com cache de blocos em disco
+USE_HUGGINGFACE = os.environ.get("USE_HUGGINGFACE", "false").lower() == "true"
+HF_DATASET = os.environ.get("HF_DATASET", "")
+HF_DATASET_URL = os.environ.get("HF_DATASET_URL", "")
+HF_ENDPOINT = os.environ.get("HF_ENDPOINT", "https://huggingface.co")
+HF_REVISION = os.environ.get("HF_REVISION", "main")
+HF_TOKEN = os.environ.get("HF_TOKEN") or None
+REMOTE_CACHE_PATH = Path(os.environ.get("REMOTE_CACHE_PATH", CACHE_PATH / "remoto"))
+REMOTE_CACHE_MAX_MB = int(os.environ.get("REMOTE_CACHE_MAX_MB", "2048"))
+
+# máximo de linhas por exportação (/api/enem/exportar)
+EXPORT_MAX_LINHAS = int(os.environ.get("EXPORT_MAX_LINHAS", "1000000"))
+
+# orçamento do tempo de import do main.py (aviso no log se estourar; ver load_test.py --partida)
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "600"))
+# importa pandas/NumPy em segundo plano logo após a subida (false: só no primeiro uso)
+PRELOAD_ANALYTICS = os.environ.get("PRELOAD_ANALYTICS", "true").lower() == "true"
+
+# orçamento das respostas pré-codificadas (/health, estatísticas e áreas)
+PAYLOAD_CACHE_MB = float(os.environ.get("PAYLOAD_CACHE_MB", "16"))
+
+# respostas aproximadas para anos frios: enquanto a carga completa roda em segundo
+# plano, estatísticas e áreas saem de uma amostra aleatória do CSV (APPROX_BLOCKS
+# trechos de APPROX_BLOCK_KB) com IC95 e "approximate": true
+APPROXIMATE = os.environ.get("APPROXIMATE", "true").lower() == "true"
+APPROX_BLOCKS = int(os.environ.get("APPROX_BLOCKS", "200"))
+APPROX_BLOCK_KB = int(os.environ.get("APPROX_BLOCK_KB", "64"))
+
+# anos carregados mantidos descomprimidos em memória; os menos acessados ficam em
+# blocos colunares comprimidos (COLD_COMPRESSION: zstd, lz4; zlib sem pyarrow)
+HOT_YEARS_MAX = int(os.environ.get("HOT_YEARS_MAX", "3"))
+COLD_COMPRESSION = os.environ.get("COLD_COMPRESSION", "zstd").lower()
+
+# cache colunar (Parquet) gerado por `python educadados.py converter`: quando está
+# fresco (mesmo CSV de origem), a carga local lê dele em vez de fazer o parse do CSV
+USE_PARQUET_CACHE = os.environ.get("USE_PARQUET_CACHE", "true").lower() == "true"
+PARQUET_CACHE_PATH = Path(os.environ.get("PARQUET_CACHE_PATH", CACHE_PATH / "parquet"))
+
+# número de processos usados na leitura paralela dos microdados
+CSV_WORKERS = int(os.environ.get("CSV_WORKERS", os.cpu_count() or 1))
+
+# colunas projetadas dos microdados e seus tipos (reduz memória e tempo de parse)
+COLUNAS_UTEIS = [
+    "NU_INSCRICAO", "NU_ANO", "CO_UF_RESIDENCIA", "SG_UF_RESIDENCIA",
+    "TP_ESCOLA", "TP_LINGUA",
+    "NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT", "NU_NOTA_REDACAO",
+    "TP_PRESENCA_CN", "TP_PRESENCA_CH", "TP_PRESENCA_LC", "TP_PRESENCA_MT",
+    *COLUNAS_QUESTIONARIO,
+    # municípios (drill-down UF -> município); anos sem essas colunas as ignoram
+    "CO_MUNICIPIO_PROVA", "NO_MUNICIPIO_PROVA", "SG_UF_PROVA",
+    "CO_MUNICIPIO_ESC", "NO_MUNICIPIO_ESC", "SG_UF_ESC",
+]
+
+# códigos que podem vir vazios (TP_*, CO_*) ficam em float32: um campo vazio vira NaN
+# em vez de derrubar a leitura paralela para a serial
+DTYPES_MICRODADOS = {
+    "NU_INSCRICAO": "int64",
+    "NU_ANO": "int16",
+    "CO_UF_RESIDENCIA": "float32",
+    "SG_UF_RESIDENCIA": "category",
+    "TP_ESCOLA": "float32",
+    "TP_LINGUA": "float32",
+    "NU_NOTA_CN": "float32",
+    "NU_NOTA_CH": "float32",
+    "NU_NOTA_LC": "float32",
+    "NU_NOTA_MT": "float32",
+    "NU_NOTA_REDACAO": "float32",
+    "TP_PRESENCA_CN": "float32",
+    "TP_PRESENCA_CH": "float32",
+    "TP_PRESENCA_LC": "float32",
+    "TP_PRESENCA_MT": "float32",
+    **{q: "category" for q in COLUNAS_QUESTIONARIO},
+    "CO_MUNICIPIO_PROVA": "float32",
+    "NO_MUNICIPIO_PROVA": "category",
+    "SG_UF_PROVA": "category",
+    "CO_MUNICIPIO_ESC": "float32",
+    "NO_MUNICIPIO_ESC": "category",
+    "SG_UF_ESC": "category",
+}
 
 # ==========================================
 #   FASTAPI
 # ==========================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia o aquecimento e o watcher em segundo plano; /health/live responde logo."""
+    # pandas/NumPy são importados em segundo plano; as rotas de health não dependem deles
+    if PRELOAD_ANALYTICS:
+        precarregar_em_segundo_plano()
+    if DATA_MODE == "summary":
+        carregar_modo_resumo()
+        yield
+        return
+    if WARMUP:
+        threading.Thread(target=aquecer, args=(WARMUP_YEARS,), daemon=True, name="warmup").start()
+    if WATCH_MICRODADOS:
+        threading.Thread(target=observar_arquivos, args=(WATCH_INTERVAL,), daemon=True, name="watcher").start()
+        print(f"👀 Observando {dataset_remoto.url_base if dataset_remoto else MICRODADOS_PATH} a cada {WATCH_INTERVAL:.0f}s")
+    yield
+
 app = FastAPI(
     title="EducaDados ENEM API",
     description="API oficial do projeto EducaDados com acesso aos Microdados do ENEM",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -66,10 +222,63 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     df = df.rename(columns=lambda c: c.strip() if isinstance(c, str) else c)
     return df
 
+def load_microdados_fallback(microdados_file: Path) -> pd.DataFrame:
+    """Leitura tradicional (serial, engine python) usada se a leitura paralela falhar."""
+    # tenta leitura robusta detectando encoding/separador
+    df_micro, used_enc = try_read_csv(microdados_file)
+    if df_micro.empty and used_enc == "":
+        print("   ❌ Não foi possível ler o arquivo de microdados com as estratégias adotadas.")
+        return pd.DataFrame()
+
+    # limpa nomes de colunas (espaços extras etc)
+    df_micro = clean_column_names(df_micro)
+
+    # Se nenhuma coluna útil estiver presente, tenta fallback: ler sem filtro e exibir colunas
+    available = [c for c in COLUNAS_UTEIS if c in df_micro.columns]
+    if available:
+        # filtra somente colunas úteis que existem (mantendo registro)
+        return df_micro[available]
+
+    # faz leitura completa e mostra colunas encontradas para debug
+    print("   ⚠ Nenhuma das colunas esperadas foi encontrada nas colunas detectadas.")
+    print("   >>> Colunas detectadas (microdados):", list(df_micro.columns)[:50])
+    # para evitar perder dados, tenta ler completo novamente com encoding latin-1 e limpar colunas
+    try:
+        df_full = pd.read_csv(microdados_file, encoding="latin-1", low_memory=False, on_bad_lines="skip")
+        df_full = clean_column_names(df_full)
+        available2 = [c for c in COLUNAS_UTEIS if c in df_full.columns]
+        if available2:
+            return df_full[available2]
+        # ainda nada: registra e zera
+        print("   ⚠ Mesmo no fallback com latin-1 não foram encontradas colunas úteis.")
+        return pd.DataFrame()
+    except Exception as e:
+        print("   ❌ Fallback completo falhou:", e)
+        return pd.DataFrame()
+
 # ==========================================
 #   FUNÇÃO ATUALIZADA DE CARREGAMENTO LOCAL
 # ==========================================
 
+def ler_cache_colunar(year: int, microdados_file: Path) -> Optional[pd.DataFrame]:
+    """Microdados do cache Parquet se ele estiver fresco; None para cair na leitura do CSV."""
+    if not USE_PARQUET_CACHE or not columnar_cache.disponivel():
+        return None
+    if not columnar_cache.fresco(PARQUET_CACHE_PATH, year, microdados_file, COLUNAS_UTEIS):
+        return None
+    try:
+        inicio = time.time()
+        df = columnar_cache.ler(PARQUET_CACHE_PATH, year, COLUNAS_UTEIS)
+        qualidade = df.attrs.pop("qualidade", None)
+        df = ajustar_tipos(df)
+        if qualidade is not None:
+            df.attrs["qualidade"] = qualidade
+        print(f"   ⚡ Lido do cache colunar em {time.time() - inicio:.1f}s")
+        return df
+    except Exception as e:
+        print(f"   ⚠ Cache colunar de {year} ilegível ({e}); lendo o CSV.")
+        return None
+
 def load_from_local(year: int):
     """Carrega dados dos arquivos CSV locais (robusto contra CSV quebrado)."""
     try:
@@ -78,56 +287,34 @@ def load_from_local(year: int):
         microdados_file = MICRODADOS_PATH / f"MICRODADOS_ENEM_{year}.csv"
         itens_file = MICRODADOS_PATH / f"ITENS_PROVA_{year}.csv"
 
-        colunas_uteis = [
-            "NU_INSCRICAO", "NU_ANO", "CO_UF_RESIDENCIA", "SG_UF_RESIDENCIA",
-            "TP_ESCOLA", "TP_LINGUA",
-            "NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT", "NU_NOTA_REDACAO",
-            "TP_PRESENCA_CN", "TP_PRESENCA_CH", "TP_PRESENCA_LC", "TP_PRESENCA_MT",
-            "Q006"
-        ]
-
         # -------------------------------
         # MICRODADOS
         # -------------------------------
         if microdados_file.exists():
 
-            print(f"   📄 Lendo arquivo: {microdados_file}")
+            df_micro = ler_cache_colunar(year, microdados_file)
+            if df_micro is None:
+                print(f"   📄 Lendo arquivo: {microdados_file}")
 
-            # tenta leitura robusta detectando encoding/separador
-            df_micro, used_enc = try_read_csv(microdados_file)
-            if df_micro.empty and used_enc == "":
-                print("   ❌ Não foi possível ler o arquivo de microdados com as estratégias adotadas.")
-                df_micro = pd.DataFrame()
-            else:
-                # limpa nomes de colunas (espaços extras etc)
-                df_micro = clean_column_names(df_micro)
-
-                # Se nenhuma coluna útil estiver presente, tenta fallback: ler sem filtro e exibir colunas
-                available = [c for c in colunas_uteis if c in df_micro.columns]
-                if not available:
-                    # faz leitura completa e mostra colunas encontradas para debug
-                    print("   ⚠ Nenhuma das colunas esperadas foi encontrada nas colunas detectadas.")
-                    print("   >>> Colunas detectadas (microdados):", list(df_micro.columns)[:50])
-                    # se df_micro tem colunas, realisticamente pode-se optar por manter e retornar vazio
-                    # para evitar perder dados, tenta ler completo novamente com encoding latin-1 e limpar colunas
-                    try:
-                        df_full = pd.read_csv(microdados_file, encoding="latin-1", low_memory=False, on_bad_lines="skip")
-                        df_full = clean_column_names(df_full)
-                        available2 = [c for c in colunas_uteis if c in df_full.columns]
-                        if available2:
-                            df_micro = df_full[available2]
-                        else:
-                            # ainda nada: registra e zera
-                            print("   ⚠ Mesmo no fallback com latin-1 não foram encontradas colunas úteis.")
-                            df_micro = pd.DataFrame()
-                    except Exception as e:
-                        print("   ❌ Fallback completo falhou:", e)
-                        df_micro = pd.DataFrame()
-                else:
-                    # filtra somente colunas úteis que existem (mantendo registro)
-                    df_micro = df_micro[available]
+                # leitura paralela por faixas de bytes (engine C, colunas projetadas)
+                try:
+                    df_micro = read_csv_parallel(
+                        microdados_file,
+                        usecols=COLUNAS_UTEIS,
+                        dtype=DTYPES_MICRODADOS,
+                        workers=CSV_WORKERS,
+                        validar=True,
+                        progresso=lambda lidos, total: marcar_progresso(year, bytes_lidos=lidos, bytes_total=total),
+                    )
+                except Exception as e:
+                    print(f"   ⚠ Leitura paralela falhou ({e}); usando leitura tradicional.")
+                    df_micro = validar_leitura(load_microdados_fallback(microdados_file))
 
             print(f"   ✓ Microdados carregados: {len(df_micro):,} registros")
+            relatorio = df_micro.attrs.get("qualidade", {}).get("relatorio")
+            if relatorio and (relatorio["linhas_em_quarentena"] or relatorio["linhas_ignoradas"]):
+                print(f"   ⚠ Qualidade: {relatorio['linhas_em_quarentena']:,} linhas em quarentena, "
+                      f"{relatorio['linhas_ignoradas']:,} malformadas ignoradas")
 
         else:
             print(f"⚠ Arquivo não encontrado: {microdados_file}")
@@ -160,58 +347,605 @@ def load_from_local(year: int):
         print(f"❌ ERRO GERAL em load_from_local({year}): {e}")
         return pd.DataFrame(), pd.DataFrame()
 
+def criar_dataset_remoto() -> Optional[RemoteDataset]:
+    if not USE_HUGGINGFACE:
+        return None
+    cache = DiskCache(REMOTE_CACHE_PATH, REMOTE_CACHE_MAX_MB * 1024 * 1024)
+    if HF_DATASET_URL:
+        return RemoteDataset(HF_DATASET_URL, cache, HF_TOKEN)
+    if not HF_DATASET:
+        raise RuntimeError("USE_HUGGINGFACE=true requer HF_DATASET (ex.: usuario/enem-dataset) ou HF_DATASET_URL")
+    return RemoteDataset.do_hub(HF_DATASET, cache, HF_ENDPOINT, HF_REVISION, HF_TOKEN)
+
+dataset_remoto = criar_dataset_remoto()
+if dataset_remoto is not None and QUERY_BACKEND == "duckdb":
+    print("⚠ QUERY_BACKEND=duckdb só lê arquivos locais: com USE_HUGGINGFACE=true os anos seguem pelo pandas")
+
+def validar_leitura(df: pd.DataFrame) -> pd.DataFrame:
+    """Valida uma leitura que não passou pelo leitor paralelo (fallback e fonte remota)."""
+    if df.empty:
+        return df
+    valido, relatorio, quarentena = data_quality.validar(df)
+    valido = valido.reset_index(drop=True)
+    valido.attrs["qualidade"] = {"relatorio": relatorio, "quarentena": quarentena}
+    return valido
+
+def ajustar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica DTYPES_MICRODADOS às colunas lidas do Parquet (mantém a coluna se não couber)."""
+    for col, tipo in DTYPES_MICRODADOS.items():
+        if col in df.columns:
+            try:
+                df[col] = df[col].astype(tipo)
+            except (TypeError, ValueError):
+                pass
+    return df
+
+def load_from_remote(year: int):
+    """Carrega o ano do dataset remoto: só as colunas úteis, com range reads e cache em disco."""
+    try:
+        print(f"🌐 Carregando dados do ENEM {year} de {dataset_remoto.url_base}...")
+        inicio = time.time()
+        df_micro = validar_leitura(ajustar_tipos(dataset_remoto.ler_ano(year, COLUNAS_UTEIS)))
+        df_itens = dataset_remoto.ler_ano(year, tipo="itens")
+        print(f"   ✓ Microdados carregados: {len(df_micro):,} registros em {time.time() - inicio:.1f}s")
+        return df_micro, df_itens
+    except Exception as e:
+        print(f"❌ ERRO GERAL em load_from_remote({year}): {e}")
+        return pd.DataFrame(), pd.DataFrame()
+
+def carregar_ano(year: int):
+    """(df_micro, df_itens) do ano a partir da fonte configurada."""
+    if dataset_remoto is not None:
+        df_micro, df_itens = load_from_remote(year)
+    else:
+        df_micro, df_itens = load_from_local(year)
+    # o relatório sai do DataFrame já aqui: o pandas copiaria attrs a cada operação
+    qualidade_carga[year] = df_micro.attrs.pop("qualidade", None)
+    return df_micro, df_itens
+
+def tem_microdados(year: int) -> bool:
+    if dataset_remoto is not None:
+        return assinatura_arquivos(year) is not None
+    return (MICRODADOS_PATH / f"MICRODADOS_ENEM_{year}.csv").exists()
+
 # ==========================================
 #   CACHE DO SISTEMA
 # ==========================================
 
-microdados_cache = {}
+# ano -> DataFrame; anos pouco acessados ficam comprimidos (tiered_store.py)
+microdados_cache = TieredStore(HOT_YEARS_MAX, COLD_COMPRESSION)
 itens_cache = {}
+versoes_cache = {}      # ano -> versão (assinatura dos arquivos carregados)
+derivados_cache = {}    # ano -> {nome: valor} calculados sobre a versão em cache
+
+# protege a troca atômica das entradas de um ano entre os caches acima
+_cache_lock = threading.RLock()
+# impede que o mesmo ano seja carregado/recarregado duas vezes em paralelo
+_carga_locks = {y: threading.Lock() for y in YEARS}
+
+# estado das recargas disparadas pelo admin ou pelo watcher
+recargas = {}
+
+# relatório de validação da última leitura de cada ano, até virar o derivado "qualidade"
+qualidade_carga = {}
+
+# bytes finais (JSON e gzip) das respostas mais pedidas pelo dashboard
+payloads = PayloadCache(int(PAYLOAD_CACHE_MB * 1024 * 1024))
+
+# prontidão por ano: pendente -> carregando -> pronto (ou vazio, se não há arquivo)
+estado_anos = {y: "pendente" for y in YEARS}
+
+# fase e bytes lidos da carga de cada ano (/api/enem/carga)
+progresso_carga = {}
+
+# estimativas por amostra dos anos ainda sem resultado exato, e as cargas disparadas por elas
+estimativas_cache = {}
+_amostra_locks = {y: threading.Lock() for y in YEARS}
+cargas_fundo = {}
+
+def marcar_progresso(year: int, **campos):
+    progresso_carga.setdefault(year, {}).update(campos)
+
+# ==========================================
+#   AGREGADOS DERIVADOS
+# ==========================================
+
+# nome -> função(ano, df_micro, df_itens) calculada a cada (re)carga do ano
+DERIVADOS = {}
+
+def derivado(nome: str):
+    """Registra um agregado pré-calculado junto com os dados de cada ano."""
+    def registrar(func):
+        DERIVADOS[nome] = func
+        return func
+    return registrar
+
+def calcular_derivados(year: int, df_micro: pd.DataFrame, df_itens: pd.DataFrame) -> dict:
+    resultado = {}
+    for nome, func in DERIVADOS.items():
+        try:
+            resultado[nome] = func(year, df_micro, df_itens)
+        except Exception as e:
+            print(f"   ⚠ Falha ao calcular '{nome}' de {year}: {e}")
+    return resultado
 
 # ==========================================
 #   CARREGAMENTO DE DADOS POR ANO
 # ==========================================
 
+def assinatura_arquivos(year: int) -> Optional[str]:
+    """Versão do ano: hash de tamanho e data de modificação dos arquivos de origem."""
+    if dataset_remoto is not None:
+        # fonte remota: hash dos SHA-256 das partições no manifest
+        try:
+            return dataset_remoto.versao_ano(year)
+        except Exception as e:
+            print(f"   ⚠ Não foi possível ler o manifest remoto: {e}")
+            return versoes_cache.get(year)
+    partes = []
+    for nome in (f"MICRODADOS_ENEM_{year}.csv", f"ITENS_PROVA_{year}.csv"):
+        path = MICRODADOS_PATH / nome
+        try:
+            st = path.stat()
+            partes.append(f"{nome}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            partes.append(f"{nome}:-")
+    return hashlib.sha1("|".join(partes).encode()).hexdigest()[:12]
+
+def publicar_ano(year: int, df_micro: pd.DataFrame, df_itens: pd.DataFrame, versao: str, derivados: dict):
+    """Troca atomicamente todas as entradas de um ano nos caches."""
+    with _cache_lock:
+        microdados_cache[year] = df_micro
+        itens_cache[year] = df_itens
+        versoes_cache[year] = versao
+        derivados_cache[year] = derivados
+        estado_anos[year] = "pronto" if len(df_micro) else "vazio"
+        # estimativas por amostra são da versão anterior (ou de antes da carga exata)
+        estimativas_cache.pop(year, None)
+    payloads.invalidar(year)
+
+def exigir_microdados():
+    if DATA_MODE == "summary":
+        raise HTTPException(status_code=409, detail="Recurso indisponível: API em modo resumo (DATA_MODE=summary), sem microdados")
+
 def load_enem_data(year: int):
     """Carrega microdados de um ano com cache"""
-    if year in microdados_cache:
+    garantir_ano(year)
+    with _cache_lock:
         return microdados_cache[year], itens_cache[year]
 
-    df_micro, df_itens = load_from_local(year)
+def garantir_ano(year: int):
+    """Carrega o ano se ainda não está em memória (sem descomprimir um ano da camada fria)."""
+    exigir_microdados()
+    with _cache_lock:
+        if year in microdados_cache:
+            return
 
-    microdados_cache[year] = df_micro
-    itens_cache[year] = df_itens
+    with _carga_locks[year]:
+        with _cache_lock:
+            if year in microdados_cache:
+                return
 
-    return df_micro, df_itens
+        estado_anos[year] = "carregando"
+        progresso_carga[year] = {"fase": "lendo", "inicio": time.time(), "bytes_lidos": 0, "bytes_total": None}
+        versao = assinatura_arquivos(year)
+        df_micro, df_itens = carregar_ano(year)
+        marcar_progresso(year, fase="agregando")
+        publicar_ano(year, df_micro, df_itens, versao, calcular_derivados(year, df_micro, df_itens))
+        marcar_progresso(year, fase="concluida", fim=time.time())
+
+def snapshot_ano(year: int):
+    """Retorna (df_micro, df_itens, versao, derivados) consistentes entre si."""
+    garantir_ano(year)
+    with _cache_lock:
+        return microdados_cache[year], itens_cache[year], versoes_cache[year], derivados_cache[year]
+
+def versao_e_derivados(year: int):
+    """(versao, derivados) do ano carregado, sem tocar no DataFrame."""
+    garantir_ano(year)
+    with _cache_lock:
+        return versoes_cache[year], derivados_cache[year]
+
+def obter_derivado(year: int, nome: str):
+    """Retorna (valor, versao) de um agregado derivado, calculando se ainda não existir."""
+    versao, derivados = versao_e_derivados(year)
+    if nome in derivados:
+        return derivados[nome], versao
+    df_micro, df_itens, versao, derivados = snapshot_ano(year)
+    if nome not in derivados:
+        derivados[nome] = DERIVADOS[nome](year, df_micro, df_itens)
+    return derivados[nome], versao
+
+# ==========================================
+#   RECARGA SEM INTERRUPÇÃO
+# ==========================================
+
+def recarregar_ano(year: int):
+    """
+    Recarrega um ano em segundo plano. Enquanto a nova versão é lida e seus
+    agregados calculados, as requisições continuam usando a versão antiga;
+    no fim tudo é trocado de uma vez.
+    """
+    recargas[year] = {"status": "carregando", "inicio": time.time()}
+    try:
+        if usar_duckdb(year):
+            versao = atualizar_resumo_duckdb(year)["versao"]
+            recargas[year].update(status="concluida", fim=time.time(), versao=versao)
+            print(f"🔄 ENEM {year} recarregado via DuckDB (versão {versao})")
+            return
+        with _carga_locks[year]:
+            versao = assinatura_arquivos(year)
+            df_micro, df_itens = carregar_ano(year)
+            derivados = calcular_derivados(year, df_micro, df_itens)
+            publicar_ano(year, df_micro, df_itens, versao, derivados)
+        recargas[year].update(status="concluida", fim=time.time(), versao=versao)
+        print(f"🔄 ENEM {year} recarregado (versão {versao})")
+        # a versão antiga (menos o que requisições em andamento ainda seguram) é liberada
+        # aqui, nesta thread, já com a nova publicada e sem segurar nenhum lock
+        gc.collect()
+    except Exception as e:
+        recargas[year].update(status="erro", fim=time.time(), erro=str(e))
+        print(f"❌ ERRO ao recarregar {year}: {e}")
+
+def iniciar_recarga(year: int) -> bool:
+    """Dispara a recarga em uma thread; retorna False se já houver uma em andamento."""
+    if recargas.get(year, {}).get("status") == "carregando":
+        return False
+    recargas[year] = {"status": "carregando", "inicio": time.time()}
+    threading.Thread(target=recarregar_ano, args=(year,), daemon=True, name=f"recarga-{year}").start()
+    return True
+
+def observar_arquivos(intervalo: float):
+    """
+    Watcher simples por polling: recarrega um ano já carregado quando a
+    assinatura dos arquivos muda e permanece estável por dois ciclos
+    (evita ler um arquivo que ainda está sendo copiado).
+    """
+    pendentes = {}
+    while True:
+        time.sleep(intervalo)
+        for y in YEARS:
+            with _cache_lock:
+                atual = versoes_cache.get(y) or resumos_sql.get(y, {}).get("versao")
+            if atual is None:
+                continue
+            nova = assinatura_arquivos(y)
+            if nova == atual:
+                pendentes.pop(y, None)
+            elif pendentes.get(y) == nova:
+                pendentes.pop(y, None)
+                print(f"👀 Arquivos do ENEM {y} mudaram; recarregando...")
+                iniciar_recarga(y)
+            else:
+                pendentes[y] = nova
+
+# ==========================================
+#   AQUECIMENTO E PRONTIDÃO
+# ==========================================
+
+def aquecer(anos):
+    """Carrega os anos (e seus agregados) na ordem de prioridade recebida."""
+    inicio = time.time()
+    for y in anos:
+        if y not in YEARS:
+            print(f"⚠ Ano {y} em WARMUP_YEARS não é suportado; ignorando.")
+            continue
+        try:
+            if usar_duckdb(y):
+                resumo_via_duckdb(y)
+            else:
+                garantir_ano(y)
+        except Exception as e:
+            estado_anos[y] = "erro"
+            print(f"❌ ERRO no aquecimento de {y}: {e}")
+    print(f"🔥 Aquecimento concluído em {time.time() - inicio:.1f}s")
+
+def anos_prontos() -> bool:
+    return all(estado_anos.get(y) in ("pronto", "vazio") for y in READY_YEARS)
 
 # ==========================================
 #   ENDPOINTS
 # ==========================================
 
+def verificar_admin(token: Optional[str]):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Token de administração inválido")
+
+def estado_health() -> tuple:
+    """Tudo o que muda o corpo de /health; serve de versão na chave do cache."""
+    with _cache_lock:
+        return (tuple(importados()),) + tuple(
+            (
+                y,
+                microdados_cache.linhas(y),
+                microdados_cache.camada(y),
+                y in resumos_store or y in resumos_sql or "resumo" in derivados_cache.get(y, {}),
+                versoes_cache.get(y),
+                estado_anos.get(y),
+                recargas.get(y, {}).get("status"),
+            )
+            for y in YEARS
+        )
+
 @app.get("/health")
-def health():
+def health(request: Request):
+    return payloads.responder(request, ("health", estado_health()), lambda: codificar(montar_health()))
+
+def montar_health() -> dict:
     return {
         "status": "online",
-        "data_source": "Local CSV",
+        "data_source": (
+            "Summary store" if DATA_MODE == "summary"
+            else f"Hugging Face ({HF_DATASET_URL or HF_DATASET})" if dataset_remoto is not None
+            else "Local CSV"
+        ),
         "datasets": {
             y: {
-                "loaded": len(microdados_cache.get(y, [])) > 0,
-                "records": len(microdados_cache.get(y, [])),
-                "cached_stats": False
+                "loaded": microdados_cache.linhas(y) > 0,
+                "records": microdados_cache.linhas(y),
+                "tier": microdados_cache.camada(y),
+                "cached_stats": y in resumos_store or y in resumos_sql or "resumo" in derivados_cache.get(y, {}),
+                "version": versoes_cache.get(y),
+                "state": estado_anos.get(y),
+                "reload": recargas.get(y, {}).get("status"),
+                "quality": resumo_qualidade(y)
             }
             for y in YEARS
         },
-        "cache_size": len(microdados_cache)
+        "cache_size": len(microdados_cache),
+        "memory": microdados_cache.info(),
+        "query_backend": QUERY_BACKEND,
+        "startup": {
+            "import_ms": round(TEMPO_IMPORT_MS, 1),
+            "import_budget_ms": IMPORT_BUDGET_MS,
+            "analytics_loaded": carregados(),
+            "analytics_modules": importados()
+        }
     }
 
-@app.get("/api/enem/estatisticas/{year}")
-def estatisticas(year: int):
+@app.get("/health/live")
+def health_live():
+    """Liveness: o processo está de pé (não depende dos dados)."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def health_ready():
+    """Readiness: 200 só quando os anos de READY_YEARS estão em memória."""
+    pronto = anos_prontos()
+    payload = {
+        "ready": pronto,
+        "required_years": READY_YEARS,
+        "years": {y: estado_anos.get(y) for y in YEARS}
+    }
+    return JSONResponse(payload, status_code=200 if pronto else 503)
+
+@app.get("/health/ready/{year}")
+def health_ready_year(year: int):
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    estado = estado_anos.get(year)
+    pronto = estado in ("pronto", "vazio")
+    return JSONResponse({"ano": year, "ready": pronto, "state": estado}, status_code=200 if pronto else 503)
+
+@app.post("/admin/recarregar/{year}", status_code=202)
+def admin_recarregar(year: int, x_admin_token: Optional[str] = Header(default=None)):
+    verificar_admin(x_admin_token)
     if year not in YEARS:
         raise HTTPException(status_code=400, detail="Ano inválido")
+    iniciada = iniciar_recarga(year)
+    return {"ano": year, "iniciada": iniciada, **recargas[year]}
+
+@app.get("/admin/recarregar/{year}")
+def admin_status_recarga(year: int, x_admin_token: Optional[str] = Header(default=None)):
+    verificar_admin(x_admin_token)
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    with _cache_lock:
+        versao = versoes_cache.get(year)
+    return {"ano": year, "versao_atual": versao, **recargas.get(year, {"status": "nenhuma"})}
+
+# ==========================================
+#   RESUMOS (BASE DOS ENDPOINTS AGREGADOS)
+# ==========================================
+
+summary_store = SummaryStore(SUMMARY_STORE)
+# resumos carregados do arquivo no modo resumo
+resumos_store = {}
+
+def carregar_modo_resumo():
+    """Modo resumo: carrega todos os resumos do arquivo SQLite (milissegundos)."""
+    inicio = time.time()
+    resumos_store.update(summary_store.todos())
+    for y in YEARS:
+        estado_anos[y] = "pronto" if y in resumos_store else "vazio"
+    print(f"📦 Modo resumo: {len(resumos_store)} anos carregados de {SUMMARY_STORE} em {(time.time() - inicio) * 1000:.0f}ms")
+
+@derivado("resumo")
+def calcular_resumo_ano(year: int, df: pd.DataFrame, df_itens: pd.DataFrame) -> dict:
+    resumo = calcular_resumo(year, df, versao=assinatura_arquivos(year))
+    if len(df):
+        try:
+            summary_store.salvar(resumo)
+        except Exception as e:
+            print(f"   ⚠ Não foi possível gravar o resumo de {year}: {e}")
+    return resumo
+
+def obter_resumo(year: int) -> Optional[dict]:
+    """
+    Resumo do ano sem carregar microdados sempre que possível: usa o que está em
+    memória, senão o gravado no store (se ainda bate com os arquivos de origem, ou
+    se os arquivos brutos nem existem), e só em último caso carrega o ano.
+    """
+    if DATA_MODE == "summary":
+        return resumos_store.get(year)
+
+    resumo = resumo_sem_carga(year)
+    if resumo is not None or not tem_microdados(year):
+        return resumo
+
+    # o DuckDB só lê arquivos locais: sem CSV local (ex.: fonte remota), o ano segue pelo pandas
+    return QUERY_BACKENDS["duckdb" if usar_duckdb(year) else "pandas"](year)
+
+def resumo_sem_carga(year: int) -> Optional[dict]:
+    """O resumo que já existe sem ler microdados (em memória ou gravado e em dia), ou None."""
+    with _cache_lock:
+        resumo = derivados_cache.get(year, {}).get("resumo")
+    if resumo is not None:
+        return resumo
+
+    gravado = summary_store.carregar(year)
+    if gravado is not None and (not tem_microdados(year) or gravado.get("versao") == assinatura_arquivos(year)):
+        return gravado
+    return None
+
+def resumo_disponivel(year: int) -> bool:
+    """Como resumo_sem_carga(year) is not None, mas sem decodificar o resumo gravado (só a coluna versao)."""
+    with _cache_lock:
+        if "resumo" in derivados_cache.get(year, {}):
+            return True
+    versao = summary_store.versao(year)
+    return versao is not None and (not tem_microdados(year) or versao == assinatura_arquivos(year))
+
+def versao_resumo(year: int) -> Optional[str]:
+    """
+    Versão do resumo que o ano serviria agora, sem ler resumo nenhum: a dos
+    arquivos de origem, ou a gravada no store quando eles não existem.
+    """
+    if DATA_MODE == "summary":
+        return resumos_store.get(year, {}).get("versao")
+    if tem_microdados(year):
+        return assinatura_arquivos(year)
+    return summary_store.versao(year)
+
+# ==========================================
+#   BACKENDS DE CONSULTA
+# ==========================================
+
+# resumos calculados pelo DuckDB (a versão fica em resumo["versao"])
+resumos_sql = {}
+
+def csv_microdados(year: int) -> Optional[Path]:
+    """CSV local de microdados do ano, se existir."""
+    path = MICRODADOS_PATH / f"MICRODADOS_ENEM_{year}.csv"
+    return path if path.exists() else None
+
+def fonte_microdados(year: int) -> Optional[Path]:
+    """
+    Arquivo de microdados do ano lido pelos backends SQL (só arquivos locais):
+    o Parquet do cache colunar se ele estiver fresco, senão o CSV.
+    """
+    csv = csv_microdados(year)
+    if csv is None:
+        return None
+    if USE_PARQUET_CACHE and columnar_cache.disponivel() and columnar_cache.fresco(PARQUET_CACHE_PATH, year, csv, COLUNAS_UTEIS):
+        return columnar_cache.caminhos(PARQUET_CACHE_PATH, year)["dados"]
+    return csv
 
-    df, _ = load_enem_data(year)
+def resumo_via_pandas(year: int) -> dict:
+    resumo, _ = obter_derivado(year, "resumo")
+    return resumo
 
+def atualizar_resumo_duckdb(year: int) -> dict:
+    """Recalcula o resumo com DuckDB e troca a versão em memória de uma vez."""
+    with _carga_locks[year]:
+        versao = assinatura_arquivos(year)
+        arquivo = fonte_microdados(year)
+        if arquivo is None:
+            estado_anos[year] = "vazio"
+            return {"versao": versao}
+        if year not in resumos_sql:
+            estado_anos[year] = "carregando"
+        resumo = calcular_resumo_duckdb(year, arquivo, versao=versao)
+        try:
+            summary_store.salvar(resumo)
+        except Exception as e:
+            print(f"   ⚠ Não foi possível gravar o resumo de {year}: {e}")
+        with _cache_lock:
+            resumos_sql[year] = resumo
+            estado_anos[year] = "pronto"
+            estimativas_cache.pop(year, None)
+        payloads.invalidar(year)
+        return resumo
+
+def resumo_via_duckdb(year: int) -> dict:
+    """
+    Resumo do ano via DuckDB sem carregar o DataFrame. Se a versão em memória
+    ficou velha e outra thread já está recalculando, continua servindo a antiga.
+    """
+    versao = assinatura_arquivos(year)
+    with _cache_lock:
+        atual = resumos_sql.get(year)
+    if atual is not None and atual["versao"] == versao:
+        return atual
+
+    gravado = summary_store.carregar(year)
+    if gravado is not None and gravado.get("versao") == versao:
+        with _cache_lock:
+            resumos_sql[year] = gravado
+            estado_anos[year] = "pronto"
+        return gravado
+
+    if atual is not None and _carga_locks[year].locked():
+        return atual
+    return atualizar_resumo_duckdb(year)
+
+QUERY_BACKENDS = {
+    "pandas": resumo_via_pandas,
+    "duckdb": resumo_via_duckdb,
+}
+
+def qualidade_via_duckdb(year: int, arquivo: Path) -> Optional[dict]:
+    # o Parquet do cache já está validado: o relatório é o gravado na conversão
+    if arquivo.suffix == ".parquet":
+        return columnar_cache.ler_qualidade(PARQUET_CACHE_PATH, year)
+    return qualidade_duckdb(arquivo, COLUNAS_UTEIS)
+
+# nome -> função(ano, arquivo) com o mesmo resultado do derivado pandas de mesmo nome
+AGREGADOS_SQL = {
+    "colunas": lambda year, arquivo: [c for c in colunas_da_fonte(arquivo) if c in COLUNAS_UTEIS],
+    "percentis": lambda year, arquivo: indice_percentis_duckdb(arquivo),
+    "municipios": lambda year, arquivo: calcular_arvores_duckdb(arquivo),
+    "qualidade": qualidade_via_duckdb,
+}
+# ano -> (versao, {nome: valor}) dos agregados calculados pelo DuckDB
+agregados_sql = {}
+
+def usar_duckdb(year: int) -> bool:
+    """True se os endpoints de linha do ano vão direto ao arquivo pelo DuckDB, sem carregar o DataFrame."""
+    return QUERY_BACKEND == "duckdb" and dataset_remoto is None and fonte_microdados(year) is not None
+
+def agregados_sql_do_ano(year: int):
+    """(versao, {nome: valor}) dos agregados SQL do ano; começa vazio quando os arquivos mudam."""
+    versao = assinatura_arquivos(year)
+    with _cache_lock:
+        atual = agregados_sql.get(year)
+        if atual is None or atual[0] != versao:
+            atual = agregados_sql[year] = (versao, {})
+        return atual
+
+def obter_agregado(year: int, nome: str):
+    """Como obter_derivado, mas com QUERY_BACKEND=duckdb calcula em SQL direto sobre o arquivo do ano."""
+    if not usar_duckdb(year):
+        return obter_derivado(year, nome)
+    versao, valores = agregados_sql_do_ano(year)
+    if nome not in valores:
+        valor = AGREGADOS_SQL[nome](year, fonte_microdados(year))
+        with _cache_lock:
+            valores.setdefault(nome, valor)
+    return valores[nome], versao
+
+def resumo_do_ano(year: int) -> dict:
+    """Como obter_resumo, mas valida o ano e devolve um resumo vazio se não houver dados."""
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    resumo = obter_resumo(year)
+    if resumo is None:
+        return {"ano": year, "versao": None, "inscritos": 0, "areas": {}, "por_uf": {}, "por_escola": {}, "por_renda": {}, "presenca": {}}
+    return resumo
+
+def calcular_estatisticas(year: int, resumo: dict) -> dict:
     # Se não há microdados, retornar 200 com informação clara (evita 404 em dev)
-    if df.empty:
+    if not resumo["inscritos"]:
         return {
             "ano": year,
             "inscritos": 0,
@@ -220,32 +954,707 @@ def estatisticas(year: int):
             "message": "Microdados não encontrados para este ano. Verifique os arquivos no diretório backend/Microdados."
         }
 
-    # Cálculo de médias mais robusto (apenas com colunas disponíveis)
-    score_cols = [c for c in ["NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT"] if c in df.columns]
-    if score_cols:
-        try:
-            media_geral = float(df[score_cols].mean().mean())
-        except Exception:
-            media_geral = None
+    # médias por área só entre os presentes na prova, as mesmas de /areas e dos recortes
+    # (summaries.acumular); sem as colunas de presença, entre todos com nota
+    part = descrever_participacao(resumo.get("participacao"))
+    m = medias(resumo)
+    score_medias = [m[c] for c in ["NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT"] if m.get(c) is not None]
+    media_geral = sum(score_medias) / len(score_medias) if score_medias else None
+
+    result = {
+        "ano": year,
+        "inscritos": int(resumo["inscritos"]),
+        "media_geral": media_geral,
+        "media_redacao": m.get("NU_NOTA_REDACAO")
+    }
+
+    if part:
+        inscritos = result["inscritos"]
+        result.update({
+            "presentes_todas": part["presentes_todas"],
+            "ausentes_todas": part["ausentes_todas"],
+            "eliminados_alguma": part["eliminados_alguma"],
+            "taxa_presenca": {col: 100.0 * c["presente"] / inscritos for col, c in part["presenca"].items()},
+            "means": {col: m[col] for col in part["medias_presentes"] if m.get(col) is not None},
+            "medias_presentes_todas": {col: d["media"] for col, d in part["medias_presentes_todas"].items()},
+            "media_por_candidato": part["media_por_candidato"],
+        })
+
+    return result
+
+def responder_do_resumo(request: Request, nome: str, year: int, montar, montar_aproximado):
+    """
+    Resposta cacheada de um endpoint montado só do resumo do ano. O cache de
+    payloads é consultado primeiro, com a versão de versao_resumo(): uma
+    repetição não descomprime o resumo gravado nem testa o cache colunar.
+    """
+    validar_ano(year)
+    chave = (nome, year, versao_resumo(year))
+    resumo = None
+    if chave not in payloads:
+        estimativa = estimativa_do_ano(year) if usar_aproximacao(year) else None
+        if estimativa is not None:
+            return payloads.responder(
+                request, (nome, year, "aproximada", estimativa["versao"]),
+                lambda: codificar(montar_aproximado(year, estimativa),
+                                  etag=f"{nome}-{year}-{estimativa['versao']}-aprox", ano=year),
+            )
+        resumo = resumo_do_ano(year)
+        # guarda com a versão do resumo servido (a anterior, se outra thread ainda recalcula)
+        chave = (nome, year, resumo["versao"])
+
+    def gerar():
+        atual = resumo if resumo is not None else resumo_do_ano(year)
+        return codificar(montar(year, atual), etag=f"{nome}-{year}-{atual['versao']}", ano=year)
+
+    return payloads.responder(request, chave, gerar)
+
+@app.get("/api/enem/estatisticas/{year}")
+def estatisticas(year: int, request: Request):
+    return responder_do_resumo(request, "estatisticas", year, calcular_estatisticas, estatisticas_aproximadas)
+
+def montar_areas(year: int, resumo: dict) -> dict:
+    m = medias(resumo)
+    return {
+        "ano": year,
+        "areas": {nome: m.get(col) for col, nome in AREAS.items() if col in m}
+    }
+
+@app.get("/api/enem/areas/{year}")
+def areas(year: int, request: Request):
+    """Média por área de conhecimento (gráfico principal do dashboard)."""
+    return responder_do_resumo(request, "areas", year, montar_areas, areas_aproximadas)
+
+@app.get("/api/enem/por-estado/{year}")
+def por_estado(year: int, top: Optional[int] = None, ordem: str = "inscritos"):
+    """Inscritos e médias por UF; `ordem` = inscritos ou media (média das 4 provas objetivas)."""
+    if ordem not in ("inscritos", "media"):
+        raise HTTPException(status_code=400, detail="ordem deve ser 'inscritos' ou 'media'")
+    estados = {}
+    for uf, recorte in resumo_do_ano(year)["por_uf"].items():
+        m = medias(recorte)
+        objetivas = [m[c] for c in ["NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT"] if m.get(c) is not None]
+        estados[uf] = {
+            "total": recorte["inscritos"],
+            "medias": m,
+            "media_geral": sum(objetivas) / len(objetivas) if objetivas else None
+        }
+
+    chave = (lambda kv: kv[1]["total"]) if ordem == "inscritos" else (lambda kv: kv[1]["media_geral"] or 0)
+    ordenados = sorted(estados.items(), key=chave, reverse=True)
+    if top:
+        ordenados = ordenados[:top]
+    return {"ano": year, "estados": dict(ordenados)}
+
+@app.get("/api/enem/por-escola/{year}")
+def por_escola(year: int):
+    """Comparação entre escola pública e privada."""
+    tipos = {}
+    for codigo, recorte in resumo_do_ano(year)["por_escola"].items():
+        nome = TIPOS_ESCOLA.get(int(codigo))
+        if nome in ("publica", "privada"):
+            tipos[nome] = {"total": recorte["inscritos"], "medias": medias(recorte)}
+    return {"ano": year, "tipos_escola": tipos}
+
+@app.get("/api/enem/presenca/{year}")
+def presenca(year: int):
+    """Taxa de presença (%) e contagens de presentes/faltosos/eliminados por prova."""
+    resumo = resumo_do_ano(year)
+    inscritos = resumo["inscritos"]
+    taxa, contagens = {}, {}
+    for col in PRESENCAS:
+        c = resumo["presenca"].get(col)
+        if not c:
+            continue
+        contagens[col] = {
+            "faltou": c.get("0", 0),
+            "presente": c.get("1", 0),
+            "eliminado": c.get("2", 0)
+        }
+        taxa[col] = 100.0 * c.get("1", 0) / inscritos if inscritos else None
+    part = descrever_participacao(resumo.get("participacao")) or {}
+    return {
+        "ano": year,
+        "inscritos": inscritos,
+        "taxa_presenca": taxa,
+        "contagens": contagens,
+        "presentes_todas": part.get("presentes_todas"),
+        "ausentes_todas": part.get("ausentes_todas"),
+    }
+
+@app.get("/api/enem/insights")
+def insights(ano: Optional[int] = None):
+    """Áreas com menor desempenho no ano pedido (ou no mais recente com dados)."""
+    anos = [ano] if ano is not None else sorted(YEARS, reverse=True)
+    for y in anos:
+        resumo = resumo_do_ano(y)
+        if resumo["inscritos"]:
+            break
     else:
-        media_geral = None
+        return {"ano": ano, "areas_menor_desempenho": [], "dicas": []}
+
+    m = medias(resumo)
+    ranking = sorted(
+        ({"area": AREAS[col], "media": v} for col, v in m.items() if v is not None and col != "NU_NOTA_REDACAO"),
+        key=lambda a: a["media"]
+    )
+    return {
+        "ano": y,
+        "areas_menor_desempenho": ranking[:2],
+        "dicas": [
+            f"Reforce {a['area']}: a média nacional foi {a['media']:.1f} pontos." for a in ranking[:2]
+        ] + ["Resolva provas anteriores cronometrando o tempo de cada área."]
+    }
+
+@app.get("/api/enem/evolucao")
+def evolucao(uf: Optional[str] = None, escola: Optional[int] = None):
+    """Evolução das médias por área entre os anos, calculada só a partir dos resumos."""
+    if uf is not None and escola is not None:
+        raise HTTPException(status_code=400, detail="Use apenas um recorte por vez (uf ou escola)")
+
+    resumos = {}
+    for y in YEARS:
+        resumo = obter_resumo(y)
+        if resumo is not None:
+            resumos[y] = resumo
+
+    result = serie_evolucao(resumos, uf=uf, escola=escola)
+    result["recorte"] = {"uf": uf.upper() if uf else None, "escola": escola}
+    return result
+
+def recorte_comparado(ano: int, uf: Optional[str], escola: Optional[int], renda: Optional[str]) -> dict:
+    """Valida um lado da comparação e devolve sua descrição com os momentos do resumo."""
+    if sum(r is not None for r in (uf, escola, renda)) > 1:
+        raise HTTPException(status_code=400, detail="Use apenas um recorte por lado (uf, escola ou renda)")
+    uf = uf.upper() if uf else None
+    renda = renda.upper() if renda else None
+    if uf is not None and uf not in data_quality.UFS:
+        raise HTTPException(status_code=400, detail=f"UF inválida: {uf}")
+    if escola is not None and escola not in TIPOS_ESCOLA:
+        raise HTTPException(status_code=400, detail=f"escola deve ser um de {sorted(TIPOS_ESCOLA)}")
+    if renda is not None and renda not in FAIXAS_RENDA:
+        raise HTTPException(status_code=400, detail=f"renda deve ser uma faixa da Q006 ({min(FAIXAS_RENDA)} a {max(FAIXAS_RENDA)})")
+
+    rotulo = str(ano)
+    if uf is not None:
+        rotulo += f" · {uf}"
+    elif escola is not None:
+        rotulo += f" · escola {TIPOS_ESCOLA[escola]}"
+    elif renda is not None:
+        rotulo += f" · renda {FAIXAS_RENDA[renda]}"
+
+    resumo = resumo_do_ano(ano)
+    recorte = momentos_do_recorte(resumo, uf, escola, renda)
+    if not recorte or not recorte["inscritos"]:
+        raise HTTPException(status_code=404, detail=f"Sem dados para {rotulo}")
+    return {
+        "ano": ano,
+        "recorte": {"uf": uf, "escola": escola, "renda": renda},
+        "rotulo": rotulo,
+        "inscritos": recorte["inscritos"],
+        "versao": resumo.get("versao"),
+        "momentos": recorte,
+    }
+
+@app.get("/api/enem/comparar")
+def comparar_recortes(ano_a: int, ano_b: Optional[int] = None,
+                      uf: Optional[str] = None, uf_a: Optional[str] = None, uf_b: Optional[str] = None,
+                      escola: Optional[int] = None, escola_a: Optional[int] = None, escola_b: Optional[int] = None,
+                      renda: Optional[str] = None, renda_a: Optional[str] = None, renda_b: Optional[str] = None,
+                      areas: Optional[str] = None, alfa: float = ALFA_PADRAO):
+    """
+    Compara dois recortes (B - A) por área: diferença de médias com IC, teste t de
+    Welch e tamanho de efeito, só a partir dos resumos. uf/escola/renda valem para
+    os dois lados; uf_a, escola_b etc. para um lado só. Exemplos:
+    ano_a=2022&ano_b=2024&uf=SP, ano_a=2023&escola_a=2&escola_b=3, ano_a=2023&renda_a=B&renda_b=Q.
+    """
+    if not 0 < alfa < 1:
+        raise HTTPException(status_code=400, detail="alfa deve estar entre 0 e 1")
+    cols_area = [a.upper() for a in lista_parametro(areas)] or list(AREAS)
+    invalidas = [a for a in cols_area if a not in AREAS]
+    if invalidas:
+        raise HTTPException(status_code=400, detail=f"Áreas inválidas: {invalidas}; use {list(AREAS)}")
+
+    ano_b = ano_a if ano_b is None else ano_b
+    lado = lambda proprio, comum: proprio if proprio is not None else comum
+    a = recorte_comparado(ano_a, lado(uf_a, uf), lado(escola_a, escola), lado(renda_a, renda))
+    b = recorte_comparado(ano_b, lado(uf_b, uf), lado(escola_b, escola), lado(renda_b, renda))
+    if (a["ano"], a["recorte"]) == (b["ano"], b["recorte"]):
+        raise HTTPException(status_code=400, detail="Os dois lados da comparação são iguais")
+
+    resultado = comparar(a.pop("momentos"), b.pop("momentos"), cols_area, alfa)
+    return {
+        "a": a,
+        "b": b,
+        "alfa": alfa,
+        "areas": {AREAS[col]: r for col, r in resultado.items()},
+    }
+
+# ==========================================
+#   RESPOSTAS APROXIMADAS (ANOS FRIOS)
+# ==========================================
+
+# intervalo entre eventos do SSE de progresso (s) e comentário de keep-alive
+INTERVALO_EVENTOS = 1.0
+INTERVALO_KEEPALIVE = 15.0
+
+def usar_aproximacao(year: int) -> bool:
+    """
+    True se o ano ainda não tem resultado exato e a carga seria lenta: CSV local
+    sem resumo em dia nem cache colunar fresco. Anos prontos não passam daqui
+    do primeiro teste.
+    """
+    if not APPROXIMATE or DATA_MODE != "raw" or estado_anos.get(year) in ("pronto", "vazio", "erro"):
+        return False
+    if year not in YEARS or dataset_remoto is not None:
+        return False
+    arquivo = csv_microdados(year)
+    if arquivo is None:
+        return False
+    if resumo_disponivel(year):
+        return False
+    return not (USE_PARQUET_CACHE and columnar_cache.disponivel()
+                and columnar_cache.fresco(PARQUET_CACHE_PATH, year, arquivo, COLUNAS_UTEIS))
+
+def iniciar_carga(year: int):
+    """Dispara a carga exata do ano numa thread (uma por ano; o aquecimento já em curso é reaproveitado)."""
+    with _cache_lock:
+        thread = cargas_fundo.get(year)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=aquecer, args=([year],), daemon=True, name=f"carga-{year}")
+        cargas_fundo[year] = thread
+    thread.start()
 
-    if "NU_NOTA_REDACAO" in df.columns:
+def estimativa_do_ano(year: int) -> Optional[dict]:
+    """
+    Estimativas do ano a partir de uma amostra do CSV (uma por versão dos arquivos),
+    disparando a carga exata em segundo plano. None se a amostra falhar: aí a
+    requisição segue pelo caminho exato, como antes.
+    """
+    iniciar_carga(year)
+    versao = assinatura_arquivos(year)
+    with _amostra_locks[year]:
+        estimativa = estimativas_cache.get(year)
+        if estimativa is not None and estimativa["versao"] == versao:
+            return estimativa
         try:
-            media_redacao = float(df["NU_NOTA_REDACAO"].mean())
-        except Exception:
-            media_redacao = None
+            amostra = sampling.amostrar_csv(csv_microdados(year), COLUNAS_UTEIS, DTYPES_MICRODADOS,
+                                            APPROX_BLOCKS, APPROX_BLOCK_KB * 1024)
+            estimativa = {
+                "versao": versao,
+                "resumo": calcular_resumo(year, amostra.df, versao=versao),
+                "estimativas": sampling.estimar(amostra),
+                "amostra": amostra.info(),
+            }
+        except Exception as e:
+            print(f"   ⚠ Amostra de {year} falhou ({e}); respondendo só com o resultado exato.")
+            return None
+        estimativas_cache[year] = estimativa
+    info = estimativa["amostra"]
+    print(f"🎲 ENEM {year}: estimativas de {info['linhas']:,} linhas ({100 * info['fracao_arquivo']:.1f}% do arquivo) "
+          f"em {info['segundos'] * 1000:.0f}ms, até a carga completa terminar")
+    return estimativa
+
+def campos_aproximados(year: int, estimativa: dict) -> dict:
+    return {
+        "approximate": True,
+        "confianca": 0.95,
+        "amostra": estimativa["amostra"],
+        "progresso": f"/api/enem/carga/{year}",
+        "eventos": f"/api/enem/carga/{year}/eventos",
+    }
+
+def estatisticas_aproximadas(year: int, estimativa: dict) -> dict:
+    """Mesmo formato de calcular_estatisticas, com contagens extrapoladas e IC95 das métricas."""
+    est = estimativa["estimativas"]
+    result = calcular_estatisticas(year, estimativa["resumo"])
+    amostrados = estimativa["resumo"]["inscritos"]
+    if est["inscritos"] is not None and amostrados:
+        fator = est["inscritos"]["estimativa"] / amostrados
+        for chave in ("inscritos", "presentes_todas", "ausentes_todas", "eliminados_alguma"):
+            if chave in result:
+                result[chave] = int(round(result[chave] * fator))
+    ic = lambda r: r["ic95"] if r else None
+    result["ic95"] = {
+        "inscritos": ic(est["inscritos"]),
+        "media_geral": ic(est["media_geral"]),
+        "media_redacao": ic(est["media_redacao"]),
+        "taxa_presenca": {col: ic(r) for col, r in est["taxa_presenca"].items()},
+        "means": {col: ic(r) for col, r in est["medias_presentes"].items()},
+    }
+    result.update(campos_aproximados(year, estimativa))
+    return result
+
+def areas_aproximadas(year: int, estimativa: dict) -> dict:
+    medias_amostra = estimativa["estimativas"]["medias"]
+    result = montar_areas(year, estimativa["resumo"])
+    result["ic95"] = {nome: medias_amostra[col]["ic95"] if medias_amostra.get(col) else None
+                      for col, nome in AREAS.items() if col in medias_amostra}
+    result.update(campos_aproximados(year, estimativa))
+    return result
+
+def estado_carga(year: int) -> dict:
+    """Fase, bytes lidos e tempo estimado da carga do ano; exato=True quando o resultado exato já existe."""
+    p = dict(progresso_carga.get(year, {}))
+    agora = time.time()
+    decorrido = (p.get("fim") or agora) - p["inicio"] if "inicio" in p else None
+    lidos, total = p.get("bytes_lidos"), p.get("bytes_total")
+    restante = None
+    if p.get("fase") == "lendo" and lidos and total:
+        restante = decorrido * (total - lidos) / lidos
+    return {
+        "ano": year,
+        "estado": estado_anos.get(year),
+        "exato": resumo_disponivel(year) if DATA_MODE == "raw" else year in resumos_store,
+        "fase": p.get("fase"),
+        "bytes_lidos": lidos,
+        "bytes_total": total,
+        "percentual": 100.0 * lidos / total if lidos is not None and total else None,
+        "decorrido_s": decorrido,
+        "restante_s": restante,
+    }
+
+def validar_ano(year: int):
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+
+@app.get("/api/enem/carga/{year}")
+def carga(year: int):
+    """Progresso da carga do ano (para quem recebeu uma resposta aproximada e quer saber quando refazer)."""
+    validar_ano(year)
+    return estado_carga(year)
+
+def evento_sse(nome: str, dados: dict) -> str:
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+@app.get("/api/enem/carga/{year}/eventos")
+async def eventos_carga(year: int, request: Request):
+    """
+    Server-sent events da carga do ano: "progresso" a cada segundo e, no fim,
+    "exato" com as estatísticas e áreas definitivas (ou "erro"); depois fecha.
+    """
+    validar_ano(year)
+
+    async def gerar():
+        ultimo_envio = time.monotonic()
+        while not await request.is_disconnected():
+            estado = await run_in_threadpool(estado_carga, year)
+            if estado["exato"]:
+                resumo = await run_in_threadpool(resumo_do_ano, year)
+                yield evento_sse("exato", {
+                    "ano": year,
+                    "estatisticas": calcular_estatisticas(year, resumo),
+                    "areas": montar_areas(year, resumo),
+                })
+                return
+            if estado["estado"] in ("erro", "vazio"):
+                yield evento_sse("erro", estado)
+                return
+            if estado["fase"] is not None:
+                yield evento_sse("progresso", estado)
+                ultimo_envio = time.monotonic()
+            elif time.monotonic() - ultimo_envio > INTERVALO_KEEPALIVE:
+                yield ": aguardando\n\n"
+                ultimo_envio = time.monotonic()
+            await asyncio.sleep(INTERVALO_EVENTOS)
+
+    return StreamingResponse(gerar(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ==========================================
+#   CRUZAMENTOS SOCIOECONÔMICOS
+# ==========================================
+
+DIMENSOES_CRUZAMENTO = COLUNAS_QUESTIONARIO + ["TP_ESCOLA", "SG_UF_RESIDENCIA"]
+MAX_CRUZAMENTOS_CACHE = 256
+
+def lista_parametro(valor: Optional[str]):
+    return [v.strip() for v in valor.split(",") if v.strip()] if valor else []
+
+@app.get("/api/enem/cruzamento/{year}")
+def cruzamento(year: int, dimensoes: str, areas: Optional[str] = None, quantis: Optional[str] = None):
+    """
+    Média, desvio e quantis das notas em cada combinação de 2 ou 3 dimensões
+    (ex.: dimensoes=Q006,TP_ESCOLA). Resultados ficam em cache junto com a versão do ano.
+    """
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    dims = [d.upper() for d in lista_parametro(dimensoes)]
+    cols_area = [a.upper() for a in lista_parametro(areas)]
+    try:
+        qs = [float(q) for q in lista_parametro(quantis)] or QUANTIS_PADRAO
+    except ValueError:
+        raise HTTPException(status_code=400, detail="quantis deve ser uma lista de números, ex.: 0.25,0.5,0.75")
+    erro = validar_parametros(dims, DIMENSOES_CRUZAMENTO, cols_area, qs)
+    if erro:
+        raise HTTPException(status_code=400, detail=erro)
+    exigir_microdados()
+
+    # colunas, versão e resultados em cache saem sem descomprimir um ano da camada fria
+    via_duckdb = usar_duckdb(year)
+    if via_duckdb:
+        versao, derivados = agregados_sql_do_ano(year)
+        colunas, _ = obter_agregado(year, "colunas")
     else:
-        media_redacao = None
+        versao, derivados = versao_e_derivados(year)
+        colunas = microdados_cache.colunas(year)
+    ausentes = [d for d in dims if d not in colunas]
+    if ausentes:
+        raise HTTPException(status_code=404, detail=f"Colunas {ausentes} não existem nos microdados de {year}")
+    cols_area = [a for a in (cols_area or AREAS) if a in colunas]
 
-    result = {
+    chave = (tuple(dims), tuple(cols_area), tuple(qs))
+    with _cache_lock:
+        resultado = derivados.get("cruzamentos", {}).get(chave)
+    if resultado is None:
+        if via_duckdb:
+            resultado = cruzar_duckdb(fonte_microdados(year), dims, cols_area, qs)
+        else:
+            df, _, versao, derivados = snapshot_ano(year)
+            resultado = cruzar(df, dims, cols_area, qs)
+        rotulo_escola(resultado["dimensoes"])
+        # derivados é compartilhado entre as requisições: inserção e descarte sob o lock
+        with _cache_lock:
+            cache = derivados.setdefault("cruzamentos", {})
+            while len(cache) >= MAX_CRUZAMENTOS_CACHE:
+                cache.pop(next(iter(cache)))
+            cache[chave] = resultado
+    return {"ano": year, "versao": versao, **resultado}
+
+# ==========================================
+#   PERCENTIS
+# ==========================================
+
+MAX_VALORES_PERCENTIL = 1000
+
+@derivado("percentis")
+def calcular_percentis(year: int, df: pd.DataFrame, df_itens: pd.DataFrame) -> dict:
+    return indice_percentis(df)
+
+def acumulado_do_recorte(year: int, area: str, uf: Optional[str], escola: Optional[int]):
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    area = area.upper()
+    if area not in AREAS:
+        raise HTTPException(status_code=400, detail=f"area deve ser um de {list(AREAS)}")
+    if uf is not None and escola is not None:
+        raise HTTPException(status_code=400, detail="Use apenas um recorte por vez (uf ou escola)")
+    exigir_microdados()
+    indice, versao = obter_agregado(year, "percentis")
+    acum = acumulado(indice, area, uf, escola)
+    # recorte sem nenhuma nota (ex.: só faltosos): não há distribuição para ler
+    if acum is None or acum[-1] == 0:
+        raise HTTPException(status_code=404, detail=f"Sem notas de {area} para esse recorte em {year}")
+    recorte = {"uf": uf.upper() if uf else None, "escola": escola}
+    return acum, {"ano": year, "area": area, "recorte": recorte, "participantes": int(acum[-1]), "versao": versao}
+
+def valores_parametro(valor: str, nome: str, minimo: float, maximo: float):
+    try:
+        valores = [float(v) for v in lista_parametro(valor)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{nome} deve ser uma lista de números separados por vírgula")
+    if not 1 <= len(valores) <= MAX_VALORES_PERCENTIL:
+        raise HTTPException(status_code=400, detail=f"Informe de 1 a {MAX_VALORES_PERCENTIL} valores em {nome}")
+    if any(not minimo <= v <= maximo for v in valores):
+        raise HTTPException(status_code=400, detail=f"{nome} devem estar entre {minimo:g} e {maximo:g}")
+    return valores
+
+@app.get("/api/enem/percentil/{year}")
+def percentil(year: int, area: str, notas: str, uf: Optional[str] = None, escola: Optional[int] = None):
+    """Percentil (% com nota menor ou igual) de uma ou várias notas: notas=720,650.5"""
+    acum, info = acumulado_do_recorte(year, area, uf, escola)
+    valores = valores_parametro(notas, "notas", 0, 1000)
+    resultado = percentis_das_notas(acum, valores)
+    return {**info, "resultados": [{"nota": v, "percentil": float(p)} for v, p in zip(valores, resultado)]}
+
+@app.get("/api/enem/percentil/{year}/inverso")
+def percentil_inverso(year: int, area: str, percentis: str, uf: Optional[str] = None, escola: Optional[int] = None):
+    """Nota mínima para alcançar cada percentil: percentis=90,99"""
+    acum, info = acumulado_do_recorte(year, area, uf, escola)
+    valores = valores_parametro(percentis, "percentis", 0, 100)
+    resultado = notas_dos_percentis(acum, valores)
+    return {**info, "resultados": [{"percentil": v, "nota": round(float(n), 1)} for v, n in zip(valores, resultado)]}
+
+# ==========================================
+#   EXPORTAÇÃO
+# ==========================================
+
+@app.get("/api/enem/exportar/{year}")
+def exportar_microdados(
+    year: int,
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    uf: Optional[str] = None,
+    escola: Optional[int] = None,
+    limite: Optional[int] = None,
+):
+    """
+    Recorte dos microdados em streaming (csv, ndjson ou arrow). `colunas` só
+    aceita colunas de COLUNAS_UTEIS; `limite` vai até EXPORT_MAX_LINHAS.
+    """
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    formato = formato.lower()
+    erro = formato_disponivel(formato)
+    if erro:
+        raise HTTPException(status_code=400, detail=erro)
+    limite = EXPORT_MAX_LINHAS if limite is None else limite
+    if not 1 <= limite <= EXPORT_MAX_LINHAS:
+        raise HTTPException(status_code=400, detail=f"limite deve estar entre 1 e {EXPORT_MAX_LINHAS}")
+    pedidas = [c.upper() for c in lista_parametro(colunas)] or COLUNAS_UTEIS
+    invalidas = [c for c in pedidas if c not in COLUNAS_UTEIS]
+    if invalidas:
+        raise HTTPException(status_code=400, detail=f"Colunas não exportáveis: {invalidas}")
+    exigir_microdados()
+
+    if usar_duckdb(year):
+        versao, _ = agregados_sql_do_ano(year)
+        colunas_ano, _ = obter_agregado(year, "colunas")
+    else:
+        # referência fixa ao DataFrame: uma recarga no meio do envio não muda o resultado
+        df, _, versao, _ = snapshot_ano(year)
+        colunas_ano = list(df.columns)
+    selecionadas = [c for c in pedidas if c in colunas_ano]
+    if not selecionadas:
+        raise HTTPException(status_code=404, detail=f"Nenhuma das colunas pedidas existe nos microdados de {year}")
+    filtros = {}
+    if uf is not None:
+        filtros["SG_UF_RESIDENCIA"] = uf.upper()
+    if escola is not None:
+        filtros["TP_ESCOLA"] = escola
+    if any(c not in colunas_ano for c in filtros):
+        raise HTTPException(status_code=404, detail=f"Colunas de filtro ausentes nos microdados de {year}")
+
+    if usar_duckdb(year):
+        corpo = exportar_duckdb(fonte_microdados(year), formato, selecionadas, filtros, limite)
+    else:
+        corpo = exportar(df, formato, selecionadas, filtros, limite)
+    media_type, extensao, _ = FORMATOS[formato]
+    return StreamingResponse(
+        corpo,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="enem_{year}.{extensao}"',
+            "X-Dataset-Version": str(versao),
+        },
+    )
+
+# ==========================================
+#   MUNICÍPIOS (DRILL-DOWN)
+# ==========================================
+
+@derivado("municipios")
+def calcular_municipios(year: int, df: pd.DataFrame, df_itens: pd.DataFrame) -> dict:
+    return calcular_arvores(df)
+
+def arvore_do_nivel(year: int, nivel: str) -> dict:
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    if nivel not in NIVEIS:
+        raise HTTPException(status_code=400, detail=f"nivel deve ser um de {list(NIVEIS)}")
+    exigir_microdados()
+    arvores, _ = obter_agregado(year, "municipios")
+    arvore = (arvores or {}).get(nivel)
+    if arvore is None:
+        raise HTTPException(status_code=404, detail=f"Sem colunas de município ({NIVEIS[nivel][0]}) nos microdados de {year}")
+    return arvore
+
+@app.get("/api/enem/municipios/{year}")
+def municipios(
+    year: int,
+    nivel: str = "prova",
+    uf: Optional[str] = None,
+    ordem: str = "media",
+    sentido: str = "desc",
+    pagina: int = 1,
+    limite: int = 20,
+    min_participantes: int = 30,
+):
+    """
+    Ranking de municípios (top-N com sentido=desc, bottom-N com asc), opcionalmente
+    dentro de uma UF. `ordem` = inscritos, media (objetivas) ou coluna de nota.
+    """
+    if ordem not in ORDENS:
+        raise HTTPException(status_code=400, detail=f"ordem deve ser um de {ORDENS}")
+    if sentido not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sentido deve ser 'asc' ou 'desc'")
+    if pagina < 1 or not 1 <= limite <= 100:
+        raise HTTPException(status_code=400, detail="pagina >= 1 e limite entre 1 e 100")
+    arvore = arvore_do_nivel(year, nivel)
+
+    estado = None
+    if uf:
+        uf = uf.upper()
+        no = arvore["estados"].get(uf)
+        if no is None:
+            raise HTTPException(status_code=404, detail=f"UF {uf} sem municípios em {year}")
+        estado = {"uf": uf, "inscritos": no["inscritos"], "municipios": len(no["municipios"]), "medias": medias(no)}
+
+    result = pagina_ranking(arvore, ordem, sentido, uf, min_participantes, pagina, limite)
+    return {"ano": year, "nivel": nivel, "ordem": ordem, "sentido": sentido, "estado": estado, **result}
+
+@app.get("/api/enem/municipios/{year}/{codigo}")
+def municipio(year: int, codigo: int, nivel: str = "prova"):
+    """Médias, IC95 e inscritos de um município (código IBGE de 7 dígitos)."""
+    municipio = arvore_do_nivel(year, nivel)["municipios"].get(str(codigo))
+    if municipio is None:
+        raise HTTPException(status_code=404, detail=f"Município {codigo} não encontrado em {year}")
+    return {"ano": year, "nivel": nivel, **descrever_municipio(municipio, completo=True)}
+
+# ==========================================
+#   QUALIDADE DOS DADOS
+# ==========================================
+
+MAX_EXEMPLOS_QUALIDADE = 100
+
+@derivado("qualidade")
+def calcular_qualidade(year: int, df: pd.DataFrame, df_itens: pd.DataFrame) -> Optional[dict]:
+    """Relatório de validação da leitura que gerou df (feito durante o ingest, em data_quality)."""
+    return qualidade_carga.pop(year, None)
+
+def resumo_qualidade(year: int) -> Optional[dict]:
+    """Contagens curtas para o /health (None se o ano não foi lido com validação)."""
+    with _cache_lock:
+        qualidade = derivados_cache.get(year, {}).get("qualidade")
+    if not qualidade:
+        return None
+    relatorio = qualidade["relatorio"]
+    return {
+        "rows_read": relatorio["linhas_lidas"],
+        "quarantined": relatorio["linhas_em_quarentena"],
+        "skipped": relatorio["linhas_ignoradas"],
+        "by_rule": relatorio["linhas_por_regra"],
+    }
+
+@app.get("/api/enem/qualidade/{year}")
+def qualidade(year: int, exemplos: int = 10):
+    """
+    Validação dos microdados do ano: linhas lidas, válidas, em quarentena e
+    ignoradas (malformadas), violações por regra e coluna, e até `exemplos`
+    linhas da quarentena.
+    """
+    if year not in YEARS:
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    if not 0 <= exemplos <= MAX_EXEMPLOS_QUALIDADE:
+        raise HTTPException(status_code=400, detail=f"exemplos deve estar entre 0 e {MAX_EXEMPLOS_QUALIDADE}")
+    valor, versao = obter_agregado(year, "qualidade")
+    if not valor:
+        raise HTTPException(status_code=404, detail=f"Sem relatório de qualidade para {year} (microdados não carregados)")
+    return {
         "ano": year,
-        "inscritos": int(len(df)),
-        "media_geral": media_geral,
-        "media_redacao": media_redacao
+        "versao": versao,
+        "regras_verificadas": {regra: colunas for regra, (colunas, _) in data_quality.REGRAS.items()},
+        **data_quality.descrever(valor["relatorio"], valor["quarentena"], exemplos),
     }
 
-    return result
+# ==========================================
+#   TEMPO DE IMPORT
+# ==========================================
+
+TEMPO_IMPORT_MS = (time.perf_counter() - _INICIO_IMPORT) * 1000
+if TEMPO_IMPORT_MS > IMPORT_BUDGET_MS:
+    print(f"⚠ Import do main.py levou {TEMPO_IMPORT_MS:.0f}ms (orçamento: {IMPORT_BUDGET_MS:.0f}ms)")
 
 # ==========================================
 #   MAIN
@@ -255,14 +1664,16 @@ if __name__ == "__main__":
     print("=" * 80)
     print("🚀 Iniciando EducaDados ENEM API")
     print("=" * 80)
-    print("📂 Modo: Arquivos Locais (AMOSTRA DE 1%)")
+    if DATA_MODE == "summary":
+        print(f"📦 Modo: Somente resumos ({SUMMARY_STORE})")
+    else:
+        print("📂 Modo: Arquivos Locais (AMOSTRA DE 1%)")
+    print(f"🔥 Aquecimento: {WARMUP_YEARS if WARMUP else 'desligado'} (prontidão: {READY_YEARS})")
     print()
 
-    # Pré-carregar todos os anos
-    for y in YEARS:
-        load_enem_data(y)
-
-    print("API pronta em http://localhost:8000")
+    # o pré-carregamento dos anos acontece no lifespan (vale também para `uvicorn main:app`)
+    print("API em http://localhost:8000 — acompanhe /health/ready")
     print("=" * 80)
 
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,256 @@
+"""
+Leitura paralela de CSVs grandes do ENEM.
+
+O arquivo é dividido em faixas de bytes alinhadas a quebras de linha (sem
+cortar campos entre aspas) e cada faixa é lida em um processo separado com o
+engine C do pandas, usando as mesmas colunas projetadas e dtypes.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import data_quality
+from lazy_imports import preguicoso
+
+pd = preguicoso("pandas")
+
+ENCODINGS = ["utf-8", "latin-1", "cp1252"]
+SEPARADORES = [";", ",", "\t", "|"]
+
+# tamanho dos blocos lidos ao procurar limites de faixa
+BLOCO_LEITURA = 16 * 1024 * 1024
+# cada faixa fica com no máximo esse tamanho (limita memória por worker)
+TAMANHO_MAXIMO_FAIXA = 256 * 1024 * 1024
+# abaixo disso não compensa abrir processos
+TAMANHO_MINIMO_PARALELO = 32 * 1024 * 1024
+
+
+def _amostras(path: Path, header: bytes, n: int = 3, tamanho: int = 1024 * 1024) -> List[bytes]:
+    """Lê algumas amostras (início, meio, fim) para testar o encoding dos dados."""
+    total = os.path.getsize(path)
+    amostras = [header]
+    with open(path, "rb") as f:
+        for i in range(n):
+            f.seek(max(len(header), (total - tamanho) * i // max(n - 1, 1)))
+            bloco = f.read(tamanho)
+            # descarta linhas parciais nas pontas para não cortar caracteres
+            inicio, fim = bloco.find(b"\n") + 1, bloco.rfind(b"\n")
+            if 0 < inicio <= fim:
+                amostras.append(bloco[inicio:fim])
+    return amostras
+
+
+def detect_csv_format(path: Path) -> Tuple[str, str, List[str], int]:
+    """
+    Detecta encoding, separador e nomes de colunas a partir do cabeçalho e de
+    algumas amostras do arquivo. Retorna (encoding, sep, colunas, inicio_dados)
+    — inicio_dados é o byte onde começa a primeira linha de dados.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+    inicio_dados = len(header)
+
+    if header.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        encoding = None
+        amostras = _amostras(path, header)
+        for enc in ENCODINGS:
+            try:
+                for amostra in amostras:
+                    amostra.decode(enc)
+                encoding = enc
+                break
+            except UnicodeDecodeError:
+                continue
+        if encoding is None:
+            raise ValueError(f"Não foi possível decodificar {path}")
+
+    texto = header.decode(encoding).rstrip("\r\n")
+    sep = max(SEPARADORES, key=texto.count)
+    colunas = next(csv.reader([texto], delimiter=sep))
+    colunas = [c.strip() for c in colunas]
+    return encoding, sep, colunas, inicio_dados
+
+
+def split_byte_ranges(path: Path, n_faixas: int, inicio: int = 0) -> List[Tuple[int, int]]:
+    """
+    Divide [inicio, fim do arquivo) em até n_faixas faixas que terminam logo
+    após uma quebra de linha fora de aspas. A paridade das aspas é acumulada
+    desde o início dos dados, então campos com quebra de linha entre aspas
+    nunca são cortados.
+    """
+    tamanho = os.path.getsize(path)
+    if n_faixas <= 1 or tamanho - inicio <= 0:
+        return [(inicio, tamanho)]
+
+    alvos = [inicio + (tamanho - inicio) * i // n_faixas for i in range(1, n_faixas)]
+    limites = [inicio]
+
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        pos = inicio
+        aspas_impar = False
+
+        for alvo in alvos:
+            if alvo <= limites[-1]:
+                continue
+
+            # avança até o alvo apenas contando aspas
+            while pos < alvo:
+                bloco = f.read(min(BLOCO_LEITURA, alvo - pos))
+                if not bloco:
+                    break
+                if bloco.count(b'"') % 2:
+                    aspas_impar = not aspas_impar
+                pos += len(bloco)
+
+            # procura a próxima quebra de linha fora de aspas
+            limite = None
+            while limite is None:
+                bloco = f.read(BLOCO_LEITURA)
+                if not bloco:
+                    limite = tamanho
+                    break
+                inicio_busca = 0
+                while True:
+                    nl = bloco.find(b"\n", inicio_busca)
+                    if nl < 0:
+                        if bloco.count(b'"', inicio_busca) % 2:
+                            aspas_impar = not aspas_impar
+                        pos += len(bloco)
+                        break
+                    if bloco.count(b'"', inicio_busca, nl) % 2:
+                        aspas_impar = not aspas_impar
+                    if not aspas_impar:
+                        limite = pos + nl + 1
+                        break
+                    inicio_busca = nl + 1
+
+            if limite >= tamanho:
+                break
+            limites.append(limite)
+            pos = limite
+            f.seek(pos)
+
+    limites.append(tamanho)
+    return [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def _dtype_worker(dtype: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    # categorias são montadas depois da concatenação para que todas as faixas
+    # compartilhem o mesmo conjunto de categorias (igual à leitura serial)
+    if not dtype:
+        return dtype
+    return {c: ("object" if t == "category" else t) for c, t in dtype.items()}
+
+
+def _ler_faixa(path: str, inicio: int, fim: int, encoding: str, sep: str,
+               nomes: List[str], usecols: List[str],
+               dtype: Optional[Dict[str, str]], validar: bool = False):
+    """
+    Lê uma faixa de bytes do arquivo (executado em processo separado).
+    Retorna (df, relatório, quarentena); com validar=True os registros
+    malformados são descartados e contados e o bloco passa por data_quality.validar.
+    """
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        dados = f.read(fim - inicio)
+    if not dados.strip():
+        vazio = pd.DataFrame(columns=usecols)
+        return vazio, (data_quality.relatorio_vazio() if validar else None), vazio
+    df = pd.read_csv(
+        io.BytesIO(dados),
+        sep=sep,
+        encoding=encoding,
+        header=None,
+        names=nomes,
+        usecols=usecols,
+        dtype=dtype,
+        engine="c",
+        low_memory=False,
+    )
+    if not validar:
+        return df, None, df.iloc[:0]
+    # registros com campos a mais ou a menos (colunas deslocadas) são descartados e contados
+    malformados = data_quality.registros_malformados(dados, encoding, sep, len(nomes), len(df))
+    if malformados:
+        df = df.drop(index=df.index[malformados])
+    return data_quality.validar(df, linhas_ignoradas=len(malformados))
+
+
+def read_csv_parallel(path: Path, usecols: Optional[Sequence[str]] = None,
+                      dtype: Optional[Dict[str, str]] = None,
+                      workers: Optional[int] = None, validar: bool = False,
+                      progresso: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    """
+    Lê um CSV grande em paralelo e devolve um único DataFrame, na ordem
+    original das linhas. Colunas de usecols ausentes no arquivo são ignoradas.
+    Com workers=1 (ou arquivo pequeno) a leitura é feita no próprio processo.
+
+    Com validar=True cada faixa é validada logo após o parse (data_quality) e
+    o relatório do arquivo fica em df.attrs["qualidade"] = {"relatorio", "quarentena"}.
+
+    progresso(bytes_lidos, bytes_total), se informado, é chamado a cada faixa concluída.
+    """
+    path = Path(path)
+    encoding, sep, nomes, inicio = detect_csv_format(path)
+
+    if usecols is None:
+        colunas = list(nomes)
+    else:
+        colunas = [c for c in usecols if c in nomes]
+    if not colunas:
+        return pd.DataFrame()
+
+    dtype_projetado = {c: t for c, t in (dtype or {}).items() if c in colunas}
+    dtype_faixa = _dtype_worker(dtype_projetado)
+
+    workers = workers or os.cpu_count() or 1
+    tamanho = os.path.getsize(path)
+    if workers <= 1 or tamanho < TAMANHO_MINIMO_PARALELO:
+        faixas = [(inicio, tamanho)]
+    else:
+        n_faixas = max(workers, -(-(tamanho - inicio) // TAMANHO_MAXIMO_FAIXA))
+        faixas = split_byte_ranges(path, n_faixas, inicio)
+
+    args = (encoding, sep, nomes, colunas, dtype_faixa, validar)
+    if len(faixas) == 1:
+        lidas = [_ler_faixa(str(path), faixas[0][0], faixas[0][1], *args)]
+        if progresso:
+            progresso(tamanho, tamanho)
+    else:
+        lidas = [None] * len(faixas)
+        with ProcessPoolExecutor(max_workers=min(workers, len(faixas))) as pool:
+            futuros = {pool.submit(_ler_faixa, str(path), a, b, *args): i for i, (a, b) in enumerate(faixas)}
+            concluidos = inicio
+            # resultados guardados pela posição da faixa: a ordem das linhas não depende da ordem de término
+            for futuro in as_completed(futuros):
+                i = futuros[futuro]
+                lidas[i] = futuro.result()
+                concluidos += faixas[i][1] - faixas[i][0]
+                if progresso:
+                    progresso(concluidos, tamanho)
+
+    partes = [p for p, _, _ in lidas if len(p)]
+    if not partes:
+        df = pd.DataFrame(columns=colunas)
+    else:
+        df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0].reset_index(drop=True)
+        for col, tipo in dtype_projetado.items():
+            if tipo == "category":
+                df[col] = df[col].astype("category")
+        df = df[colunas]
+    if validar:
+        df.attrs["qualidade"] = {
+            "relatorio": data_quality.somar(r for _, r, _ in lidas),
+            "quarentena": data_quality.juntar_quarentenas([q for _, _, q in lidas]),
+        }
+    return df
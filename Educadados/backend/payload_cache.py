@@ -0,0 +1,117 @@
+"""
+Cache de respostas já serializadas (JSON e JSON+gzip) dos endpoints mais quentes.
+
+A chave é (endpoint, parâmetros, versão dos dados): enquanto a versão não
+muda, uma repetição devolve os mesmos bytes sem montar dicionários nem
+codificar JSON de novo. O total guardado respeita um orçamento em bytes
+(LRU), e as entradas de um ano são descartadas quando ele é recarregado.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+# abaixo disso o gzip não compensa o cabeçalho e o custo de descompactar
+MIN_BYTES_GZIP = 512
+
+
+class Payload(NamedTuple):
+    corpo: bytes
+    gzip: Optional[bytes]
+    etag: str
+    ano: Optional[int]
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.corpo) + len(self.gzip or b"")
+
+
+def codificar(payload, etag: Optional[str] = None, ano: Optional[int] = None) -> Payload:
+    """Serializa como o JSONResponse do FastAPI e pré-comprime com gzip."""
+    corpo = JSONResponse(payload).body
+    comprimido = gzip.compress(corpo, compresslevel=6, mtime=0) if len(corpo) >= MIN_BYTES_GZIP else None
+    if comprimido is not None and len(comprimido) >= len(corpo):
+        comprimido = None
+    if etag is None:
+        etag = hashlib.sha1(corpo).hexdigest()[:16]
+    return Payload(corpo, comprimido, f'"{etag}"', ano)
+
+
+class PayloadCache:
+    """LRU de Payloads limitado a max_bytes (corpo + versão gzip)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable) -> Optional[Payload]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada
+
+    def __contains__(self, chave: Hashable) -> bool:
+        """Se a chave está no cache (sem mexer na ordem LRU nem nos contadores)."""
+        with self._lock:
+            return chave in self._entradas
+
+    def guardar(self, chave: Hashable, entrada: Payload) -> Payload:
+        if entrada.tamanho > self.max_bytes:
+            return entrada
+        with self._lock:
+            antiga = self._entradas.pop(chave, None)
+            if antiga is not None:
+                self._bytes -= antiga.tamanho
+            self._entradas[chave] = entrada
+            self._bytes += entrada.tamanho
+            while self._bytes > self.max_bytes:
+                _, despejada = self._entradas.popitem(last=False)
+                self._bytes -= despejada.tamanho
+        return entrada
+
+    def invalidar(self, ano: Optional[int] = None):
+        """Remove as entradas do ano (e as que não são de um ano só, como /health); sem ano, limpa tudo."""
+        with self._lock:
+            if ano is None:
+                self._entradas.clear()
+                self._bytes = 0
+                return
+            for chave in [c for c, e in self._entradas.items() if e.ano in (ano, None)]:
+                self._bytes -= self._entradas.pop(chave).tamanho
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+    def responder(self, request: Request, chave: Hashable, gerar: Callable[[], Payload]) -> Response:
+        """Resposta crua com os bytes do cache (gerando na primeira vez), 304 ou gzip conforme o cliente."""
+        entrada = self.obter(chave)
+        if entrada is None:
+            entrada = self.guardar(chave, gerar())
+
+        headers = {"ETag": entrada.etag, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == entrada.etag:
+            return Response(status_code=304, headers=headers)
+        if entrada.gzip is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(entrada.gzip, media_type="application/json", headers=headers)
+        return Response(entrada.corpo, media_type="application/json", headers=headers)
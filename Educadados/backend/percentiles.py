@@ -0,0 +1,91 @@
+"""
+Índice de percentis das notas por ano, área e recorte (nacional, UF, escola).
+
+As notas do ENEM têm uma casa decimal, então um histograma acumulado com
+faixas de 0,1 ponto é exato: o percentil de uma nota é uma leitura no vetor
+acumulado e o inverso (nota de um percentil) é uma busca binária. Cada
+recorte ocupa ~40 KB por área, em vez de uma cópia ordenada das notas.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+from lazy_imports import preguicoso
+from summaries import AREAS
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+RESOLUCAO = 0.1
+NOTA_MAXIMA = 1000.0
+N_FAIXAS = int(round(NOTA_MAXIMA / RESOLUCAO)) + 1
+
+
+def _faixas(notas: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(np.asarray(notas, dtype=np.float64) / RESOLUCAO), 0, N_FAIXAS - 1).astype(np.int64)
+
+
+def _faixas_consultadas(notas: Sequence[float]) -> np.ndarray:
+    """Faixa da maior nota armazenável <= cada nota consultada (719,96 fica na faixa de 719,9, não na de 720,0)."""
+    # a folga absorve o erro de ponto flutuante da divisão (512,3 / 0,1 = 5122,999...)
+    faixas = np.floor(np.asarray(notas, dtype=np.float64) / RESOLUCAO + 1e-6)
+    return np.clip(faixas, 0, N_FAIXAS - 1).astype(np.int64)
+
+
+def _acumulados_por_grupo(df: pd.DataFrame, coluna: str, area: str) -> Dict[str, np.ndarray]:
+    """{grupo: contagem acumulada (int32)} com um único bincount para todos os grupos."""
+    if coluna not in df.columns:
+        return {}
+    codigos, grupos = pd.factorize(df[coluna], sort=True)
+    notas = df[area].to_numpy(dtype=np.float64)
+    ok = (codigos >= 0) & ~np.isnan(notas)
+    k = len(grupos)
+    hist = np.bincount(codigos[ok] * N_FAIXAS + _faixas(notas[ok]), minlength=k * N_FAIXAS).reshape(k, N_FAIXAS)
+    acumulado = hist.cumsum(axis=1).astype(np.int32)
+    chave = lambda g: str(int(g)) if isinstance(g, (int, np.integer, float, np.floating)) else str(g)
+    return {chave(g): acumulado[i] for i, g in enumerate(grupos)}
+
+
+def indice_percentis(df: pd.DataFrame) -> Dict[str, dict]:
+    """{área: {"nacional": acumulado, "uf": {uf: acumulado}, "escola": {código: acumulado}}}."""
+    indice = {}
+    for area in AREAS:
+        if area not in df.columns:
+            continue
+        notas = df[area].to_numpy(dtype=np.float64)
+        notas = notas[~np.isnan(notas)]
+        indice[area] = {
+            "nacional": np.bincount(_faixas(notas), minlength=N_FAIXAS).cumsum().astype(np.int32),
+            "uf": _acumulados_por_grupo(df, "SG_UF_RESIDENCIA", area),
+            "escola": _acumulados_por_grupo(df, "TP_ESCOLA", area),
+        }
+    return indice
+
+
+def acumulado(indice: dict, area: str, uf: Optional[str] = None, escola: Optional[int] = None) -> Optional[np.ndarray]:
+    por_area = indice.get(area)
+    if por_area is None:
+        return None
+    if uf is not None:
+        return por_area["uf"].get(uf.upper())
+    if escola is not None:
+        return por_area["escola"].get(str(escola))
+    return por_area["nacional"]
+
+
+def percentis_das_notas(acum: np.ndarray, notas: Sequence[float]) -> np.ndarray:
+    """% de participantes com nota menor ou igual a cada nota."""
+    n = int(acum[-1])
+    if n == 0:
+        return np.full(len(notas), np.nan)
+    return 100.0 * acum[_faixas_consultadas(notas)] / n
+
+
+def notas_dos_percentis(acum: np.ndarray, percentis: Sequence[float]) -> np.ndarray:
+    """Menor nota cujo percentil (% com nota <= ela) alcança cada percentil pedido."""
+    n = int(acum[-1])
+    if n == 0:
+        return np.full(len(percentis), np.nan)
+    alvo = np.maximum(np.ceil(np.asarray(percentis, dtype=np.float64) / 100.0 * n), 1)
+    return np.searchsorted(acum, alvo, side="left") * RESOLUCAO
@@ -0,0 +1,381 @@
+"""
+Leitura dos microdados publicados por upload_to_hf.py direto do Hugging Face.
+
+O repositório tem um manifest.json com o SHA-256 de cada partição Parquet
+(microdados/ano=AAAA/uf=XX/part-0.parquet). Cada partição é lida com
+requisições HTTP Range: só o rodapé, as colunas pedidas e os row groups
+necessários são baixados, e cada bloco fica num cache em disco endereçado
+pelo hash do arquivo (um arquivo novo nunca reaproveita blocos velhos).
+
+Servidor local para testes (mesmo layout do Hub, com suporte a Range):
+    python remote_dataset.py servir /caminho/hub --porta 8765
+    USE_HUGGINGFACE=true HF_DATASET_URL=http://127.0.0.1:8765 uvicorn main:app
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from lazy_imports import preguicoso
+
+pd = preguicoso("pandas")
+
+# tamanho dos blocos buscados e guardados no cache
+BLOCO_REMOTO = int(os.environ.get("REMOTE_BLOCK_KB", "256")) * 1024
+# o manifest é consultado de novo depois desse tempo
+MANIFESTO_TTL = float(os.environ.get("REMOTE_MANIFEST_TTL", "60"))
+TENTATIVAS = 3
+
+# ==========================================
+#   CACHE EM DISCO
+# ==========================================
+
+class DiskCache:
+    """
+    Cache de blocos em disco com limite de tamanho. As chaves já incluem o
+    hash do conteúdo, então nada precisa ser invalidado; quando o limite é
+    passado, os blocos usados há mais tempo (mtime) são apagados.
+
+    Só os blocos (em subpastas de dois caracteres) contam no limite: arquivos
+    na raiz da pasta, como a cópia do manifest.json, nunca são despejados.
+    """
+
+    def __init__(self, pasta: Path, max_bytes: int):
+        self.pasta = Path(pasta)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self.total = sum(p.stat().st_size for p in self._arquivos())
+
+    def _arquivos(self):
+        return (p for p in self.pasta.glob("??/*") if p.is_file() and not p.name.endswith(".tmp"))
+
+    def _caminho(self, chave: str) -> Path:
+        nome = hashlib.sha256(chave.encode()).hexdigest()
+        return self.pasta / nome[:2] / nome
+
+    def get(self, chave: str) -> Optional[bytes]:
+        path = self._caminho(chave)
+        try:
+            dados = path.read_bytes()
+            os.utime(path)  # marca como usado recentemente
+            return dados
+        except OSError:
+            return None
+
+    def put(self, chave: str, dados: bytes):
+        path = self._caminho(chave)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporario = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        temporario.write_bytes(dados)
+        with self._lock:
+            anterior = path.stat().st_size if path.exists() else 0
+            os.replace(temporario, path)
+            self.total += len(dados) - anterior
+            if self.total > self.max_bytes:
+                self._despejar()
+
+    def _despejar(self):
+        """Apaga os menos usados até ficar em 90% do limite."""
+        arquivos = sorted(self._arquivos(), key=lambda p: p.stat().st_mtime)
+        alvo = int(self.max_bytes * 0.9)
+        for path in arquivos:
+            if self.total <= alvo:
+                break
+            try:
+                tamanho = path.stat().st_size
+                path.unlink()
+                self.total -= tamanho
+            except OSError:
+                continue
+
+    def limpar(self):
+        """Apaga tudo, inclusive o que fica fora do limite (cópia do manifest)."""
+        with self._lock:
+            for path in [p for p in self.pasta.rglob("*") if p.is_file()]:
+                path.unlink(missing_ok=True)
+            self.total = 0
+
+# ==========================================
+#   HTTP
+# ==========================================
+
+def baixar(url: str, token: Optional[str] = None, inicio: Optional[int] = None, fim: Optional[int] = None) -> bytes:
+    """GET (opcionalmente só os bytes [inicio, fim)) com algumas retentativas."""
+    cabecalhos = {"User-Agent": "educadados-api"}
+    if token:
+        cabecalhos["Authorization"] = f"Bearer {token}"
+    if inicio is not None:
+        cabecalhos["Range"] = f"bytes={inicio}-{fim - 1}"
+    for tentativa in range(1, TENTATIVAS + 1):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=cabecalhos), timeout=60) as resposta:
+                dados = resposta.read()
+                if inicio is not None and resposta.status != 206:
+                    # servidor ignorou o Range e mandou o arquivo todo
+                    dados = dados[inicio:fim]
+                return dados
+        except urllib.error.HTTPError as e:
+            if e.code < 500 or tentativa == TENTATIVAS:
+                raise
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            if tentativa == TENTATIVAS:
+                raise
+        time.sleep(2 ** tentativa)
+
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    Arquivo remoto somente leitura para o pyarrow: cada read() busca apenas os
+    blocos que faltam no cache, juntando blocos vizinhos numa única requisição.
+    """
+
+    def __init__(self, url: str, tamanho: int, sha256: str, cache: DiskCache, token: Optional[str] = None):
+        self.url = url
+        self.tamanho = tamanho
+        self.sha256 = sha256
+        self.cache = cache
+        self.token = token
+        self.pos = 0
+        self.bytes_baixados = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.pos = offset
+        elif whence == io.SEEK_CUR:
+            self.pos += offset
+        else:
+            self.pos = self.tamanho + offset
+        return self.pos
+
+    def _blocos(self, primeiro: int, ultimo: int) -> Dict[int, bytes]:
+        blocos, faltando = {}, []
+        for i in range(primeiro, ultimo + 1):
+            dados = self.cache.get(f"{self.sha256}:{BLOCO_REMOTO}:{i}")
+            if dados is None:
+                faltando.append(i)
+            else:
+                blocos[i] = dados
+
+        # agrupa blocos consecutivos que faltam numa requisição só
+        seqs = []
+        for i in faltando:
+            if seqs and seqs[-1][1] == i - 1:
+                seqs[-1][1] = i
+            else:
+                seqs.append([i, i])
+        for a, b in seqs:
+            inicio, fim = a * BLOCO_REMOTO, min((b + 1) * BLOCO_REMOTO, self.tamanho)
+            dados = baixar(self.url, self.token, inicio, fim)
+            self.bytes_baixados += len(dados)
+            for i in range(a, b + 1):
+                bloco = dados[(i - a) * BLOCO_REMOTO:(i - a + 1) * BLOCO_REMOTO]
+                self.cache.put(f"{self.sha256}:{BLOCO_REMOTO}:{i}", bloco)
+                blocos[i] = bloco
+        return blocos
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = self.tamanho - self.pos
+        n = max(0, min(n, self.tamanho - self.pos))
+        if n == 0:
+            return b""
+        primeiro, ultimo = self.pos // BLOCO_REMOTO, (self.pos + n - 1) // BLOCO_REMOTO
+        blocos = self._blocos(primeiro, ultimo)
+        dados = b"".join(blocos[i] for i in range(primeiro, ultimo + 1))
+        inicio = self.pos - primeiro * BLOCO_REMOTO
+        self.pos += n
+        return dados[inicio:inicio + n]
+
+    def readinto(self, buffer):
+        dados = self.read(len(buffer))
+        buffer[:len(dados)] = dados
+        return len(dados)
+
+# ==========================================
+#   DATASET REMOTO
+# ==========================================
+
+class RemoteDataset:
+    """Repositório publicado por upload_to_hf.py, acessado por HTTP."""
+
+    def __init__(self, url_base: str, cache: DiskCache, token: Optional[str] = None, workers: int = 8):
+        self.url_base = url_base.rstrip("/")
+        self.cache = cache
+        self.token = token
+        self.workers = workers
+        self._manifesto = None
+        self._manifesto_em = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def do_hub(cls, repo_id: str, cache: DiskCache, endpoint: str = "https://huggingface.co",
+               revisao: str = "main", token: Optional[str] = None, workers: int = 8):
+        return cls(f"{endpoint.rstrip('/')}/datasets/{repo_id}/resolve/{revisao}", cache, token, workers)
+
+    def url(self, caminho: str) -> str:
+        return f"{self.url_base}/{caminho}"
+
+    def manifesto(self) -> dict:
+        """manifest.json do repositório (relido a cada MANIFESTO_TTL; última cópia se a rede cair)."""
+        with self._lock:
+            if self._manifesto is not None and time.time() - self._manifesto_em < MANIFESTO_TTL:
+                return self._manifesto
+            # fora das subpastas de blocos: não conta no limite do cache nem é despejada
+            copia = self.cache.pasta / "manifest.json"
+            try:
+                dados = baixar(self.url("manifest.json"), self.token)
+                copia.write_bytes(dados)
+            except Exception as e:
+                if not copia.exists():
+                    raise
+                print(f"   ⚠ Manifest remoto indisponível ({e}); usando a última cópia")
+                dados = copia.read_bytes()
+            self._manifesto = json.loads(dados)
+            self._manifesto_em = time.time()
+            return self._manifesto
+
+    def particoes(self, year: int, tipo: str = "microdados", ufs: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        prefixo = f"{tipo}/ano={year}/"
+        ufs = {u.upper() for u in ufs} if ufs else None
+        resultado = {}
+        for caminho, meta in self.manifesto()["arquivos"].items():
+            if not caminho.startswith(prefixo):
+                continue
+            uf = re.search(r"/uf=([^/]+)/", caminho)
+            if ufs is not None and (uf is None or uf.group(1) not in ufs):
+                continue
+            resultado[caminho] = meta
+        return resultado
+
+    def versao_ano(self, year: int) -> Optional[str]:
+        """Versão do ano = hash dos SHA-256 das suas partições (None se o ano não foi publicado)."""
+        partes = sorted(f"{c}:{m['sha256']}" for c, m in self.particoes(year).items())
+        partes += sorted(f"{c}:{m['sha256']}" for c, m in self.particoes(year, "itens").items())
+        if not partes:
+            return None
+        return hashlib.sha1("|".join(partes).encode()).hexdigest()[:12]
+
+    def abrir(self, caminho: str, meta: dict) -> HTTPRangeFile:
+        return HTTPRangeFile(self.url(caminho), meta["bytes"], meta["sha256"], self.cache, self.token)
+
+    def ler_particao(self, caminho: str, meta: dict, colunas: Optional[Sequence[str]] = None,
+                     filtros: Optional[Dict[str, Iterable]] = None):
+        """Lê só as colunas pedidas e os row groups que podem conter os valores de filtros."""
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(self.abrir(caminho, meta), pre_buffer=True)
+        existentes = set(arquivo.schema_arrow.names)
+        cols = [c for c in colunas if c in existentes] if colunas else None
+        grupos = grupos_necessarios(arquivo.metadata, filtros) if filtros else list(range(arquivo.num_row_groups))
+        return arquivo.read_row_groups(grupos, columns=cols)
+
+    def ler_ano(self, year: int, colunas: Optional[Sequence[str]] = None, ufs: Optional[Iterable[str]] = None,
+                filtros: Optional[Dict[str, Iterable]] = None, tipo: str = "microdados") -> pd.DataFrame:
+        """Junta as partições do ano (lidas em paralelo) num DataFrame."""
+        import pyarrow as pa
+
+        particoes = self.particoes(year, tipo, ufs)
+        if not particoes:
+            return pd.DataFrame()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(particoes)))) as pool:
+            tabelas = list(pool.map(lambda item: self.ler_particao(item[0], item[1], colunas, filtros), sorted(particoes.items())))
+        tabela = pa.concat_tables(tabelas, promote_options="default")
+        if colunas:
+            tabela = tabela.select([c for c in colunas if c in tabela.column_names])
+        return tabela.to_pandas()
+
+
+def grupos_necessarios(metadata, filtros: Dict[str, Iterable]) -> List[int]:
+    """Row groups cujo min/max (estatísticas do Parquet) pode conter os valores pedidos."""
+    indices = {metadata.schema.column(i).name: i for i in range(metadata.num_columns)}
+    grupos = []
+    for g in range(metadata.num_row_groups):
+        rg = metadata.row_group(g)
+        manter = True
+        for coluna, valores in filtros.items():
+            if coluna not in indices:
+                continue
+            stats = rg.column(indices[coluna]).statistics
+            if stats is None or not stats.has_min_max:
+                continue
+            if not any(stats.min <= v <= stats.max for v in valores):
+                manter = False
+                break
+        if manter:
+            grupos.append(g)
+    return grupos
+
+# ==========================================
+#   SERVIDOR LOCAL (STAND-IN DO HUB)
+# ==========================================
+
+def servir(pasta: str, porta: int = 8765, host: str = "127.0.0.1"):
+    """Serve uma pasta por HTTP com suporte a Range (para testar sem o Hub)."""
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(SimpleHTTPRequestHandler):
+        def send_head(self):
+            faixa = self.headers.get("Range")
+            path = Path(self.translate_path(self.path))
+            m = re.fullmatch(r"bytes=(\d*)-(\d*)", faixa or "")
+            if not m or not path.is_file():
+                return super().send_head()
+            tamanho = path.stat().st_size
+            if m.group(1):
+                inicio = int(m.group(1))
+                fim = min(int(m.group(2)) if m.group(2) else tamanho - 1, tamanho - 1)
+            else:
+                inicio, fim = max(0, tamanho - int(m.group(2))), tamanho - 1
+            if inicio > fim:
+                self.send_error(416)
+                return None
+            with open(path, "rb") as f:
+                f.seek(inicio)
+                dados = f.read(fim - inicio + 1)
+            self.send_response(206)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{tamanho}")
+            self.send_header("Content-Length", str(fim - inicio + 1))
+            self.end_headers()
+            return io.BytesIO(dados)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, porta), partial(Handler, directory=pasta))
+    print(f"🌐 Servindo {pasta} em http://{host}:{servidor.server_address[1]}")
+    return servidor
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor local com o layout do dataset no Hub (testes)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("servir")
+    p.add_argument("pasta")
+    p.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+    servir(args.pasta, args.porta).serve_forever()
@@ -0,0 +1,275 @@
+"""
+Estimativas rápidas de um ano a partir de uma amostra aleatória do CSV.
+
+Enquanto a carga completa de um ano frio roda em segundo plano, a API responde
+com estimativas: o arquivo é dividido em `blocos` estratos de mesmo tamanho e,
+de cada um, é lido um trecho de `tamanho_bloco` bytes numa posição sorteada
+(alinhado a quebras de linha). As linhas passam pelas mesmas regras de
+qualidade da carga normal.
+
+Como as linhas chegam em conglomerados (trechos contíguos do arquivo), os erros
+padrão usam a variação entre blocos (estimador de razão linearizado) em vez de
+supor linhas independentes: se o arquivo estiver ordenado por algo ligado às
+notas (UF, escola), o intervalo fica mais largo em vez de otimista.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import data_quality
+from lazy_imports import preguicoso
+from parallel_csv import detect_csv_format
+from summaries import AREAS, OBJETIVAS, PRESENCA_DA_AREA, PRESENCAS
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+BLOCOS_PADRAO = 200
+TAMANHO_BLOCO_PADRAO = 64 * 1024
+Z_95 = 1.96
+
+
+class Amostra(NamedTuple):
+    df: pd.DataFrame               # linhas válidas da amostra
+    blocos: np.ndarray             # bloco de origem de cada linha de df
+    bytes_por_bloco: np.ndarray    # bytes de linhas completas lidos em cada bloco
+    bytes_dados: int               # bytes de dados do arquivo (sem o cabeçalho)
+    relatorio: dict                # relatório de qualidade da amostra (data_quality)
+    segundos: float
+
+    @property
+    def n_blocos(self) -> int:
+        return len(self.bytes_por_bloco)
+
+    @property
+    def fracao(self) -> float:
+        return float(self.bytes_por_bloco.sum()) / self.bytes_dados if self.bytes_dados else 1.0
+
+    def info(self) -> dict:
+        return {
+            "linhas": len(self.df),
+            "blocos": self.n_blocos,
+            "bytes": int(self.bytes_por_bloco.sum()),
+            "fracao_arquivo": self.fracao,
+            "linhas_em_quarentena": self.relatorio["linhas_em_quarentena"],
+            "linhas_ignoradas": self.relatorio["linhas_ignoradas"],
+            "segundos": self.segundos,
+        }
+
+
+def _inicio_de_registro(dados: bytes, pos: int, sep: bytes, n_campos: int) -> int:
+    """
+    Primeira linha a partir de pos que parece um registro inteiro (aspas pareadas e
+    n_campos campos): pula o resto de um campo entre aspas com quebra de linha.
+    """
+    while pos < len(dados):
+        nl = dados.find(b"\n", pos)
+        if nl < 0:
+            return len(dados)
+        linha = dados[pos:nl]
+        if linha.count(b'"') % 2 == 0 and sum(p.count(sep) for p in linha.split(b'"')[::2]) == n_campos - 1:
+            return pos
+        pos = nl + 1
+    return pos
+
+
+def _trechos(path: Path, inicio: int, blocos: int, tamanho_bloco: int, rng: random.Random,
+             sep: bytes, n_campos: int) -> List[bytes]:
+    """Um trecho de registros completos por estrato (o arquivo inteiro, em um trecho, se for pequeno)."""
+    tamanho = os.path.getsize(path)
+    estrato = (tamanho - inicio) / blocos
+    with open(path, "rb") as f:
+        if estrato <= tamanho_bloco:
+            f.seek(inicio)
+            dados = f.read()
+            return [dados if dados.endswith(b"\n") else dados + b"\n"]
+        trechos = []
+        for i in range(blocos):
+            pos = inicio + int(estrato * i + rng.random() * (estrato - tamanho_bloco))
+            f.seek(pos)
+            dados = f.read(tamanho_bloco)
+            # descarta o registro parcial do começo (exceto no início dos dados) e o do fim
+            comeco = 0 if pos == inicio else _inicio_de_registro(dados, dados.find(b"\n") + 1, sep, n_campos)
+            fim = dados.rfind(b"\n") + 1
+            # o último registro não pode terminar dentro de um campo entre aspas
+            aspas = dados.count(b'"', comeco, fim) if fim > comeco else 0
+            while fim > comeco and aspas % 2:
+                anterior = dados.rfind(b"\n", comeco, fim - 1) + 1
+                aspas -= dados.count(b'"', anterior, fim)
+                fim = anterior
+            trechos.append(dados[comeco:fim] if fim > comeco else b"")
+        return trechos
+
+
+def _registros(dados: bytes) -> int:
+    """Registros de um trecho que começa no início de um registro (quebras de linha fora de aspas)."""
+    if b'"' not in dados:
+        return dados.count(b"\n")
+    return sum(parte.count(b"\n") for parte in dados.split(b'"')[::2])
+
+
+def amostrar_csv(path: Path, usecols: Sequence[str], dtype: Optional[Dict[str, str]] = None,
+                 blocos: int = BLOCOS_PADRAO, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                 semente: Optional[int] = None) -> Amostra:
+    """Lê e valida uma amostra estratificada de trechos do CSV (ver docstring do módulo)."""
+    inicio_leitura = time.perf_counter()
+    path = Path(path)
+    encoding, sep, nomes, inicio = detect_csv_format(path)
+    colunas = [c for c in usecols if c in nomes]
+    # categorias são montadas depois de juntar os blocos, como na leitura paralela
+    dtype_bloco = {c: ("object" if t == "category" else t) for c, t in (dtype or {}).items() if c in colunas}
+
+    trechos = [t for t in _trechos(path, inicio, blocos, tamanho_bloco, random.Random(semente),
+                                        sep.encode(encoding), len(nomes)) if t.strip()]
+
+    def ler(dados: bytes) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(dados), sep=sep, encoding=encoding, header=None, names=nomes,
+                           usecols=colunas, dtype=dtype_bloco, engine="c", low_memory=False)
+
+    # caminho rápido: um parse só para todos os trechos, se o total de registros bate
+    # com as quebras de linha fora de aspas de cada trecho (origem de cada linha)
+    quebras = [_registros(t) for t in trechos]
+    try:
+        dados = b"".join(trechos)
+        df = ler(dados)
+        rapido = len(df) == sum(quebras)
+    except ValueError:
+        rapido = False
+    if rapido:
+        origem = np.repeat(np.arange(len(trechos), dtype=np.int32), quebras)
+        malformados = data_quality.registros_malformados(dados, encoding, sep, len(nomes), len(df))
+        if malformados:
+            df = df.drop(index=df.index[malformados]).reset_index(drop=True)
+            origem = np.delete(origem, malformados)
+        partes, origem, bytes_por_bloco, ignoradas = [df], [origem], [len(t) for t in trechos], len(malformados)
+    else:
+        # campos com quebra de linha (ou trecho começando no meio de um): lê trecho a trecho
+        partes, origem, bytes_por_bloco, ignoradas = [], [], [], 0
+        for dados in trechos:
+            try:
+                df = ler(dados)
+            except ValueError:
+                continue
+            malformados = data_quality.registros_malformados(dados, encoding, sep, len(nomes), len(df))
+            if malformados:
+                df = df.drop(index=df.index[malformados])
+                ignoradas += len(malformados)
+            origem.append(np.full(len(df), len(partes), dtype=np.int32))
+            bytes_por_bloco.append(len(dados))
+            partes.append(df)
+
+    if not partes:
+        raise ValueError(f"Nenhuma linha legível na amostra de {path}")
+    df = pd.concat(partes, ignore_index=True)
+    for col, tipo in (dtype or {}).items():
+        if tipo == "category" and col in df.columns:
+            df[col] = df[col].astype("category")
+    blocos_linha = np.concatenate(origem)
+
+    valido, relatorio, _ = data_quality.validar(df, linhas_ignoradas=ignoradas, max_quarentena=0)
+    mantidas = valido.index.to_numpy()
+    return Amostra(
+        df=valido.reset_index(drop=True),
+        blocos=blocos_linha[mantidas],
+        bytes_por_bloco=np.asarray(bytes_por_bloco, dtype=np.float64),
+        bytes_dados=os.path.getsize(path) - inicio,
+        relatorio=relatorio,
+        segundos=time.perf_counter() - inicio_leitura,
+    )
+
+
+def razao(termos: Sequence[Tuple[np.ndarray, np.ndarray, float]], z: float = Z_95) -> Optional[dict]:
+    """
+    Estimativa de Σ peso·(Σy/Σm) com erro padrão linearizado entre blocos.
+    Cada termo é (y por bloco, m por bloco, peso); um termo só é a razão comum
+    (média = soma das notas / contagem, taxa = casos / linhas).
+    """
+    estimativa = 0.0
+    residuo = None
+    for y, m, peso in termos:
+        total_m = m.sum()
+        if total_m == 0:
+            return None
+        r = y.sum() / total_m
+        estimativa += peso * r
+        parcela = peso * (y - r * m) / total_m
+        residuo = parcela if residuo is None else residuo + parcela
+    k = len(residuo)
+    if k < 2:
+        return {"estimativa": estimativa, "erro_padrao": None, "ic95": None}
+    ep = math.sqrt(k / (k - 1) * float(np.dot(residuo, residuo)))
+    return {"estimativa": estimativa, "erro_padrao": ep, "ic95": [estimativa - z * ep, estimativa + z * ep]}
+
+
+def _escalar(r: Optional[dict], fator: float) -> Optional[dict]:
+    if r is None:
+        return None
+    return {
+        "estimativa": r["estimativa"] * fator,
+        "erro_padrao": r["erro_padrao"] * fator if r["erro_padrao"] is not None else None,
+        "ic95": [v * fator for v in r["ic95"]] if r["ic95"] else None,
+    }
+
+
+def _por_bloco(amostra: Amostra, mascara: Optional[np.ndarray] = None, valores: Optional[np.ndarray] = None) -> np.ndarray:
+    blocos = amostra.blocos if mascara is None else amostra.blocos[mascara]
+    if valores is not None and mascara is not None:
+        valores = valores[mascara]
+    return np.bincount(blocos, weights=valores, minlength=amostra.n_blocos).astype(np.float64)
+
+
+def estimar(amostra: Amostra, z: float = Z_95) -> dict:
+    """
+    Estimativas (com erro padrão e IC) das métricas dos cards do dashboard:
+    inscritos, médias por área, média geral das objetivas, taxa de presença
+    por prova e médias entre presentes.
+    """
+    df = amostra.df
+    linhas = _por_bloco(amostra)
+
+    # inscritos = bytes de dados x (linhas válidas por byte lido)
+    inscritos = _escalar(razao([(linhas, amostra.bytes_por_bloco, 1.0)], z), amostra.bytes_dados)
+
+    notas, termos_todos = {}, {}
+    for col in AREAS:
+        if col not in df.columns:
+            continue
+        v = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(v)
+        termos_todos[col] = (_por_bloco(amostra, ok, v), _por_bloco(amostra, ok))
+        notas[col] = v
+
+    taxa_presenca, medias_presentes, termos_presentes = {}, {}, {}
+    for col in PRESENCAS:
+        if col in df.columns:
+            presente = (df[col] == 1).to_numpy()
+            taxa_presenca[col] = _escalar(razao([(_por_bloco(amostra, presente), linhas, 1.0)], z), 100.0)
+    for area, col in PRESENCA_DA_AREA.items():
+        if area in notas and col in df.columns:
+            ok = ~np.isnan(notas[area]) & (df[col] == 1).to_numpy()
+            termos_presentes[area] = (_por_bloco(amostra, ok, notas[area]), _por_bloco(amostra, ok))
+            medias_presentes[area] = razao([(*termos_presentes[area], 1.0)], z)
+
+    # como no resultado exato (summaries.acumular): cada nota entre os presentes na
+    # prova dela, ou entre todos com nota se não há a coluna de presença
+    termos = {col: termos_presentes.get(col, t) for col, t in termos_todos.items()}
+    medias = {col: razao([(y, m, 1.0)], z) for col, (y, m) in termos.items()}
+    objetivas = [termos[c] for c in OBJETIVAS if c in termos]
+    media_geral = razao([(y, m, 1.0 / len(objetivas)) for y, m in objetivas], z) if objetivas else None
+    media_redacao = medias.get("NU_NOTA_REDACAO")
+
+    return {
+        "inscritos": inscritos,
+        "medias": medias,
+        "media_geral": media_geral,
+        "media_redacao": media_redacao,
+        "taxa_presenca": taxa_presenca,
+        "medias_presentes": medias_presentes,
+    }
@@ -145,17 +145,17 @@ if exist "requirements.txt" (
     pip install -q fastapi uvicorn pandas numpy python-multipart
 )
 
-REM Se usar Hugging Face, instala datasets
+REM Se usar Hugging Face, instala pyarrow (leitura das partições Parquet)
 if "%USE_HUGGINGFACE%"=="true" (
     echo.
-    echo 📦 Instalando biblioteca Hugging Face Datasets...
-    pip install -q datasets
+    echo 📦 Instalando pyarrow para ler o dataset do Hugging Face...
+    pip install -q pyarrow
     if errorlevel 1 (
-        echo ❌ Erro ao instalar datasets
+        echo ❌ Erro ao instalar pyarrow
         echo    Continuando sem suporte a Hugging Face...
         set USE_HUGGINGFACE=false
     ) else (
-        echo ✓ Biblioteca datasets instalada
+        echo ✓ pyarrow instalado
     )
 )
 
@@ -0,0 +1,81 @@
+#!/usr/bin/env bash
+# Inicialização da API no Linux/Mac (equivalente ao start.bat, sem perguntas).
+#
+# Uso: ./start.sh [--hf usuario/enem-dataset] [--perfil] [--converter] [--porta 8000] [--reload]
+#   --hf         lê os dados do Hugging Face (USE_HUGGINGFACE=true) em vez dos CSVs locais
+#   --perfil     inspeciona os CSVs antes de subir (python educadados.py perfil)
+#   --converter  gera/atualiza o cache colunar Parquet antes de subir (carga bem mais rápida)
+# Variáveis de ambiente (PORT, CSV_WORKERS, DATA_MODE...) são repassadas à API.
+
+set -euo pipefail
+cd "$(dirname "$0")"
+
+PORTA="${PORT:-8000}"
+PERFIL=false
+CONVERTER=false
+RELOAD=""
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --hf) export USE_HUGGINGFACE=true HF_DATASET="${2:?informe o dataset: --hf usuario/enem-dataset}"; shift ;;
+        --perfil) PERFIL=true ;;
+        --converter) CONVERTER=true ;;
+        --porta) PORTA="${2:?informe a porta}"; shift ;;
+        --reload) RELOAD="--reload" ;;
+        -h|--help) sed -n '2,9p' "$(basename "$0")" | sed 's/^# \{0,1\}//'; exit 0 ;;
+        *) echo "❌ Opção desconhecida: $1"; exit 2 ;;
+    esac
+    shift
+done
+
+echo "🚀 EducaDados ENEM - Inicialização da API"
+
+# Python
+PYTHON="$(command -v python3 || command -v python || true)"
+if [ -z "$PYTHON" ]; then
+    echo "❌ Python não encontrado! Instale Python 3.8+"
+    exit 1
+fi
+echo "✓ $("$PYTHON" --version)"
+
+# ambiente virtual e dependências
+if [ ! -d venv ]; then
+    echo "🔧 Criando ambiente virtual..."
+    "$PYTHON" -m venv venv
+fi
+# shellcheck disable=SC1091
+source venv/bin/activate
+echo "📦 Instalando/verificando dependências..."
+pip install -q -r requirements.txt
+# pyarrow: partições do Hugging Face e cache colunar local
+pip install -q pyarrow || echo "⚠ pyarrow não instalado (sem Hugging Face e sem cache colunar)"
+
+if [ "${USE_HUGGINGFACE:-false}" = "true" ]; then
+    echo "📦 Fonte de dados: Hugging Face (${HF_DATASET:-$HF_DATASET_URL})"
+else
+    echo "📂 Fonte de dados: arquivos CSV locais (Microdados/)"
+    ENCONTRADOS=0
+    for ANO in 2022 2023 2024; do
+        if [ -f "Microdados/MICRODADOS_ENEM_${ANO}.csv" ]; then
+            echo "   ✓ MICRODADOS_ENEM_${ANO}.csv"
+            ENCONTRADOS=$((ENCONTRADOS + 1))
+        else
+            echo "   ⚠ MICRODADOS_ENEM_${ANO}.csv não encontrado"
+        fi
+    done
+    if [ "$ENCONTRADOS" -eq 0 ] && [ "${DATA_MODE:-raw}" != "summary" ]; then
+        echo "❌ Nenhum CSV do ENEM em backend/Microdados/ (ou use --hf / DATA_MODE=summary)"
+        exit 1
+    fi
+    if [ "$PERFIL" = true ]; then
+        python educadados.py perfil
+    fi
+    if [ "$CONVERTER" = true ]; then
+        python educadados.py converter
+    fi
+fi
+
+echo "✓ API: http://localhost:${PORTA}  |  docs: http://localhost:${PORTA}/docs"
+echo "✓ Dashboard: abra frontend/dashboard.html no navegador"
+# shellcheck disable=SC2086
+exec python -m uvicorn main:app --host 0.0.0.0 --port "$PORTA" $RELOAD
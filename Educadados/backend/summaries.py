@@ -0,0 +1,406 @@
+"""
+Resumos compactos por ano (contagem, soma e soma dos quadrados das notas).
+
+A partir desses três números dá para obter média, variância e intervalo de
+confiança de qualquer grupo sem voltar aos microdados, e somar grupos ou anos
+é só somar os registros. Cada ano gera um resumo, gravado no SummaryStore
+(summary_store.py) para que os endpoints agregados não toquem nas linhas brutas.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from typing import Dict, Iterable, Optional, Sequence
+
+from lazy_imports import preguicoso
+
+np = preguicoso("numpy")
+pd = preguicoso("pandas")
+
+# colunas de nota e o nome exibido no dashboard
+AREAS = {
+    "NU_NOTA_CN": "Ciências da Natureza",
+    "NU_NOTA_CH": "Ciências Humanas",
+    "NU_NOTA_LC": "Linguagens",
+    "NU_NOTA_MT": "Matemática",
+    "NU_NOTA_REDACAO": "Redação",
+}
+
+# códigos de TP_ESCOLA nos microdados do INEP
+TIPOS_ESCOLA = {1: "nao_respondeu", 2: "publica", 3: "privada"}
+
+# faixas de renda familiar mensal da Q006 (em salários mínimos do ano da prova)
+FAIXAS_RENDA = {
+    "A": "Nenhuma renda", "B": "Até 1 SM", "C": "1 a 1,5 SM", "D": "1,5 a 2 SM",
+    "E": "2 a 2,5 SM", "F": "2,5 a 3 SM", "G": "3 a 4 SM", "H": "4 a 5 SM",
+    "I": "5 a 6 SM", "J": "6 a 7 SM", "K": "7 a 8 SM", "L": "8 a 9 SM",
+    "M": "9 a 10 SM", "N": "10 a 12 SM", "O": "12 a 15 SM", "P": "15 a 20 SM",
+    "Q": "Acima de 20 SM",
+}
+
+PRESENCAS = ["TP_PRESENCA_CN", "TP_PRESENCA_CH", "TP_PRESENCA_LC", "TP_PRESENCA_MT"]
+
+# questões do questionário socioeconômico carregadas (opcionais: anos sem a
+# coluna a ignoram). Padrão: escolaridade do pai (Q001), da mãe (Q002) e renda (Q006)
+COLUNAS_QUESTIONARIO = [c.strip().upper() for c in os.environ.get("QUESTIONARIO_COLUNAS", "Q001,Q002,Q006").split(",") if c.strip()]
+
+# recortes do resumo -> coluna agrupada
+GRUPOS_RESUMO = {"por_uf": "SG_UF_RESIDENCIA", "por_escola": "TP_ESCOLA", "por_renda": "Q006"}
+
+FORMATO_RESUMO = 5
+
+# notas das provas objetivas (média por candidato e media_geral)
+OBJETIVAS = ["NU_NOTA_CN", "NU_NOTA_CH", "NU_NOTA_LC", "NU_NOTA_MT"]
+
+# prova cuja presença vale para cada nota (a redação é feita no dia de LC/CH)
+PRESENCA_DA_AREA = {
+    "NU_NOTA_CN": "TP_PRESENCA_CN",
+    "NU_NOTA_CH": "TP_PRESENCA_CH",
+    "NU_NOTA_LC": "TP_PRESENCA_LC",
+    "NU_NOTA_MT": "TP_PRESENCA_MT",
+    "NU_NOTA_REDACAO": "TP_PRESENCA_LC",
+}
+
+# rótulo das combinações de presença com alguma prova nula ou fora do domínio (0 faltou, 1 presente, 2 eliminado)
+COMBINACAO_INVALIDA = "inv"
+# histograma da média por candidato: faixas de 1 ponto entre 0 e 1000
+N_FAIXAS_CANDIDATO = 1001
+LINHAS_POR_BLOCO = 1_000_000
+
+
+def somar_momentos(registros: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    total = {"n": 0, "soma": 0.0, "soma_q": 0.0}
+    for m in registros:
+        total["n"] += m["n"]
+        total["soma"] += m["soma"]
+        total["soma_q"] += m["soma_q"]
+    return total
+
+
+def descrever(m: Dict[str, float], z: float = 1.96) -> Dict[str, Optional[float]]:
+    """Média, desvio padrão amostral, erro padrão e IC (normal) a partir dos momentos."""
+    n = m["n"]
+    if n == 0:
+        return {"n": 0, "media": None, "desvio": None, "erro_padrao": None, "ic95": None}
+    media = m["soma"] / n
+    if n > 1:
+        var = max((m["soma_q"] - n * media * media) / (n - 1), 0.0)
+        desvio = math.sqrt(var)
+        ep = desvio / math.sqrt(n)
+    else:
+        desvio, ep = None, None
+    ic = [media - z * ep, media + z * ep] if ep is not None else None
+    return {"n": n, "media": media, "desvio": desvio, "erro_padrao": ep, "ic95": ic}
+
+
+def momentos_por_grupo(codigos: np.ndarray, n_grupos: int, valores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Momentos de cada grupo (códigos 0..n_grupos-1; -1 = sem grupo) com bincount."""
+    v = np.asarray(valores, dtype=np.float64)
+    ok = ~np.isnan(v) & (codigos >= 0)
+    c, v = codigos[ok], v[ok]
+    return {
+        "n": np.bincount(c, minlength=n_grupos),
+        "soma": np.bincount(c, weights=v, minlength=n_grupos),
+        "soma_q": np.bincount(c, weights=v * v, minlength=n_grupos),
+    }
+
+
+def _chave(grupo) -> str:
+    return str(int(grupo)) if isinstance(grupo, (int, np.integer, float, np.floating)) else str(grupo)
+
+
+def _zerados(k: int, areas: Iterable[str]) -> dict:
+    return {
+        "inscritos": np.zeros(k, dtype=np.int64),
+        "areas": {a: {"n": np.zeros(k, dtype=np.int64), "soma": np.zeros(k), "soma_q": np.zeros(k)} for a in areas},
+    }
+
+
+def _registro(acum: dict, i) -> dict:
+    """{"inscritos", "areas": {área: momentos}} da posição i (ou de uma máscara de posições) dos acumuladores."""
+    return {
+        "inscritos": int(np.sum(acum["inscritos"][i])),
+        "areas": {
+            a: {"n": int(np.sum(m["n"][i])), "soma": float(np.sum(m["soma"][i])), "soma_q": float(np.sum(m["soma_q"][i]))}
+            for a, m in acum["areas"].items()
+        },
+    }
+
+
+def acumular(df: pd.DataFrame, bloco: int = LINHAS_POR_BLOCO) -> dict:
+    """
+    Kernel único do resumo. Em cada bloco de linhas as presenças viram um
+    código de combinação em base 4 (0 faltou, 1 presente, 2 eliminado, 3 nulo
+    ou fora do domínio) e cada nota é convertida uma só vez e alimenta os
+    bincounts de contagem, soma e soma dos quadrados por combinação e por
+    recorte (UF, tipo de escola, renda), junto com o histograma da média de
+    cada candidato nas objetivas. Nacional e presença por prova saem somando
+    as combinações, sem novas passadas.
+
+    Nos recortes, cada nota só conta se o candidato esteve presente na prova
+    dela (PRESENCA_DA_AREA), como nas médias entre presentes; sem a coluna de
+    presença, conta toda nota preenchida.
+    """
+    areas = [a for a in AREAS if a in df.columns]
+    presencas = [c for c in PRESENCAS if c in df.columns]
+    k = 4 ** len(presencas)
+    combinacoes = _zerados(k, areas)
+    grupos = {}
+    for nome, coluna in GRUPOS_RESUMO.items():
+        if coluna in df.columns:
+            codigos, valores = pd.factorize(df[coluna], sort=True)
+            grupos[nome] = (codigos, [_chave(g) for g in valores], _zerados(len(valores), areas))
+    objetivas = [a for a in OBJETIVAS if a in areas]
+    com_candidato = len(objetivas) == len(OBJETIVAS)
+    hist = np.zeros(N_FAIXAS_CANDIDATO, dtype=np.int64)
+    candidato = {"n": 0, "soma": 0.0, "soma_q": 0.0}
+
+    colunas_presenca = [df[c].to_numpy() for c in presencas]
+    colunas_nota = {a: df[a].to_numpy() for a in areas}
+    for inicio in range(0, len(df), bloco):
+        fim = min(inicio + bloco, len(df))
+        codigo = np.zeros(fim - inicio, dtype=np.int64)
+        presente = {}
+        for nome, col in zip(presencas, colunas_presenca):
+            p = np.asarray(col[inicio:fim], dtype=np.float64)
+            codigo = codigo * 4 + np.where((p >= 0) & (p <= 2), p, 3).astype(np.int64)
+            presente[nome] = p == 1
+        combinacoes["inscritos"] += np.bincount(codigo, minlength=k)
+        blocos_grupo = {}
+        for nome, (codigos, chaves, acum) in grupos.items():
+            c = codigos[inicio:fim]
+            acum["inscritos"] += np.bincount(c[c >= 0], minlength=len(chaves))
+            blocos_grupo[nome] = c
+
+        soma_obj = np.zeros(fim - inicio)
+        todas = np.ones(fim - inicio, dtype=bool)
+        for a in areas:
+            v = np.asarray(colunas_nota[a][inicio:fim], dtype=np.float64)
+            ok = ~np.isnan(v)
+            w = v[ok]
+            w2 = w * w
+            contam = presente[PRESENCA_DA_AREA[a]][ok] if PRESENCA_DA_AREA.get(a) in presente else True
+            alvos = [(combinacoes, codigo[ok], k, True)] + [
+                (grupos[nome][2], c[ok], len(grupos[nome][1]), contam) for nome, c in blocos_grupo.items()
+            ]
+            for acum, c, n, conta in alvos:
+                com_grupo = (c >= 0) & conta
+                m = acum["areas"][a]
+                m["n"] += np.bincount(c[com_grupo], minlength=n)
+                m["soma"] += np.bincount(c[com_grupo], weights=w[com_grupo], minlength=n)
+                m["soma_q"] += np.bincount(c[com_grupo], weights=w2[com_grupo], minlength=n)
+            if com_candidato and a in objetivas:
+                todas &= ok
+                soma_obj += np.where(ok, v, 0.0)
+
+        if com_candidato:
+            media = soma_obj[todas] / len(OBJETIVAS)
+            hist += np.bincount(np.clip(media, 0, N_FAIXAS_CANDIDATO - 1).astype(np.int64), minlength=N_FAIXAS_CANDIDATO)
+            candidato["n"] += int(media.size)
+            candidato["soma"] += float(media.sum())
+            candidato["soma_q"] += float(np.dot(media, media))
+
+    return {
+        "presencas": presencas,
+        "combinacoes": combinacoes,
+        "grupos": {nome: (chaves, acum) for nome, (_, chaves, acum) in grupos.items()},
+        "media_candidato": {**candidato, "histograma": hist.tolist()} if com_candidato else None,
+    }
+
+
+def _digitos(presencas: Sequence[str]) -> np.ndarray:
+    """Matriz (combinação em base 4) x (prova) com o código de presença de cada prova."""
+    codigos = np.arange(4 ** len(presencas))
+    return np.stack([(codigos // 4 ** (len(presencas) - 1 - i)) % 4 for i in range(len(presencas))], axis=1)
+
+
+def areas_presentes(acumulado: dict) -> Dict[str, Dict[str, float]]:
+    """Momentos nacionais de cada nota, só das combinações em que a prova da nota foi feita (ver acumular)."""
+    presencas = acumulado["presencas"]
+    digitos = _digitos(presencas) if presencas else None
+    areas = acumulado["combinacoes"]["areas"]
+    saida = {}
+    for a, m in areas.items():
+        col = PRESENCA_DA_AREA.get(a)
+        selecao = digitos[:, presencas.index(col)] == 1 if col in presencas else slice(None)
+        saida[a] = {"n": int(m["n"][selecao].sum()), "soma": float(m["soma"][selecao].sum()),
+                    "soma_q": float(m["soma_q"][selecao].sum())}
+    return saida
+
+
+def contagem_presenca(acumulado: dict) -> Dict[str, Dict[str, int]]:
+    """{TP_PRESENCA_xx: {código: candidatos}} (0 = faltou, 1 = presente, 2 = eliminado) a partir das combinações."""
+    presencas = acumulado["presencas"]
+    if not presencas:
+        return {}
+    digitos = _digitos(presencas)
+    inscritos = acumulado["combinacoes"]["inscritos"]
+    resultado = {}
+    for i, col in enumerate(presencas):
+        contagem = np.bincount(digitos[:, i], weights=inscritos, minlength=4)
+        resultado[col] = {str(d): int(contagem[d]) for d in range(3) if contagem[d]}
+    return resultado
+
+
+def participacao(acumulado: dict) -> Optional[dict]:
+    """Combinações das 4 presenças (com "inv" para as que têm prova nula ou fora do domínio) e a média por candidato."""
+    if acumulado["presencas"] != PRESENCAS:
+        return None
+    digitos = _digitos(PRESENCAS)
+    combinacoes = acumulado["combinacoes"]
+    inscritos = combinacoes["inscritos"]
+    validas = (digitos < 3).all(axis=1)
+    saida = {}
+    for i in np.flatnonzero(validas & (inscritos > 0)):
+        saida["".join(str(d) for d in digitos[i])] = _registro(combinacoes, i)
+    invalidas = ~validas & (inscritos > 0)
+    if invalidas.any():
+        saida[COMBINACAO_INVALIDA] = _registro(combinacoes, invalidas)
+    media_candidato = acumulado["media_candidato"] or {"n": 0, "soma": 0.0, "soma_q": 0.0, "histograma": [0] * N_FAIXAS_CANDIDATO}
+    return {"combinacoes": saida, "media_candidato": media_candidato}
+
+
+def quantis_histograma(hist: Sequence[int], quantis: Sequence[float], largura: float = 1.0) -> Dict[str, Optional[float]]:
+    """Quantis de um histograma de faixas de `largura`, interpolando dentro da faixa."""
+    acumulado = np.cumsum(hist)
+    n = int(acumulado[-1]) if len(acumulado) else 0
+    saida = {}
+    for q in quantis:
+        if n == 0:
+            saida[str(q)] = None
+            continue
+        alvo = q * n
+        faixa = int(min(np.searchsorted(acumulado, alvo, side="left"), len(hist) - 1))
+        antes = acumulado[faixa - 1] if faixa > 0 else 0
+        fracao = (alvo - antes) / hist[faixa] if hist[faixa] else 0.0
+        saida[str(q)] = (faixa + min(max(fracao, 0.0), 1.0)) * largura
+    return saida
+
+
+def descrever_participacao(part: Optional[dict], quantis: Sequence[float] = (0.1, 0.25, 0.5, 0.75, 0.9)) -> Optional[dict]:
+    """Presença por prova, presentes em todas, médias entre presentes e distribuição da média por candidato."""
+    if not part:
+        return None
+    combinacoes = part["combinacoes"]
+    validas = {r: c for r, c in combinacoes.items() if r != COMBINACAO_INVALIDA}
+    posicao = {col: i for i, col in enumerate(PRESENCAS)}
+    todas = "1" * len(PRESENCAS)
+
+    presenca = {}
+    for col, i in posicao.items():
+        contagem = {"faltou": 0, "presente": 0, "eliminado": 0}
+        for rotulo, c in validas.items():
+            contagem[("faltou", "presente", "eliminado")[int(rotulo[i])]] += c["inscritos"]
+        presenca[col] = contagem
+
+    medias_presentes, medias_presentes_todas = {}, {}
+    for area, col in PRESENCA_DA_AREA.items():
+        i = posicao[col]
+        registros = [c["areas"][area] for r, c in validas.items() if r[i] == "1" and area in c["areas"]]
+        if registros:
+            medias_presentes[area] = descrever(somar_momentos(registros))
+        if todas in validas and area in validas[todas]["areas"]:
+            medias_presentes_todas[area] = descrever(validas[todas]["areas"][area])
+
+    cand = part["media_candidato"]
+    hist = cand["histograma"]
+    passo = 50
+    distribuicao = {
+        **descrever(cand),
+        "quantis": quantis_histograma(hist, quantis),
+        "histograma": {
+            "faixas": list(range(0, len(hist), passo)),
+            "contagens": [int(sum(hist[i:i + passo])) for i in range(0, len(hist), passo)],
+        },
+    }
+    return {
+        "presenca": presenca,
+        "presentes_todas": validas.get(todas, {}).get("inscritos", 0),
+        "ausentes_todas": validas.get("0" * len(PRESENCAS), {}).get("inscritos", 0),
+        "eliminados_alguma": sum(c["inscritos"] for r, c in validas.items() if "2" in r),
+        "presenca_invalida": combinacoes.get(COMBINACAO_INVALIDA, {}).get("inscritos", 0),
+        "medias_presentes": medias_presentes,
+        "medias_presentes_todas": medias_presentes_todas,
+        "media_por_candidato": distribuicao,
+    }
+
+
+def calcular_resumo(year: int, df: pd.DataFrame, versao: Optional[str] = None) -> dict:
+    """Resumo de um ano: nacional, por UF, por tipo de escola, por faixa de renda (Q006) e presença por prova."""
+    acumulado = acumular(df)
+    recortes = {nome: {chave: _registro(acum, i) for i, chave in enumerate(chaves)}
+                for nome, (chaves, acum) in acumulado["grupos"].items()}
+    return {
+        "formato": FORMATO_RESUMO,
+        "ano": year,
+        "versao": versao,
+        "inscritos": int(len(df)),
+        "areas": areas_presentes(acumulado),
+        **{nome: recortes.get(nome, {}) for nome in GRUPOS_RESUMO},
+        "presenca": contagem_presenca(acumulado),
+        "participacao": participacao(acumulado),
+    }
+
+
+def momentos_do_recorte(resumo: dict, uf: Optional[str] = None, escola: Optional[int] = None,
+                        renda: Optional[str] = None) -> Optional[dict]:
+    """Seleciona {"inscritos", "areas"} do recorte pedido (nacional, UF, tipo de escola ou faixa de renda)."""
+    if sum(r is not None for r in (uf, escola, renda)) > 1:
+        raise ValueError("Use apenas um recorte por vez (uf, escola ou renda)")
+    if uf is not None:
+        return resumo["por_uf"].get(uf.upper())
+    if escola is not None:
+        return resumo["por_escola"].get(str(escola))
+    if renda is not None:
+        return resumo.get("por_renda", {}).get(renda.upper())
+    return {"inscritos": resumo["inscritos"], "areas": resumo["areas"]}
+
+
+def medias(recorte: dict) -> Dict[str, Optional[float]]:
+    """{coluna de nota: média} de um recorte do resumo."""
+    return {
+        col: (m["soma"] / m["n"] if m["n"] else None)
+        for col, m in recorte["areas"].items()
+    }
+
+
+def serie_evolucao(resumos: Dict[int, dict], uf: Optional[str] = None, escola: Optional[int] = None) -> dict:
+    """Série histórica por área (médias, IC95 e variação ano a ano) a partir dos resumos."""
+    anos, inscritos = [], []
+    evolucao = {nome: [] for nome in AREAS.values()}
+    intervalos = {nome: [] for nome in AREAS.values()}
+    variacoes = {nome: [] for nome in AREAS.values()}
+    anteriores = {}
+
+    for ano in sorted(resumos):
+        recorte = momentos_do_recorte(resumos[ano], uf, escola)
+        if not recorte or recorte["inscritos"] == 0:
+            continue
+        anos.append(ano)
+        inscritos.append(recorte["inscritos"])
+        for col, nome in AREAS.items():
+            d = descrever(recorte["areas"].get(col, {"n": 0, "soma": 0.0, "soma_q": 0.0}))
+            evolucao[nome].append(d["media"])
+            intervalos[nome].append(d["ic95"])
+            ant = anteriores.get(nome)
+            if ant and ant["media"] is not None and d["media"] is not None and ant["erro_padrao"] and d["erro_padrao"]:
+                delta = d["media"] - ant["media"]
+                ep = math.sqrt(ant["erro_padrao"] ** 2 + d["erro_padrao"] ** 2)
+                variacoes[nome].append({"delta": delta, "ic95": [delta - 1.96 * ep, delta + 1.96 * ep]})
+            else:
+                variacoes[nome].append(None)
+            anteriores[nome] = d
+
+    # remove áreas sem nenhum dado (ex.: redação ausente no arquivo)
+    vazias = [nome for nome, v in evolucao.items() if all(x is None for x in v)]
+    for nome in vazias:
+        del evolucao[nome], intervalos[nome], variacoes[nome]
+
+    return {
+        "anos": anos,
+        "inscritos": inscritos,
+        "evolucao_por_area": evolucao,
+        "intervalos_confianca": intervalos,
+        "variacoes": variacoes,
+    }
@@ -0,0 +1,100 @@
+"""
+Armazenamento dos resumos por ano em um único arquivo SQLite.
+
+O arquivo é pequeno (alguns KB por ano) e contém tudo o que os endpoints
+agregados precisam, então pode ser copiado para a imagem da API no lugar dos
+CSVs de vários GB (modo DATA_MODE=summary).
+"""
+
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from summaries import FORMATO_RESUMO
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resumos (
+    ano INTEGER PRIMARY KEY,
+    formato INTEGER NOT NULL,
+    versao TEXT,
+    gerado_em REAL NOT NULL,
+    dados BLOB NOT NULL
+)
+"""
+
+
+class SummaryStore:
+    """Resumos por ano (JSON comprimido com zlib) em uma tabela SQLite."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _conectar(self, escrita: bool = False) -> sqlite3.Connection:
+        if escrita:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute(ESQUEMA)
+            return conn
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+
+    def existe(self) -> bool:
+        return self.path.exists()
+
+    def salvar(self, resumo: dict):
+        dados = zlib.compress(json.dumps(resumo, ensure_ascii=False).encode("utf-8"), 9)
+        conn = self._conectar(escrita=True)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO resumos (ano, formato, versao, gerado_em, dados) VALUES (?, ?, ?, ?, ?)",
+                    (resumo["ano"], FORMATO_RESUMO, resumo.get("versao"), time.time(), dados),
+                )
+        finally:
+            conn.close()
+
+    def carregar(self, ano: int) -> Optional[dict]:
+        if not self.existe():
+            return None
+        try:
+            conn = self._conectar()
+            try:
+                linha = conn.execute(
+                    "SELECT dados FROM resumos WHERE ano = ? AND formato = ?", (ano, FORMATO_RESUMO)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return json.loads(zlib.decompress(linha[0])) if linha else None
+
+    def versao(self, ano: int) -> Optional[str]:
+        """Versão do resumo gravado do ano, lida da coluna sem descomprimir o JSON (None se não há)."""
+        if not self.existe():
+            return None
+        try:
+            conn = self._conectar()
+            try:
+                linha = conn.execute(
+                    "SELECT versao FROM resumos WHERE ano = ? AND formato = ?", (ano, FORMATO_RESUMO)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return linha[0] if linha else None
+
+    def todos(self) -> Dict[int, dict]:
+        """Carrega todos os resumos do arquivo (usado no modo resumo)."""
+        if not self.existe():
+            return {}
+        conn = self._conectar()
+        try:
+            linhas = conn.execute(
+                "SELECT ano, dados FROM resumos WHERE formato = ?", (FORMATO_RESUMO,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {int(ano): json.loads(zlib.decompress(dados)) for ano, dados in linhas}
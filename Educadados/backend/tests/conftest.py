@@ -0,0 +1,30 @@
+"""Configuração dos testes: os módulos do backend são importados como irmãos (python -m pytest em backend/)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+
+@pytest.fixture
+def zerar_caches(monkeypatch, tmp_path):
+    """zerar(nome): esvazia os caches de dados do main.py, com um SummaryStore novo em tmp_path."""
+    import main
+    from payload_cache import PayloadCache
+    from summary_store import SummaryStore
+
+    def zerar(nome):
+        monkeypatch.setattr(main, "summary_store", SummaryStore(tmp_path / f"{nome}.sqlite"))
+        monkeypatch.setattr(main, "payloads", PayloadCache(main.payloads.max_bytes))
+        for ano in list(main.microdados_cache):
+            del main.microdados_cache[ano]
+        for cache in (main.itens_cache, main.versoes_cache, main.derivados_cache, main.resumos_sql,
+                      main.agregados_sql, main.estimativas_cache, main.qualidade_carga):
+            cache.clear()
+        main.estado_anos.update({y: "pendente" for y in main.YEARS})
+
+    return zerar
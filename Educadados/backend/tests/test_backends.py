@@ -0,0 +1,173 @@
+"""Os endpoints devem responder igual com QUERY_BACKEND=pandas e QUERY_BACKEND=duckdb."""
+
+import random
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+import columnar_cache
+import main
+from duckdb_backend import diferencas
+from fastapi.testclient import TestClient
+from summaries import PRESENCA_DA_AREA
+
+ANOS = [2022, 2023]
+UFS = ["SP", "RJ", "MG", "BA", "PE", "RS"]
+
+CONSULTAS = [
+    "/api/enem/estatisticas/{ano}",
+    "/api/enem/areas/{ano}",
+    "/api/enem/por-estado/{ano}",
+    "/api/enem/por-escola/{ano}",
+    "/api/enem/presenca/{ano}",
+    "/api/enem/insights?ano={ano}",
+    "/api/enem/evolucao?uf=SP",
+    "/api/enem/comparar?ano_a=2022&ano_b=2023",
+    "/api/enem/cruzamento/{ano}?dimensoes=Q006,TP_ESCOLA",
+    "/api/enem/cruzamento/{ano}?dimensoes=SG_UF_RESIDENCIA,Q001,TP_ESCOLA&quantis=0.1,0.9",
+    "/api/enem/percentil/{ano}?area=NU_NOTA_MT&notas=400,512.3,650,999",
+    "/api/enem/percentil/{ano}?area=NU_NOTA_CN&notas=500&uf=RJ",
+    "/api/enem/percentil/{ano}/inverso?area=NU_NOTA_REDACAO&percentis=10,50,90&escola=2",
+    "/api/enem/municipios/{ano}?min_participantes=1&limite=100",
+    "/api/enem/municipios/{ano}?nivel=escola&uf=BA&ordem=NU_NOTA_LC&sentido=asc&min_participantes=1",
+    "/api/enem/municipios/{ano}/2900100",
+    "/api/enem/qualidade/{ano}?exemplos=100",
+]
+
+EXPORTACOES = [
+    "/api/enem/exportar/{ano}",
+    "/api/enem/exportar/{ano}?formato=ndjson&uf=SP",
+    "/api/enem/exportar/{ano}?colunas=NU_INSCRICAO,NU_NOTA_MT,Q006&escola=2&limite=150",
+]
+
+
+def _nota(rng):
+    return f"{rng.uniform(300, 900):.1f}"
+
+
+def escrever_microdados(path, ano, linhas=3000):
+    """CSV sintético (;, latin-1) com as colunas úteis, notas inválidas, UFs inválidas e um registro malformado."""
+    rng = random.Random(ano)
+    colunas = [c for c in main.COLUNAS_UTEIS]
+    partes = [";".join(colunas)]
+    for i in range(linhas):
+        uf = rng.choice(UFS)
+        presencas = [rng.choice([0, 1, 1, 1, 2]) for _ in range(4)]
+        notas = [_nota(rng) if p == 1 else "" for p in presencas]
+        redacao = f"{rng.randrange(0, 1001, 20)}" if presencas[1] == 1 else ""
+        if i % 401 == 7:
+            notas[3] = "1200.5"
+        if i % 577 == 11:
+            uf = "XX"
+        cod_prova = 2900000 + rng.randrange(100, 400, 100)
+        cod_esc = rng.choice(["", str(2900000 + rng.randrange(100, 300, 100))])
+        valores = {
+            "NU_INSCRICAO": str(ano * 10**6 + i),
+            "NU_ANO": str(ano),
+            "CO_UF_RESIDENCIA": str(UFS.index(uf) + 11) if uf in UFS else "99",
+            "SG_UF_RESIDENCIA": uf,
+            "TP_ESCOLA": str(rng.choice([1, 2, 2, 3])),
+            "TP_LINGUA": str(rng.randint(0, 1)),
+            "NU_NOTA_CN": notas[0], "NU_NOTA_CH": notas[1], "NU_NOTA_LC": notas[2], "NU_NOTA_MT": notas[3],
+            "NU_NOTA_REDACAO": redacao,
+            "TP_PRESENCA_CN": str(presencas[0]), "TP_PRESENCA_CH": str(presencas[1]),
+            "TP_PRESENCA_LC": str(presencas[2]), "TP_PRESENCA_MT": str(presencas[3]),
+            "CO_MUNICIPIO_PROVA": str(cod_prova), "NO_MUNICIPIO_PROVA": f"São João {cod_prova}", "SG_UF_PROVA": "BA",
+            "CO_MUNICIPIO_ESC": cod_esc, "NO_MUNICIPIO_ESC": f"Conceição {cod_esc}" if cod_esc else "",
+            "SG_UF_ESC": "BA" if cod_esc else "",
+        }
+        for q in main.COLUNAS_QUESTIONARIO:
+            valores[q] = rng.choice("ABCDEFGH")
+        linha = ";".join(valores[c] for c in colunas)
+        if i == 1500:
+            linha += ";campo;a;mais"
+        partes.append(linha)
+    path.write_bytes(("\n".join(partes) + "\n").encode("latin-1"))
+
+
+@pytest.fixture(scope="module")
+def pasta_microdados(tmp_path_factory):
+    pasta = tmp_path_factory.mktemp("Microdados")
+    for ano in ANOS:
+        escrever_microdados(pasta / f"MICRODADOS_ENEM_{ano}.csv", ano)
+    return pasta
+
+
+def respostas(monkeypatch, zerar_caches, backend):
+    """{consulta: JSON ou corpo da exportação} de todas as consultas, com os caches zerados."""
+    monkeypatch.setattr(main, "QUERY_BACKEND", backend)
+    zerar_caches(backend)
+    cliente = TestClient(main.app)
+    saida = {}
+    for ano in ANOS:
+        for consulta in CONSULTAS:
+            url = consulta.format(ano=ano)
+            r = cliente.get(url)
+            assert r.status_code == 200, (backend, url, r.text)
+            saida[url] = r.json()
+        for consulta in EXPORTACOES:
+            url = consulta.format(ano=ano)
+            r = cliente.get(url)
+            assert r.status_code == 200, (backend, url, r.text)
+            saida[url] = r.text
+    return saida
+
+
+@pytest.mark.parametrize("fonte", ["csv", "parquet"])
+def test_pandas_e_duckdb_respondem_igual(fonte, pasta_microdados, tmp_path, monkeypatch, zerar_caches):
+    monkeypatch.setattr(main, "MICRODADOS_PATH", pasta_microdados)
+    monkeypatch.setattr(main, "PARQUET_CACHE_PATH", tmp_path / "parquet")
+    monkeypatch.setattr(main, "APPROXIMATE", False)
+    monkeypatch.setattr(main, "DATA_MODE", "raw")
+    monkeypatch.setattr(main, "dataset_remoto", None)
+    if fonte == "parquet":
+        if not columnar_cache.disponivel():
+            pytest.skip("cache colunar requer pyarrow")
+        monkeypatch.setattr(main, "USE_PARQUET_CACHE", True)
+        for ano in ANOS:
+            csv = pasta_microdados / f"MICRODADOS_ENEM_{ano}.csv"
+            df, _ = main.load_from_local(ano)
+            columnar_cache.gravar(main.PARQUET_CACHE_PATH, ano, df, csv, main.COLUNAS_UTEIS, df.attrs.pop("qualidade", None))
+            assert main.fonte_microdados(ano).suffix == ".parquet"
+    else:
+        monkeypatch.setattr(main, "USE_PARQUET_CACHE", False)
+        assert main.fonte_microdados(ANOS[0]).suffix == ".csv"
+
+    via_pandas = respostas(monkeypatch, zerar_caches, "pandas")
+    via_duckdb = respostas(monkeypatch, zerar_caches, "duckdb")
+
+    # o caminho duckdb não pode ter carregado nenhum ano em memória
+    assert not list(main.microdados_cache)
+    for url, esperado in via_pandas.items():
+        obtido = via_duckdb[url]
+        if isinstance(esperado, str):
+            assert obtido == esperado, url
+        else:
+            assert diferencas(esperado, obtido) == [], url
+    # os dados sujos chegaram ao relatório (notas e UFs inválidas, registro malformado)
+    relatorio = via_pandas[f"/api/enem/qualidade/{ANOS[0]}?exemplos=100"]
+    assert relatorio["linhas_em_quarentena"] > 0 and relatorio["linhas_ignoradas"] == 1
+
+
+def test_medias_entre_presentes_iguais_em_todos_os_endpoints(pasta_microdados, monkeypatch, zerar_caches):
+    monkeypatch.setattr(main, "MICRODADOS_PATH", pasta_microdados)
+    monkeypatch.setattr(main, "APPROXIMATE", False)
+    monkeypatch.setattr(main, "DATA_MODE", "raw")
+    monkeypatch.setattr(main, "dataset_remoto", None)
+    monkeypatch.setattr(main, "USE_PARQUET_CACHE", False)
+    monkeypatch.setattr(main, "QUERY_BACKEND", "pandas")
+    zerar_caches("medias")
+    cliente = TestClient(main.app)
+    ano = ANOS[0]
+    df, _ = main.load_from_local(ano)
+
+    estatisticas = cliente.get(f"/api/enem/estatisticas/{ano}").json()
+    areas = cliente.get(f"/api/enem/areas/{ano}").json()["areas"]
+    estados = cliente.get(f"/api/enem/por-estado/{ano}").json()["estados"]
+    for col, presenca in PRESENCA_DA_AREA.items():
+        presentes = df[df[presenca] == 1]
+        assert estatisticas["means"][col] == pytest.approx(presentes[col].astype("float64").mean())
+        assert areas[main.AREAS[col]] == pytest.approx(estatisticas["means"][col])
+        sp = presentes[presentes["SG_UF_RESIDENCIA"] == "SP"]
+        assert estados["SP"]["medias"][col] == pytest.approx(sp[col].astype("float64").mean())
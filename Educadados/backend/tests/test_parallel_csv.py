@@ -0,0 +1,74 @@
+"""A leitura por faixas de bytes deve dar o mesmo DataFrame que um pd.read_csv serial."""
+
+import random
+
+import pandas as pd
+import pytest
+
+import parallel_csv
+from main import DTYPES_MICRODADOS
+from parallel_csv import read_csv_parallel, split_byte_ranges
+
+COLUNAS = ["NU_INSCRICAO", "SG_UF_RESIDENCIA", "TP_ESCOLA", "NU_NOTA_MT", "TX_OBS"]
+DTYPES = {c: DTYPES_MICRODADOS[c] for c in COLUNAS if c in DTYPES_MICRODADOS}
+
+
+def escrever_csv(path, linhas=3000, quebra="\r\n", semente=7, escola_vazia=0.0):
+    """CSV no formato do INEP (;, latin-1) com observações entre aspas contendo quebras de linha e ;"""
+    rng = random.Random(semente)
+    partes = [";".join(COLUNAS)]
+    for i in range(linhas):
+        nota = "" if rng.random() < 0.1 else f"{rng.uniform(300, 900):.1f}"
+        obs = rng.choice(["", "simples", f'"linha 1{quebra}linha 2; com separador"', '"aspas ""duplas"" aqui"', '"açaí;\nmisto"'])
+        escola = "" if rng.random() < escola_vazia else rng.randint(1, 3)
+        partes.append(f"{10**11 + i};{rng.choice(['SP', 'RJ', 'MG', 'BA'])};{escola};{nota};{obs}")
+    path.write_bytes((quebra.join(partes) + quebra).encode("latin-1"))
+    return path
+
+
+@pytest.fixture(params=["\r\n", "\n"], ids=["crlf", "lf"])
+def csv_enem(request, tmp_path):
+    return escrever_csv(tmp_path / "MICRODADOS_ENEM_2099.csv", quebra=request.param)
+
+
+def test_faixas_nao_cortam_campos_entre_aspas(csv_enem):
+    faixas = split_byte_ranges(csv_enem, 7, inicio=len(csv_enem.read_bytes().split(b"\n", 1)[0]) + 1)
+    assert len(faixas) == 7
+    dados = csv_enem.read_bytes()
+    for inicio, fim in faixas:
+        # cada faixa termina numa quebra de linha com as aspas pareadas
+        assert dados[fim - 1:fim] == b"\n"
+        assert dados[inicio:fim].count(b'"') % 2 == 0
+
+
+@pytest.mark.parametrize("workers", [2, 5])
+def test_leitura_paralela_igual_a_serial(csv_enem, monkeypatch, workers):
+    # força várias faixas mesmo num arquivo pequeno
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MINIMO_PARALELO", 0)
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MAXIMO_FAIXA", 16 * 1024)
+    assert len(split_byte_ranges(csv_enem, workers, 0)) > 1
+
+    paralelo = read_csv_parallel(csv_enem, usecols=COLUNAS, dtype=DTYPES, workers=workers)
+    serial = pd.read_csv(csv_enem, sep=";", encoding="latin-1", usecols=COLUNAS, dtype=DTYPES, low_memory=False)
+    pd.testing.assert_frame_equal(paralelo, serial[COLUNAS])
+
+
+def test_leitura_paralela_com_validacao(csv_enem, monkeypatch):
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MINIMO_PARALELO", 0)
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MAXIMO_FAIXA", 16 * 1024)
+    paralelo = read_csv_parallel(csv_enem, usecols=COLUNAS, dtype=DTYPES, workers=3, validar=True)
+    serial = read_csv_parallel(csv_enem, usecols=COLUNAS, dtype=DTYPES, workers=1, validar=True)
+    pd.testing.assert_frame_equal(paralelo, serial)
+    assert paralelo.attrs["qualidade"]["relatorio"] == serial.attrs["qualidade"]["relatorio"]
+
+
+def test_leitura_paralela_com_codigos_vazios(tmp_path, monkeypatch):
+    # TP_ESCOLA vazio em algumas linhas: os workers não podem falhar (e cair na leitura serial)
+    csv = escrever_csv(tmp_path / "MICRODADOS_ENEM_2099.csv", escola_vazia=0.05)
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MINIMO_PARALELO", 0)
+    monkeypatch.setattr(parallel_csv, "TAMANHO_MAXIMO_FAIXA", 16 * 1024)
+    paralelo = read_csv_parallel(csv, usecols=COLUNAS, dtype=DTYPES, workers=3, validar=True)
+    serial = pd.read_csv(csv, sep=";", encoding="latin-1", usecols=COLUNAS, dtype=DTYPES, low_memory=False)
+    pd.testing.assert_frame_equal(paralelo, serial[COLUNAS])
+    assert paralelo["TP_ESCOLA"].isna().sum() > 0
+    assert paralelo.attrs["qualidade"]["relatorio"]["linhas_em_quarentena"] == 0
@@ -0,0 +1,16 @@
+"""Percentil de uma nota: % de participantes com nota menor ou igual, lido no histograma acumulado."""
+
+import numpy as np
+import pandas as pd
+
+from percentiles import indice_percentis, notas_dos_percentis, percentis_das_notas
+
+
+def test_nota_logo_abaixo_da_borda_nao_conta_a_faixa_de_cima():
+    notas = np.array([512.3, 650.0, 719.9, 720.0, 720.0, 845.5], dtype=np.float32)
+    acum = indice_percentis(pd.DataFrame({"NU_NOTA_MT": notas}))["NU_NOTA_MT"]["nacional"]
+
+    consultas = [719.96, 719.9, 720.0, 512.3, 512.29, 0.0, 1000.0]
+    esperado = [100.0 * np.mean(notas.astype(np.float64).round(1) <= q) for q in consultas]
+    np.testing.assert_allclose(percentis_das_notas(acum, consultas), esperado)
+    np.testing.assert_allclose(notas_dos_percentis(acum, [50, 100]), [719.9, 845.5])
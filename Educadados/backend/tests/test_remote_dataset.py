@@ -0,0 +1,113 @@
+"""Leitura remota (HTTP Range + cache de blocos) contra um http.server local com o layout do Hub."""
+
+import hashlib
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import main
+import remote_dataset
+from fastapi.testclient import TestClient
+from remote_dataset import DiskCache, RemoteDataset, servir
+
+ANO = 2023
+UFS = ["BA", "RJ", "SP"]
+
+
+def publicar(pasta):
+    """Partições por UF (vários row groups cada) e o manifest.json, como o upload_to_hf.py publica."""
+    arquivos = {}
+    for n, uf in enumerate(UFS):
+        linhas = 2000 + 500 * n
+        df = pd.DataFrame({
+            "NU_INSCRICAO": [f"{ANO}{uf}{i:06d}" for i in range(linhas)],
+            "SG_UF_RESIDENCIA": uf,
+            "TP_ESCOLA": [1 + i % 3 for i in range(linhas)],
+            "NU_NOTA_MT": [300.0 + (i * 7.3) % 600 if i % 11 else None for i in range(linhas)],
+        })
+        caminho = f"microdados/ano={ANO}/uf={uf}/part-0.parquet"
+        local = pasta / caminho
+        local.parent.mkdir(parents=True)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), local, row_group_size=500)
+        dados = local.read_bytes()
+        arquivos[caminho] = {"sha256": hashlib.sha256(dados).hexdigest(), "bytes": len(dados), "linhas": linhas}
+    (pasta / "manifest.json").write_text(json.dumps({"arquivos": arquivos}))
+    return arquivos
+
+
+@pytest.fixture
+def hub(tmp_path):
+    pasta = tmp_path / "hub"
+    arquivos = publicar(pasta)
+    servidor = servir(str(pasta), porta=0)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}", pasta, arquivos
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def ler_local(pasta, arquivos, colunas=None):
+    tabelas = [pq.read_table(pasta / caminho, columns=colunas) for caminho in sorted(arquivos)]
+    return pa.concat_tables(tabelas).to_pandas()
+
+
+def test_leitura_remota_igual_a_local(hub, tmp_path, monkeypatch):
+    url, pasta, arquivos = hub
+    # blocos pequenos: cada leitura cruza vários blocos e junta os que faltam numa requisição
+    monkeypatch.setattr(remote_dataset, "BLOCO_REMOTO", 4096)
+    remoto = RemoteDataset(url, DiskCache(tmp_path / "cache", 64 * 1024 * 1024))
+
+    pd.testing.assert_frame_equal(remoto.ler_ano(ANO), ler_local(pasta, arquivos))
+    colunas = ["NU_NOTA_MT", "SG_UF_RESIDENCIA"]
+    pd.testing.assert_frame_equal(remoto.ler_ano(ANO, colunas=colunas), ler_local(pasta, arquivos, colunas))
+    so_rj = remoto.ler_ano(ANO, ufs=["rj"])
+    assert len(so_rj) == arquivos[f"microdados/ano={ANO}/uf=RJ/part-0.parquet"]["linhas"]
+    assert set(so_rj["SG_UF_RESIDENCIA"]) == {"RJ"}
+
+    # tudo já está no cache de blocos: lê igual mesmo com o servidor fora do ar
+    monkeypatch.setattr(remoto, "url_base", "http://127.0.0.1:9")
+    pd.testing.assert_frame_equal(remoto.ler_ano(ANO), ler_local(pasta, arquivos))
+
+
+def test_manifesto_fica_fora_do_limite_do_cache(hub, tmp_path, monkeypatch):
+    url, pasta, arquivos = hub
+    monkeypatch.setattr(remote_dataset, "BLOCO_REMOTO", 4096)
+    monkeypatch.setattr(remote_dataset, "MANIFESTO_TTL", 0.0)
+    limite = 16 * 1024
+    cache = DiskCache(tmp_path / "cache", limite)
+    remoto = RemoteDataset(url, cache)
+
+    pd.testing.assert_frame_equal(remoto.ler_ano(ANO), ler_local(pasta, arquivos))
+    copia = cache.pasta / "manifest.json"
+    # os blocos passaram do limite várias vezes e foram despejados; a cópia do manifest não
+    assert copia.exists()
+    assert cache.total <= limite
+    assert cache.total == sum(p.stat().st_size for p in cache.pasta.glob("??/*"))
+
+    # sem rede, o manifest sai da cópia local
+    monkeypatch.setattr(remote_dataset, "TENTATIVAS", 1)
+    monkeypatch.setattr(remoto, "url_base", "http://127.0.0.1:9")
+    assert remoto.manifesto()["arquivos"] == arquivos
+
+
+def test_duckdb_com_fonte_remota_segue_pelo_pandas(hub, tmp_path, monkeypatch, zerar_caches):
+    url, pasta, arquivos = hub
+    monkeypatch.setattr(main, "dataset_remoto", RemoteDataset(url, DiskCache(tmp_path / "cache", 64 * 1024 * 1024)))
+    monkeypatch.setattr(main, "MICRODADOS_PATH", tmp_path / "sem_csv")
+    monkeypatch.setattr(main, "QUERY_BACKEND", "duckdb")
+    monkeypatch.setattr(main, "APPROXIMATE", False)
+    zerar_caches("remoto")
+    cliente = TestClient(main.app)
+    # sem CSV local o DuckDB não tem o que ler: o ano vem da fonte remota, não vazio
+    resposta = cliente.get(f"/api/enem/estatisticas/{ANO}").json()
+    assert resposta["inscritos"] == sum(m["linhas"] for m in arquivos.values())
+    estados = cliente.get(f"/api/enem/por-estado/{ANO}").json()["estados"]
+    assert sorted(estados) == UFS
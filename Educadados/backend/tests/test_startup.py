@@ -0,0 +1,62 @@
+"""`uvicorn main:app` deve responder /health dentro de LIMITE_PARTIDA sem ter importado pandas/NumPy."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from load_test import LIMITE_PARTIDA
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_health_responde_sem_a_pilha_analitica(tmp_path):
+    porta = porta_livre()
+    env = dict(
+        os.environ,
+        WARMUP="false",
+        PRELOAD_ANALYTICS="false",
+        WATCH_MICRODADOS="false",
+        CACHE_PATH=str(tmp_path / "cache"),
+        SUMMARY_STORE=str(tmp_path / "resumos.sqlite"),
+    )
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        resposta = None
+        with httpx.Client(base_url=f"http://127.0.0.1:{porta}", timeout=1.0) as cliente:
+            while time.perf_counter() - inicio < LIMITE_PARTIDA * 3 and processo.poll() is None:
+                try:
+                    resposta = cliente.get("/health")
+                    if resposta.status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+        decorrido = time.perf_counter() - inicio
+    finally:
+        processo.terminate()
+        try:
+            _, erros = processo.communicate(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            _, erros = processo.communicate()
+
+    assert resposta is not None and resposta.status_code == 200, erros.decode(errors="replace")
+    assert decorrido <= LIMITE_PARTIDA, f"/health levou {decorrido:.2f}s (limite: {LIMITE_PARTIDA}s)"
+    partida = resposta.json()["startup"]
+    assert partida["analytics_modules"] == []
+    assert not partida["analytics_loaded"]
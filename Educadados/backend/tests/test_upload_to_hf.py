@@ -0,0 +1,97 @@
+"""Publicação (upload_to_hf.py) contra o HubLocal: manifest com SHA-256, partições sem mudança puladas e retomada."""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+RAIZ = Path(__file__).resolve().parents[2]
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+import upload_to_hf  # noqa: E402
+from upload_to_hf import HubLocal, fazer_upload, verificar_arquivos  # noqa: E402
+
+ANO = 2023
+UFS = ["BA", "RJ", "SP"]
+
+
+class HubContador(HubLocal):
+    """HubLocal que registra os envios e pode falhar nos caminhos de `falhar`."""
+
+    def __init__(self, pasta, falhar=()):
+        super().__init__(pasta)
+        self.falhar = set(falhar)
+        self.enviados = []
+
+    def enviar(self, local, caminho):
+        if caminho in self.falhar:
+            raise ConnectionError(f"envio de {caminho} interrompido")
+        super().enviar(local, caminho)
+        self.enviados.append(caminho)
+
+
+def particao(uf):
+    return f"microdados/ano={ANO}/uf={uf}/part-0.parquet"
+
+
+def escrever_csv(pasta, nota_sp=500.0):
+    linhas = ["NU_INSCRICAO;SG_UF_RESIDENCIA;TP_ESCOLA;NU_NOTA_MT"]
+    for i in range(600):
+        uf = UFS[i % len(UFS)]
+        nota = nota_sp if uf == "SP" else 400.0 + i % 300
+        linhas.append(f"{i};{uf};{1 + i % 3};{nota:.1f}")
+    (pasta / f"MICRODADOS_ENEM_{ANO}.csv").write_text("\n".join(linhas) + "\n", encoding="latin-1")
+
+
+@pytest.fixture
+def publicacao(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_to_hf, "TENTATIVAS", 1)
+    csvs = tmp_path / "MICRODADOS"
+    csvs.mkdir()
+    escrever_csv(csvs)
+    return csvs, csvs / "parquet", tmp_path / "hub"
+
+
+def publicar(csvs, parquet, hub):
+    return fazer_upload(verificar_arquivos(str(csvs)), hub, str(parquet), workers=2)
+
+
+def test_manifesto_envios_pulados_e_retomada(publicacao):
+    csvs, parquet, destino = publicacao
+
+    # envio interrompido: RJ falha; o resto fica no diário e o manifest não é publicado
+    interrompido = HubContador(destino, falhar={particao("RJ")})
+    assert not publicar(csvs, parquet, interrompido)
+    assert sorted(interrompido.enviados) == [particao("BA"), particao("SP")]
+    assert not (destino / "manifest.json").exists()
+
+    # a retomada envia só o que faltou e publica o manifest com o SHA-256 de cada partição
+    retomada = HubContador(destino)
+    assert publicar(csvs, parquet, retomada)
+    assert retomada.enviados == [particao("RJ"), "manifest.json"]
+    manifesto = json.loads((destino / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifesto["arquivos"]) == [particao(uf) for uf in UFS]
+    for caminho, meta in manifesto["arquivos"].items():
+        dados = (destino / caminho).read_bytes()
+        assert meta["sha256"] == hashlib.sha256(dados).hexdigest()
+        assert meta["bytes"] == len(dados)
+
+    # sem mudança nenhuma, só o manifest é reenviado
+    repetida = HubContador(destino)
+    assert publicar(csvs, parquet, repetida)
+    assert repetida.enviados == ["manifest.json"]
+
+    # só a partição que mudou sobe de novo, mesmo sem o diário local
+    (parquet / ".enviados.json").unlink()
+    escrever_csv(csvs, nota_sp=612.5)
+    alterada = HubContador(destino)
+    assert publicar(csvs, parquet, alterada)
+    assert alterada.enviados == [particao("SP"), "manifest.json"]
+    novo = json.loads((destino / "manifest.json").read_text(encoding="utf-8"))
+    assert novo["arquivos"][particao("SP")]["sha256"] != manifesto["arquivos"][particao("SP")]["sha256"]
+    assert novo["arquivos"][particao("BA")] == manifesto["arquivos"][particao("BA")]
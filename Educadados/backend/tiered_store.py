@@ -0,0 +1,267 @@
+"""
+Armazenamento em camadas dos microdados em memória (substitui o dict microdados_cache).
+
+Os anos mais acessados ficam "quentes", como DataFrames normais. Os demais
+ficam "frios": cada coluna guardada num bloco comprimido (Arrow IPC com
+zstd/lz4 quando o pyarrow está instalado, senão pickle + zlib) e
+descomprimida só quando alguém pede o ano (ou só as colunas pedidas, em ler()).
+
+A frequência de acesso de cada ano é um contador com decaimento exponencial
+(meia-vida de MEIA_VIDA_S). Um ano frio acessado sobe para a camada quente se
+houver vaga ou se já é mais acessado que o menos acessado dos quentes, que
+então desce; senão é servido descomprimido só para aquela requisição. A
+compressão de quem desce roda numa thread: até ela terminar, o DataFrame
+quente continua servindo.
+
+Interface de dict: store[ano], store.get(ano), ano in store, del store[ano]...
+"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from lazy_imports import preguicoso
+
+pd = preguicoso("pandas")
+
+MEIA_VIDA_S = 600.0
+CODECS_ARROW = ("zstd", "lz4")
+NIVEL_ZLIB = 1
+
+
+def codec_disponivel(preferido: Optional[str] = None) -> str:
+    """Codec usado nos blocos frios: o preferido (ou zstd/lz4) do Arrow, senão "zlib"."""
+    if preferido == "zlib":
+        return "zlib"
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return "zlib"
+    for codec in ([preferido] if preferido else []) + list(CODECS_ARROW):
+        if codec in CODECS_ARROW and pa.Codec.is_available(codec):
+            return codec
+    return "zlib"
+
+
+def comprimir_coluna(serie: pd.Series, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(pickle.dumps(serie, protocol=pickle.HIGHEST_PROTOCOL), NIVEL_ZLIB)
+    import pyarrow as pa
+
+    tabela = pa.Table.from_pandas(serie.to_frame(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabela.schema, options=pa.ipc.IpcWriteOptions(compression=codec)) as escritor:
+        escritor.write_table(tabela)
+    return sink.getvalue()
+
+
+def descomprimir_coluna(bloco, codec: str) -> pd.Series:
+    if codec == "zlib":
+        return pickle.loads(zlib.decompress(bloco))
+    import pyarrow as pa
+
+    tabela = pa.ipc.open_stream(bloco).read_all()
+    return tabela.to_pandas().iloc[:, 0]
+
+
+class AnoFrio:
+    """Um ano na camada fria: blocos comprimidos por coluna e o necessário para remontar o DataFrame."""
+
+    def __init__(self, df: pd.DataFrame, codec: str):
+        self.codec = codec
+        self.colunas = list(df.columns)
+        self.linhas = len(df)
+        self.blocos = {col: comprimir_coluna(df[col], codec) for col in self.colunas}
+        padrao = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+        self.indice = None if padrao else df.index
+        self.attrs = dict(df.attrs)
+        self.bytes = sum(len(b) if isinstance(b, bytes) else b.size for b in self.blocos.values())
+
+    def dataframe(self, colunas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        nomes = self.colunas if colunas is None else [c for c in colunas if c in self.blocos]
+        df = pd.DataFrame({col: descomprimir_coluna(self.blocos[col], self.codec) for col in nomes},
+                          index=self.indice if self.indice is not None else pd.RangeIndex(self.linhas))
+        df.attrs.update(self.attrs)
+        return df
+
+
+class TieredStore(MutableMapping):
+    """Dict ano -> DataFrame com no máximo max_quentes anos descomprimidos (ver docstring do módulo)."""
+
+    def __init__(self, max_quentes: int = 3, codec: Optional[str] = None, meia_vida: float = MEIA_VIDA_S):
+        self.max_quentes = max(1, max_quentes)
+        # o codec só é resolvido no primeiro rebaixamento: testar o Arrow importa pyarrow (e numpy)
+        self._codec_pedido = codec
+        self._codec: Optional[str] = None
+        self.meia_vida = meia_vida
+        self._quentes: Dict[int, pd.DataFrame] = {}
+        self._bytes_quentes: Dict[int, int] = {}
+        self._frios: Dict[int, AnoFrio] = {}
+        self._frequencia: Dict[int, tuple] = {}    # ano -> (contador, instante da última atualização)
+        self._rebaixando: Dict[int, pd.DataFrame] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def codec(self) -> str:
+        if self._codec is None:
+            self._codec = codec_disponivel(self._codec_pedido)
+        return self._codec
+
+    # ---- frequência de acesso ----
+
+    def _contador(self, ano: int, agora: float) -> float:
+        contador, instante = self._frequencia.get(ano, (0.0, agora))
+        return contador * 2.0 ** (-(agora - instante) / self.meia_vida)
+
+    def _tocar(self, ano: int) -> float:
+        agora = time.monotonic()
+        contador = self._contador(ano, agora) + 1.0
+        self._frequencia[ano] = (contador, agora)
+        return contador
+
+    def _menos_acessado(self, exceto: Optional[int] = None) -> Optional[int]:
+        agora = time.monotonic()
+        candidatos = [a for a in self._quentes if a != exceto and a not in self._rebaixando]
+        return min(candidatos, key=lambda a: self._contador(a, agora)) if candidatos else None
+
+    # ---- promoção e rebaixamento ----
+
+    def _rebalancear(self, protegido: Optional[int] = None):
+        """Rebaixa os anos menos acessados até sobrar max_quentes quentes (compressão em segundo plano)."""
+        while len(self._quentes) - len(self._rebaixando) > self.max_quentes:
+            ano = self._menos_acessado(exceto=protegido)
+            if ano is None:
+                return
+            df = self._quentes[ano]
+            self._rebaixando[ano] = df
+            threading.Thread(target=self._rebaixar, args=(ano, df), daemon=True, name=f"rebaixar-{ano}").start()
+
+    def _rebaixar(self, ano: int, df: pd.DataFrame):
+        try:
+            frio = AnoFrio(df, self.codec)
+        except Exception as e:
+            print(f"   ⚠ Não foi possível comprimir o ENEM {ano}; continua descomprimido: {e}")
+            with self._lock:
+                if self._rebaixando.get(ano) is df:
+                    del self._rebaixando[ano]
+            return
+        with self._lock:
+            # o ano pode ter sido republicado ou promovido de novo enquanto comprimia
+            if self._rebaixando.get(ano) is not df:
+                return
+            del self._rebaixando[ano]
+            if self._quentes.get(ano) is not df:
+                return
+            del self._quentes[ano]
+            antes = self._bytes_quentes.pop(ano, 0)
+            self._frios[ano] = frio
+        print(f"🧊 ENEM {ano} comprimido ({self.codec}): {antes / 1e6:.0f} MB -> {frio.bytes / 1e6:.0f} MB")
+
+    def _promover(self, ano: int, df: pd.DataFrame):
+        self._quentes[ano] = df
+        self._bytes_quentes[ano] = int(df.memory_usage(deep=True).sum())
+        self._frios.pop(ano, None)
+        self._rebalancear(protegido=ano)
+
+    # ---- interface de dict ----
+
+    def __setitem__(self, ano: int, df: pd.DataFrame):
+        with self._lock:
+            self._rebaixando.pop(ano, None)
+            self._tocar(ano)
+            self._promover(ano, df)
+
+    def __getitem__(self, ano: int) -> pd.DataFrame:
+        return self.ler(ano)
+
+    def ler(self, ano: int, colunas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """O DataFrame do ano; num ano frio, descomprime só as colunas pedidas (todas, se None)."""
+        with self._lock:
+            if ano not in self:
+                raise KeyError(ano)
+            contador = self._tocar(ano)
+            if ano in self._quentes:
+                df = self._quentes[ano]
+                if ano in self._rebaixando:
+                    # voltou a ser pedido antes de terminar a compressão: cancela o rebaixamento
+                    del self._rebaixando[ano]
+                    self._rebalancear(protegido=ano)
+                return df if colunas is None else df[[c for c in colunas if c in df.columns]]
+            frio = self._frios[ano]
+        df = frio.dataframe(colunas)
+        if colunas is not None and len(df.columns) < len(frio.colunas):
+            return df
+        with self._lock:
+            if self._frios.get(ano) is not frio:
+                return df
+            ocupadas = len(self._quentes) - len(self._rebaixando)
+            menos = self._menos_acessado()
+            if ocupadas < self.max_quentes or menos is None or contador > self._contador(menos, time.monotonic()):
+                self._promover(ano, df)
+        return df
+
+    def __delitem__(self, ano: int):
+        with self._lock:
+            if ano not in self._quentes and ano not in self._frios:
+                raise KeyError(ano)
+            self._quentes.pop(ano, None)
+            self._bytes_quentes.pop(ano, None)
+            self._frios.pop(ano, None)
+            self._rebaixando.pop(ano, None)
+            self._frequencia.pop(ano, None)
+
+    def __contains__(self, ano) -> bool:
+        return ano in self._quentes or ano in self._frios
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(set(self._quentes) | set(self._frios)))
+
+    def __len__(self) -> int:
+        return len(set(self._quentes) | set(self._frios))
+
+    # ---- consultas que não descomprimem ----
+
+    def linhas(self, ano: int) -> int:
+        """Registros do ano (0 se não está no store)."""
+        with self._lock:
+            if ano in self._quentes:
+                return len(self._quentes[ano])
+            frio = self._frios.get(ano)
+            return frio.linhas if frio is not None else 0
+
+    def colunas(self, ano: int) -> List[str]:
+        with self._lock:
+            if ano in self._quentes:
+                return list(self._quentes[ano].columns)
+            frio = self._frios.get(ano)
+            return list(frio.colunas) if frio is not None else []
+
+    def camada(self, ano: int) -> Optional[str]:
+        """"quente", "fria" ou None se o ano não está no store."""
+        if ano in self._quentes:
+            return "quente"
+        return "fria" if ano in self._frios else None
+
+    def info(self) -> dict:
+        """Camada e tamanho em memória de cada ano (para o /health)."""
+        with self._lock:
+            anos = {}
+            for ano in self:
+                quente = ano in self._quentes
+                anos[ano] = {
+                    "camada": "quente" if quente else "fria",
+                    "linhas": self.linhas(ano),
+                    "bytes": self._bytes_quentes.get(ano, 0) if quente else self._frios[ano].bytes,
+                }
+            return {
+                "max_quentes": self.max_quentes,
+                # sem nenhum rebaixamento ainda, o codec pedido (não resolve para não importar o pyarrow)
+                "codec": self._codec or self._codec_pedido,
+                "bytes": sum(a["bytes"] for a in anos.values()),
+                "anos": anos,
+            }
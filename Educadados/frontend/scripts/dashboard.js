@@ -316,6 +316,13 @@ async function loadYearData(year) {
     // Atualiza gráfico principal
     updateMainChart(areasData);
     
+    // Ano ainda carregando: os números são estimativas de uma amostra; recarrega quando o exato ficar pronto
+    if (statsDataRaw.approximate && statsDataRaw.eventos) {
+      aguardarResultadoExato(year, statsDataRaw.eventos);
+      console.log(`🎲 ENEM ${year}: estimativas (IC 95%) até a carga completa terminar`);
+      return;
+    }
+    
     console.log(`✅ Dados do ENEM ${year} carregados!`);
     
   } catch (error) {
@@ -324,6 +331,26 @@ async function loadYearData(year) {
   }
 }
 
+let eventosCarga = null;
+
+/**
+ * Escuta o fim da carga do ano (SSE) e recarrega os dados exatos se o ano ainda estiver selecionado
+ */
+function aguardarResultadoExato(year, caminho) {
+  if (eventosCarga) eventosCarga.close();
+  if (typeof EventSource === 'undefined') return;
+  eventosCarga = new EventSource(`${API_URL}${caminho}`);
+  eventosCarga.addEventListener('exato', () => {
+    eventosCarga.close();
+    eventosCarga = null;
+    if (currentYear === year) loadYearData(year);
+  });
+  eventosCarga.addEventListener('erro', () => {
+    eventosCarga.close();
+    eventosCarga = null;
+  });
+}
+
 /**
  * Atualiza os cards essenciais
  */
@@ -119,8 +119,9 @@ def check_project_structure():
     # Os caminhos agora incluem as pastas 'backend/' e 'frontend/'
     files_to_check = {
         'backend/main.py': 'API Principal',
-        'backend/start.bat': 'Script de Inicialização',
-        'backend/inspect_csv.py': 'Inspetor de CSV',
+        'backend/start.bat': 'Script de Inicialização (Windows)',
+        'backend/start.sh': 'Script de Inicialização (Linux/Mac)',
+        'backend/educadados.py': 'CLI de dados (converter, perfil, cache, bench)',
         'frontend/dashboard.html': 'Dashboard',
         'frontend/scripts/dashboard.js': 'JavaScript do Dashboard',
         'backend/requirements.txt': 'Dependências'
@@ -216,7 +217,7 @@ def print_summary(results):
         print("="*80)
         print("\n💡 Próximos passos:")
         print("   1. Vá para a pasta 'backend' (cd backend)")
-        print("   2. Execute: start.bat")
+        print("   2. Execute: start.bat (Windows) ou ./start.sh (Linux/Mac)")
         print("   3. Escolha: [1] Arquivos CSV Locais")
         print("   4. Abra: frontend/dashboard.html no navegador")
         print("\n✨ Boa apresentação!")
@@ -1,31 +1,138 @@
 """
-Upload SIMPLES para Hugging Face
-Faz upload dos arquivos CSV diretamente sem processar
-Execute: python upload_simples_hf.py
+Publicação dos microdados no Hugging Face
+Converte os CSVs para Parquet (zstd) particionado por ano/UF e envia as
+partições em paralelo, pulando as que não mudaram (hash SHA-256 no manifest.json).
+Execute: python upload_to_hf.py [--sim] [--workers 4] [--hub-local PASTA]
+Requer: pip install pyarrow huggingface_hub
+
+Se o envio for interrompido, é só rodar de novo: a conversão de um ano só é
+refeita se o CSV mudou e as partições já enviadas ficam registradas em
+MICRODADOS/parquet/.enviados.json.
+
+Para testar sem internet, use --hub-local PASTA: as partições são "enviadas"
+para uma pasta local com o mesmo layout do repositório no Hub.
 """
 
-from huggingface_hub import HfApi, login, create_repo
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
-# ⚠️ CONFIGURAÇÃO - ALTERE AQUI! ⚠️
+# detecção de encoding/separador compartilhada com a API
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from parallel_csv import detect_csv_format  # noqa: E402
+
+# ⚠️ CONFIGURAÇÃO ⚠️
+# usuário e token vêm de --usuario/--token ou das variáveis HF_USERNAME/HF_TOKEN;
+# os valores abaixo só valem se nenhum dos dois for informado
 HF_USERNAME = "Luc4s-Carv"  # Seu usuário do Hugging Face
 DATASET_NAME = "educadados-token"  # Nome do repositório
-HF_TOKEN = ""  # Seu token do Hugging Face 
+HF_TOKEN = ""  # Seu token do Hugging Face (vazio: usa o login do `huggingface-cli login`)
+# valores de exemplo que nunca são credenciais de verdade
+PLACEHOLDERS = ("seu-usuario", "hf_...")
+
+PASTA_MICRODADOS = "MICRODADOS"
+PASTA_PARQUET = os.path.join(PASTA_MICRODADOS, "parquet")
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", "4"))
+TENTATIVAS = 3
+
+# linhas por row group: permite ler só uma parte de cada partição por HTTP range
+LINHAS_POR_GRUPO = 50_000
+COMPRESSAO = "zstd"
+PARTICAO_NULA = "__HIVE_DEFAULT_PARTITION__"
+FORMATO_MANIFESTO = 1
+
+# ==========================================
+#   DESTINOS (Hub real ou pasta local)
+# ==========================================
+
+class HubHuggingFace:
+    """Repositório de dataset no Hugging Face."""
+
+    def __init__(self, repo_id: str, token: str):
+        from huggingface_hub import HfApi
+        self.repo_id = repo_id
+        self.token = token
+        self.api = HfApi(token=token)
+
+    def descricao(self) -> str:
+        return f"https://huggingface.co/datasets/{self.repo_id}"
+
+    def preparar(self):
+        self.api.create_repo(repo_id=self.repo_id, repo_type="dataset", exist_ok=True, private=False)
+
+    def baixar(self, caminho: str):
+        """Conteúdo de um arquivo do repositório, ou None se não existir."""
+        from huggingface_hub import hf_hub_download
+        from huggingface_hub.utils import EntryNotFoundError, RepositoryNotFoundError
+        try:
+            local = hf_hub_download(self.repo_id, caminho, repo_type="dataset", token=self.token)
+        except (EntryNotFoundError, RepositoryNotFoundError):
+            return None
+        with open(local, "rb") as f:
+            return f.read()
+
+    def enviar(self, local: str, caminho: str):
+        self.api.upload_file(
+            path_or_fileobj=local,
+            path_in_repo=caminho,
+            repo_id=self.repo_id,
+            repo_type="dataset",
+        )
+
+
+class HubLocal:
+    """Substituto do Hub em uma pasta local (testes offline)."""
+
+    def __init__(self, pasta: str):
+        self.pasta = Path(pasta)
+
+    def descricao(self) -> str:
+        return str(self.pasta.resolve())
+
+    def preparar(self):
+        self.pasta.mkdir(parents=True, exist_ok=True)
+
+    def baixar(self, caminho: str):
+        arquivo = self.pasta / caminho
+        return arquivo.read_bytes() if arquivo.exists() else None
+
+    def enviar(self, local: str, caminho: str):
+        destino = self.pasta / caminho
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_name(destino.name + ".parcial")
+        shutil.copyfile(local, temporario)
+        os.replace(temporario, destino)
+
+# ==========================================
+#   ARQUIVOS LOCAIS
+# ==========================================
 
-def verificar_arquivos():
+def verificar_arquivos(pasta=PASTA_MICRODADOS):
     """Verifica quais arquivos existem"""
-    print("📁 Verificando arquivos na pasta MICRODADOS/...\n")
-    
+    print(f"📁 Verificando arquivos na pasta {pasta}/...\n")
+
     arquivos = []
-    
-    if not os.path.exists('MICRODADOS'):
-        print("❌ Pasta MICRODADOS não encontrada!")
+
+    if not os.path.exists(pasta):
+        print(f"❌ Pasta {pasta} não encontrada!")
         return arquivos
-    
+
     # Lista todos os arquivos CSV na pasta
-    for arquivo in os.listdir('MICRODADOS'):
+    for arquivo in sorted(os.listdir(pasta)):
         if arquivo.endswith('.csv'):
-            caminho_completo = os.path.join('MICRODADOS', arquivo)
+            caminho_completo = os.path.join(pasta, arquivo)
             tamanho_mb = os.path.getsize(caminho_completo) / (1024 * 1024)
             arquivos.append({
                 'nome': arquivo,
@@ -33,102 +140,296 @@ def verificar_arquivos():
                 'tamanho_mb': tamanho_mb
             })
             print(f"✓ {arquivo} ({tamanho_mb:.2f} MB)")
-    
+
     if not arquivos:
-        print("❌ Nenhum arquivo CSV encontrado em MICRODADOS/")
+        print(f"❌ Nenhum arquivo CSV encontrado em {pasta}/")
     else:
         total_mb = sum(a['tamanho_mb'] for a in arquivos)
         print(f"\n📊 Total: {len(arquivos)} arquivos ({total_mb:.2f} MB)")
-    
+
     return arquivos
 
-def fazer_upload(arquivos):
-    """Faz upload dos arquivos para Hugging Face"""
-    
-    # Login
-    print("\n🔐 Fazendo login no Hugging Face...")
+def sha256_arquivo(caminho, bloco=4 * 1024 * 1024):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+def salvar_json(caminho, dados):
+    """Grava JSON de forma atômica (arquivo temporário + rename)."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    temporario.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporario, caminho)
+
+def ler_json(caminho, padrao):
     try:
-        login(token=HF_TOKEN)
-        print("✅ Login realizado!")
-    except Exception as e:
-        print(f"❌ Erro no login: {e}")
-        return False
-    
-    # Cria API
-    api = HfApi()
-    repo_id = f"{HF_USERNAME}/{DATASET_NAME}"
-    
-    # Cria o repositório (se não existir)
-    print(f"\n📦 Criando/verificando repositório: {repo_id}")
+        return json.loads(Path(caminho).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return padrao
+
+# ==========================================
+#   CONVERSÃO CSV -> PARQUET PARTICIONADO
+# ==========================================
+
+def tipo_da_coluna(coluna):
+    """Tipo Parquet por convenção de nome do INEP (o resto fica como texto)."""
+    if coluna.startswith("NU_NOTA_"):
+        return pa.float32()
+    if coluna in ("NU_INSCRICAO", "NU_SEQUENCIAL") or coluna.startswith("CO_"):
+        return pa.int64()
+    if coluna == "NU_ANO":
+        return pa.int16()
+    if coluna.startswith(("TP_", "IN_")):
+        return pa.int8()
+    return pa.string()
+
+def identificar(nome_arquivo):
+    """('microdados' | 'itens', ano) a partir do nome do CSV, ou None."""
+    base = nome_arquivo.upper().rsplit(".", 1)[0]
+    ano = base.rsplit("_", 1)[-1]
+    if not ano.isdigit():
+        return None
+    if base.startswith("MICRODADOS_ENEM_"):
+        return "microdados", int(ano)
+    if base.startswith("ITENS_PROVA_"):
+        return "itens", int(ano)
+    return None
+
+def origem_csv(caminho):
+    st = os.stat(caminho)
+    return {"arquivo": os.path.basename(caminho), "bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def abrir_csv(caminho):
+    encoding, sep, colunas, _ = detect_csv_format(Path(caminho))
+    return pacsv.open_csv(
+        caminho,
+        read_options=pacsv.ReadOptions(
+            encoding="utf8" if encoding.startswith("utf-8") else encoding,
+            column_names=colunas,
+            skip_rows=1,
+            block_size=64 * 1024 * 1024,
+        ),
+        parse_options=pacsv.ParseOptions(delimiter=sep, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: tipo_da_coluna(c) for c in colunas},
+            strings_can_be_null=True,
+        ),
+    )
+
+class EscritorParticoes:
+    """Um ParquetWriter por partição, com row groups de LINHAS_POR_GRUPO linhas."""
+
+    def __init__(self, pasta, schema):
+        self.pasta = Path(pasta)
+        self.schema = schema
+        self.escritores = {}
+        self.pendentes = {}
+        self.linhas = {}
+
+    def adicionar(self, particao, tabela):
+        self.pendentes.setdefault(particao, []).append(tabela)
+        self.linhas[particao] = self.linhas.get(particao, 0) + tabela.num_rows
+        if sum(t.num_rows for t in self.pendentes[particao]) >= LINHAS_POR_GRUPO:
+            self._descarregar(particao)
+
+    def _descarregar(self, particao):
+        tabelas = self.pendentes.pop(particao, [])
+        if not tabelas:
+            return
+        if particao not in self.escritores:
+            destino = self.pasta / particao / "part-0.parquet"
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            self.escritores[particao] = pq.ParquetWriter(destino, self.schema, compression=COMPRESSAO)
+        self.escritores[particao].write_table(pa.concat_tables(tabelas), row_group_size=LINHAS_POR_GRUPO)
+
+    def fechar(self):
+        for particao in list(self.pendentes):
+            self._descarregar(particao)
+        for escritor in self.escritores.values():
+            escritor.close()
+        return self.linhas
+
+def por_uf(tabela, coluna_uf):
+    """
+    (uf, fatia) de cada UF do lote numa passada só: ordena pela UF (ordenação
+    estável, então cada fatia mantém a ordem original) e corta as sequências.
+    """
+    ordenada = tabela.take(pc.sort_indices(tabela, sort_keys=[(coluna_uf, "ascending")]))
+    inicio = 0
+    for grupo in pc.value_counts(ordenada.column(coluna_uf)).to_pylist():
+        yield grupo["values"], ordenada.slice(inicio, grupo["counts"])
+        inicio += grupo["counts"]
+
+def converter_microdados(caminho, destino):
+    """Microdados de um ano -> destino/uf=XX/part-0.parquet."""
+    leitor = abrir_csv(caminho)
+    escritor = EscritorParticoes(destino, leitor.schema)
+    coluna_uf = "SG_UF_RESIDENCIA" if "SG_UF_RESIDENCIA" in leitor.schema.names else None
     try:
-        create_repo(
-            repo_id=repo_id,
-            token=HF_TOKEN,
-            repo_type="dataset",
-            exist_ok=True,  # Não dá erro se já existir
-            private=False
-        )
+        for lote in leitor:
+            tabela = pa.Table.from_batches([lote])
+            if coluna_uf is None:
+                escritor.adicionar(f"uf={PARTICAO_NULA}", tabela)
+                continue
+            for uf, fatia in por_uf(tabela, coluna_uf):
+                escritor.adicionar(f"uf={uf or PARTICAO_NULA}", fatia)
+    finally:
+        linhas = escritor.fechar()
+    return sum(linhas.values())
+
+def converter_itens(caminho, destino):
+    """Itens da prova (arquivo pequeno) -> destino/part-0.parquet."""
+    tabela = abrir_csv(caminho).read_all()
+    Path(destino).mkdir(parents=True, exist_ok=True)
+    pq.write_table(tabela, Path(destino) / "part-0.parquet", compression=COMPRESSAO, row_group_size=LINHAS_POR_GRUPO)
+    return tabela.num_rows
+
+def converter_arquivos(arquivos, pasta_parquet=PASTA_PARQUET):
+    """
+    Converte cada CSV para pasta_parquet/<tipo>/ano=AAAA/. Anos cujo CSV não
+    mudou desde a última conversão (tamanho e mtime em origem.json) são reaproveitados.
+    """
+    pasta_parquet = Path(pasta_parquet)
+    print(f"\n🔄 Convertendo para Parquet ({COMPRESSAO}) em {pasta_parquet}/")
+    for arq in arquivos:
+        tipo_ano = identificar(arq['nome'])
+        if tipo_ano is None:
+            print(f"   ⚠ {arq['nome']}: nome fora do padrão, ignorado")
+            continue
+        tipo, ano = tipo_ano
+        destino = pasta_parquet / tipo / f"ano={ano}"
+        origem = origem_csv(arq['caminho'])
+        if ler_json(destino / "origem.json", None) == origem:
+            print(f"   ✓ {arq['nome']}: já convertido")
+            continue
+
+        inicio = time.time()
+        temporario = destino.with_name(destino.name + ".tmp")
+        shutil.rmtree(temporario, ignore_errors=True)
+        conversor = converter_microdados if tipo == "microdados" else converter_itens
+        linhas = conversor(arq['caminho'], temporario)
+        salvar_json(temporario / "origem.json", origem)
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporario, destino)
+        tamanho = sum(p.stat().st_size for p in destino.rglob("*.parquet")) / (1024 * 1024)
+        print(f"   ✓ {arq['nome']}: {linhas:,} linhas -> {tamanho:.2f} MB em {time.time() - inicio:.1f}s")
+
+def montar_manifesto(pasta_parquet=PASTA_PARQUET):
+    """{caminho no repositório: {sha256, bytes, linhas, row_groups}} de todas as partições."""
+    pasta_parquet = Path(pasta_parquet)
+    arquivos = {}
+    for local in sorted(pasta_parquet.glob("*/ano=*/**/*.parquet")):
+        if any(parte.endswith(".tmp") for parte in local.parts):
+            continue
+        meta = pq.ParquetFile(local).metadata
+        caminho = local.relative_to(pasta_parquet).as_posix()
+        arquivos[caminho] = {
+            "sha256": sha256_arquivo(local),
+            "bytes": local.stat().st_size,
+            "linhas": meta.num_rows,
+            "row_groups": meta.num_row_groups,
+        }
+    return {"formato": FORMATO_MANIFESTO, "compressao": COMPRESSAO, "arquivos": arquivos}
+
+# ==========================================
+#   UPLOAD
+# ==========================================
+
+def enviar_com_retentativas(hub, local, caminho):
+    for tentativa in range(1, TENTATIVAS + 1):
+        try:
+            hub.enviar(local, caminho)
+            return
+        except Exception:
+            if tentativa == TENTATIVAS:
+                raise
+            time.sleep(2 ** tentativa)
+
+def fazer_upload(arquivos, hub, pasta_parquet=PASTA_PARQUET, workers=UPLOAD_WORKERS):
+    """Converte, compara com o manifest remoto e envia só as partições novas ou alteradas."""
+    converter_arquivos(arquivos, pasta_parquet)
+    manifesto = montar_manifesto(pasta_parquet)
+    particoes = manifesto["arquivos"]
+
+    print(f"\n📦 Preparando destino: {hub.descricao()}")
+    try:
+        hub.preparar()
         print(f"✅ Repositório pronto!")
     except Exception as e:
         print(f"⚠️  Aviso: {e}")
         print("   (Continuando...)")
-    
-    # Faz upload de cada arquivo
-    print(f"\n📤 Fazendo upload dos arquivos...")
-    print("⏳ Isso pode demorar bastante (10-30 minutos)...\n")
-    
-    sucesso = 0
-    falhas = 0
-    
-    for i, arq in enumerate(arquivos, 1):
-        print(f"\n[{i}/{len(arquivos)}] Enviando: {arq['nome']}")
-        print(f"           Tamanho: {arq['tamanho_mb']:.2f} MB")
-        
-        try:
-            # Upload do arquivo
-            api.upload_file(
-                path_or_fileobj=arq['caminho'],
-                path_in_repo=arq['nome'],  # Nome no repositório
-                repo_id=repo_id,
-                repo_type="dataset",
-                token=HF_TOKEN
-            )
-            print(f"           ✅ Upload concluído!")
-            sucesso += 1
-            
-        except Exception as e:
-            print(f"           ❌ Erro: {e}")
-            falhas += 1
-    
+
+    # o que já está no destino: manifest remoto + diário local de envios interrompidos
+    remoto = hub.baixar("manifest.json")
+    enviados = {c: m["sha256"] for c, m in (json.loads(remoto)["arquivos"].items() if remoto else [])}
+    diario_path = Path(pasta_parquet) / ".enviados.json"
+    diario = ler_json(diario_path, {})
+    enviados.update(diario.get(hub.descricao(), {}))
+
+    pendentes = [c for c, m in particoes.items() if enviados.get(c) != m["sha256"]]
+    iguais = len(particoes) - len(pendentes)
+    total_mb = sum(particoes[c]["bytes"] for c in pendentes) / (1024 * 1024)
+    print(f"\n📤 {len(pendentes)} partições para enviar ({total_mb:.2f} MB), {iguais} sem mudança")
+
+    trava = threading.Lock()
+    falhas = []
+
+    def enviar(caminho):
+        enviar_com_retentativas(hub, str(Path(pasta_parquet) / caminho), caminho)
+        with trava:
+            diario.setdefault(hub.descricao(), {})[caminho] = particoes[caminho]["sha256"]
+            salvar_json(diario_path, diario)
+
+    inicio = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futuros = {pool.submit(enviar, c): c for c in pendentes}
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            caminho = futuros[futuro]
+            try:
+                futuro.result()
+                print(f"   [{i}/{len(pendentes)}] ✅ {caminho}")
+            except Exception as e:
+                print(f"   [{i}/{len(pendentes)}] ❌ {caminho}: {e}")
+                falhas.append(caminho)
+
     # Resumo
     print("\n" + "="*80)
     print(f"📊 RESUMO DO UPLOAD")
     print("="*80)
-    print(f"✅ Sucesso: {sucesso} arquivos")
-    print(f"❌ Falhas: {falhas} arquivos")
-    
-    if sucesso > 0:
-        print(f"\n🔗 Seus dados estão em:")
-        print(f"   https://huggingface.co/datasets/{repo_id}")
-        print(f"\n✨ Use este nome na API: {repo_id}")
-        return True
-    
-    return False
+    print(f"✅ Enviadas: {len(pendentes) - len(falhas)} partições em {time.time() - inicio:.1f}s")
+    print(f"⏭️  Sem mudança: {iguais} partições")
+    print(f"❌ Falhas: {len(falhas)} partições")
+
+    if falhas:
+        print("\n💡 Rode novamente para reenviar só o que faltou.")
+        return False
+
+    # o manifest vai por último: só descreve partições que já estão no destino
+    caminho_manifesto = Path(pasta_parquet) / "manifest.json"
+    salvar_json(caminho_manifesto, manifesto)
+    enviar_com_retentativas(hub, str(caminho_manifesto), "manifest.json")
+    print(f"\n🔗 Seus dados estão em:")
+    print(f"   {hub.descricao()}")
+    return True
 
-def criar_readme():
+def criar_readme(repo_id):
     """Cria um README.md para o repositório"""
     readme_content = f"""# Microdados ENEM 2022-2024
 
-Este dataset contém os microdados do ENEM (Exame Nacional do Ensino Médio) dos anos 2022, 2023 e 2024.
+Este dataset contém os microdados do ENEM (Exame Nacional do Ensino Médio) dos anos 2022, 2023 e 2024,
+em Parquet (compressão {COMPRESSAO}) particionado por ano e UF de residência.
 
 ## 📊 Arquivos Disponíveis
 
-- `MICRODADOS_ENEM_2022.csv` - Microdados dos participantes do ENEM 2022
-- `ITENS_PROVA_2022.csv` - Itens das provas do ENEM 2022
-- `MICRODADOS_ENEM_2023.csv` - Microdados dos participantes do ENEM 2023
-- `ITENS_PROVA_2023.csv` - Itens das provas do ENEM 2023
-- `MICRODADOS_ENEM_2024.csv` - Microdados dos participantes do ENEM 2024
-- `ITENS_PROVA_2024.csv` - Itens das provas do ENEM 2024
+- `microdados/ano=AAAA/uf=XX/part-0.parquet` - Participantes do ENEM de um ano e UF
+- `itens/ano=AAAA/part-0.parquet` - Itens das provas do ENEM de um ano
+- `manifest.json` - Lista das partições com SHA-256, tamanho, linhas e row groups
+
+Cada partição tem row groups de {LINHAS_POR_GRUPO:,} linhas, então dá para ler só as colunas
+e grupos necessários com requisições HTTP Range.
 
 ## 🎯 Uso
 
@@ -137,7 +438,7 @@ Para usar este dataset com a API EducaDados:
 ```bash
 # Configure as variáveis de ambiente
 set USE_HUGGINGFACE=true
-set HF_DATASET={HF_USERNAME}/{DATASET_NAME}
+set HF_DATASET={repo_id}
 
 # Inicie a API
 start.bat
@@ -153,112 +454,124 @@ https://www.gov.br/inep/pt-br/acesso-a-informacao/dados-abertos/microdados/enem
 
 Dados públicos disponibilizados pelo INEP.
 """
-    
+
     return readme_content
 
-def fazer_upload_readme(readme_content):
+def fazer_upload_readme(readme_content, hub, pasta_parquet=PASTA_PARQUET):
     """Faz upload do README"""
-    api = HfApi()
-    repo_id = f"{HF_USERNAME}/{DATASET_NAME}"
-    
     print("\n📝 Criando README.md...")
-    
+
     try:
-        # Salva README temporário
-        with open('temp_readme.md', 'w', encoding='utf-8') as f:
-            f.write(readme_content)
-        
-        # Faz upload
-        api.upload_file(
-            path_or_fileobj='temp_readme.md',
-            path_in_repo='README.md',
-            repo_id=repo_id,
-            repo_type="dataset",
-            token=HF_TOKEN
-        )
-        
-        # Remove arquivo temporário
-        os.remove('temp_readme.md')
-        
+        caminho = Path(pasta_parquet) / "README.md"
+        caminho.write_text(readme_content, encoding="utf-8")
+        enviar_com_retentativas(hub, str(caminho), "README.md")
         print("✅ README.md criado!")
-        
+
     except Exception as e:
         print(f"⚠️  Erro ao criar README: {e}")
 
+def token_salvo():
+    """Token do `huggingface-cli login`, se houver (o HfApi usa o mesmo quando não recebe token)."""
+    try:
+        from huggingface_hub import get_token
+    except ImportError:
+        return None
+    return get_token()
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Publica os microdados do ENEM em Parquet no Hugging Face")
+    parser.add_argument("--sim", action="store_true", help="não pede confirmação")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS, help="envios simultâneos")
+    parser.add_argument("--pasta", default=PASTA_MICRODADOS, help="pasta com os CSVs")
+    parser.add_argument("--hub-local", metavar="PASTA", help="envia para uma pasta local em vez do Hub (teste offline)")
+    parser.add_argument("--usuario", default=os.environ.get("HF_USERNAME") or HF_USERNAME,
+                        help="usuário do Hugging Face (padrão: $HF_USERNAME)")
+    parser.add_argument("--token", default=os.environ.get("HF_TOKEN") or HF_TOKEN,
+                        help="token do Hugging Face (padrão: $HF_TOKEN, senão o login salvo)")
+    args = parser.parse_args()
+    pausar = (lambda msg: None) if args.sim else input
+    pasta_parquet = os.path.join(args.pasta, "parquet")
+
     print("""
     ╔══════════════════════════════════════════════════════════════════════════╗
-    ║         📤 Upload SIMPLES para Hugging Face - EducaDados ENEM           ║
+    ║           📤 Upload para Hugging Face - EducaDados ENEM                  ║
     ║                                                                          ║
-    ║  Este script faz upload direto dos arquivos CSV sem processamento.      ║
-    ║  Muito mais rápido e simples que o upload_to_hf.py original!            ║
+    ║  Converte os CSVs para Parquet particionado por ano/UF e envia só as     ║
+    ║  partições novas ou alteradas, em paralelo.                              ║
     ╚══════════════════════════════════════════════════════════════════════════╝
     """)
-    
+
     # Verifica configuração
-    if HF_USERNAME == "seu-usuario" or HF_TOKEN == "hf_...":
+    token = args.token or token_salvo()
+    if not args.hub_local and (not args.usuario or args.usuario in PLACEHOLDERS or not token or token in PLACEHOLDERS):
         print("\n❌ CONFIGURAÇÃO NECESSÁRIA!")
-        print("\nAbra o arquivo upload_simples_hf.py e configure:")
-        print(f"   1. HF_USERNAME = 'seu-usuario-real'")
-        print(f"   2. HF_TOKEN = 'seu-token-real'")
-        print(f"   3. DATASET_NAME = 'enem-microdados' (ou outro nome)")
+        print("\nInforme o usuário e o token do Hugging Face:")
+        print("   1. --usuario seu-usuario-real (ou a variável HF_USERNAME)")
+        print("   2. --token seu-token-real (ou a variável HF_TOKEN, ou `huggingface-cli login`)")
+        print(f"   3. DATASET_NAME = 'enem-microdados' no upload_to_hf.py (ou outro nome)")
         print("\n💡 Para obter seu token:")
         print("   https://huggingface.co/settings/tokens")
-        input("\nPressione Enter para sair...")
+        pausar("\nPressione Enter para sair...")
         return
-    
+
     # Verifica arquivos
-    arquivos = verificar_arquivos()
-    
+    arquivos = verificar_arquivos(args.pasta)
+
     if not arquivos:
         print("\n❌ Nenhum arquivo para upload!")
-        print("\n💡 Certifique-se de que os arquivos CSV estão em MICRODADOS/")
-        input("\nPressione Enter para sair...")
+        print(f"\n💡 Certifique-se de que os arquivos CSV estão em {args.pasta}/")
+        pausar("\nPressione Enter para sair...")
         return
-    
+
+    repo_id = f"{args.usuario}/{DATASET_NAME}"
+    if args.hub_local:
+        hub = HubLocal(args.hub_local)
+    else:
+        hub = HubHuggingFace(repo_id, token)
+
     # Confirmação
     print("\n" + "="*80)
-    print(f"📦 UPLOAD PARA: {HF_USERNAME}/{DATASET_NAME}")
+    print(f"📦 UPLOAD PARA: {hub.descricao()}")
     print(f"📁 ARQUIVOS: {len(arquivos)}")
-    print(f"📊 TAMANHO TOTAL: {sum(a['tamanho_mb'] for a in arquivos):.2f} MB")
-    print("🌐 VISIBILIDADE: Público")
+    print(f"📊 TAMANHO TOTAL (CSV): {sum(a['tamanho_mb'] for a in arquivos):.2f} MB")
+    print(f"🧵 ENVIOS SIMULTÂNEOS: {args.workers}")
     print("="*80)
-    
-    confirma = input("\n⚠️  Deseja continuar? (s/N): ").strip().lower()
-    
-    if confirma != 's':
-        print("❌ Upload cancelado.")
-        return
-    
+
+    if not args.sim:
+        confirma = input("\n⚠️  Deseja continuar? (s/N): ").strip().lower()
+        if confirma != 's':
+            print("❌ Upload cancelado.")
+            return
+
     # Faz upload
-    if fazer_upload(arquivos):
+    if fazer_upload(arquivos, hub, pasta_parquet, args.workers):
         # Cria README
-        readme = criar_readme()
-        fazer_upload_readme(readme)
-        
+        readme = criar_readme(repo_id)
+        fazer_upload_readme(readme, hub, pasta_parquet)
+
         print("\n" + "="*80)
         print("✅ UPLOAD CONCLUÍDO COM SUCESSO!")
         print("="*80)
-        
+
         print("\n🎯 PRÓXIMOS PASSOS:")
         print(f"\n1. Verificar no navegador:")
-        print(f"   https://huggingface.co/datasets/{HF_USERNAME}/{DATASET_NAME}")
-        
+        print(f"   https://huggingface.co/datasets/{repo_id}")
+
         print(f"\n2. Usar na API:")
         print(f"   • Execute: start.bat")
         print(f"   • Escolha: [2] Hugging Face")
-        print(f"   • Digite: {HF_USERNAME}/{DATASET_NAME}")
-        
+        print(f"   • Digite: {repo_id}")
+
         print("\n3. Ou configure via variável de ambiente:")
         print(f"   set USE_HUGGINGFACE=true")
-        print(f"   set HF_DATASET={HF_USERNAME}/{DATASET_NAME}")
-        
+        print(f"   set HF_DATASET={repo_id}")
+
         print("\n✨ Pronto para apresentar!")
     else:
         print("\n❌ Upload falhou. Verifique os erros acima.")
-    
-    input("\nPressione Enter para sair...")
+
+    pausar("\nPressione Enter para sair...")
 
 if __name__ == "__main__":
     try:
@@ -269,4 +582,4 @@ if __name__ == "__main__":
         print(f"\n\n❌ Erro inesperado: {e}")
         import traceback
         traceback.print_exc()
-        input("\nPressione Enter para sair...")
\ No newline at end of file
+        input("\nPressione Enter para sair...")